@@ -12,21 +12,70 @@ from homeassistant.const import (
     Platform,
     __version__ as HA_VERSION,  # noqa: N812
 )
-from homeassistant.core import HomeAssistant
-from homeassistant.helpers import config_validation as cv, entity_registry as er
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import (
+    config_validation as cv,
+    device_registry as dr,
+    entity_registry as er,
+)
+from homeassistant.helpers.discovery import async_load_platform
 from homeassistant.helpers.typing import ConfigType
 from homeassistant.helpers.update_coordinator import ConfigEntryNotReady
 
-from .common import TSmartConfigEntry, TSmartData
+from .aggregates import DATA_AGGREGATES, TSmartFleetAggregates
+from .capabilities import DATA_CAPABILITIES, TSmartCapabilityStore
+from .common import DATA_LIMITER, TSmartConfigEntry, TSmartData, async_get_transport
 from .const import (
+    CONF_COOL_THRESHOLD,
+    CONF_DEMAND_LIMITED,
     CONF_DEVICE_NAME,
+    CONF_DIVERSION_SETPOINT,
+    CONF_DRAW_DETECTION,
+    CONF_EXPORT_SENSOR,
+    CONF_HEATER_POWER,
+    CONF_INLET_TEMPERATURE,
+    CONF_INTERPOLATION,
+    CONF_INTERPOLATION_UNCERTAINTY,
+    CONF_LEGIONELLA,
+    CONF_LEGIONELLA_BOOST,
+    CONF_LEGIONELLA_DURATION,
+    CONF_LEGIONELLA_TEMPERATURE,
+    CONF_METRICS,
+    CONF_PREHEAT_READY_BY,
+    CONF_PREHEAT_TARGET,
+    CONF_TANK_VOLUME,
+    CONF_TARIFF_SENSOR,
     CONF_TEMPERATURE_MODE,
+    CONF_TIMESYNC,
+    DEFAULT_COOL_THRESHOLD,
     DOMAIN,
     MIN_HA_VERSION,
     TEMPERATURE_MODE_AVERAGE,
 )
 from .coordinator import TSmartCoordinator
-from .tsmart import DiscoveredDevice, TSmart
+from .demand import DATA_DEMAND, TSmartDemandLimiter
+from .diversion import DATA_DIVERSION, TSmartDiversion
+from .draw import DATA_DRAW, TSmartDrawDetector
+from .holds import DATA_HOLDS, TSmartHolds
+from .interpolation import DATA_INTERPOLATION, TSmartInterpolation
+from .legionella import DATA_LEGIONELLA, TSmartLegionella
+from .maintenance import DATA_MAINTENANCE, TSmartMaintenance
+from .metrics import DATA_METRICS, TSmartMetrics
+from .polling import DATA_POLLING, TSmartPollScheduler
+from .profiling import DATA_PROFILER
+from .restore import DATA_RESTORE, TSmartRestoreStore
+from .scheduler import DATA_PREHEAT_SCHEDULER, TSmartPreheatScheduler
+from .services import async_setup_services
+from .stream import DATA_STREAM, TSmartStatusStream
+from .tracing import DATA_TRACER
+from .tsmart import (
+    TSmart,
+    TSmartLimiter,
+    TSmartProfiler,
+    TSmartShedError,
+    TSmartTracer,
+)
+from .websocket_api import async_setup_websocket_api
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -36,9 +85,68 @@ PLATFORMS: list[Platform] = [
     Platform.BINARY_SENSOR,
     Platform.BUTTON,
     Platform.CLIMATE,
+    Platform.EVENT,
     Platform.SENSOR,
 ]
 
+# Fleet features as (name, enabling option, options used, hass.data key)
+FEATURES = [
+    (
+        "preheat",
+        CONF_TARIFF_SENSOR,
+        {CONF_TARIFF_SENSOR, CONF_PREHEAT_TARGET, CONF_PREHEAT_READY_BY},
+        DATA_PREHEAT_SCHEDULER,
+    ),
+    ("timesync", CONF_TIMESYNC, {CONF_TIMESYNC}, DATA_MAINTENANCE),
+    ("metrics", CONF_METRICS, {CONF_METRICS}, DATA_METRICS),
+    (
+        "demand",
+        CONF_DEMAND_LIMITED,
+        {CONF_DEMAND_LIMITED, CONF_HEATER_POWER},
+        DATA_DEMAND,
+    ),
+    (
+        "diversion",
+        CONF_EXPORT_SENSOR,
+        {CONF_EXPORT_SENSOR, CONF_DIVERSION_SETPOINT, CONF_HEATER_POWER},
+        DATA_DIVERSION,
+    ),
+    (
+        "legionella",
+        CONF_LEGIONELLA,
+        {
+            CONF_LEGIONELLA,
+            CONF_LEGIONELLA_TEMPERATURE,
+            CONF_LEGIONELLA_DURATION,
+            CONF_LEGIONELLA_BOOST,
+        },
+        DATA_LEGIONELLA,
+    ),
+    (
+        "draw",
+        CONF_DRAW_DETECTION,
+        {CONF_DRAW_DETECTION, CONF_TANK_VOLUME, CONF_INLET_TEMPERATURE},
+        DATA_DRAW,
+    ),
+    (
+        "interpolation",
+        CONF_INTERPOLATION,
+        {CONF_INTERPOLATION, CONF_INTERPOLATION_UNCERTAINTY, CONF_DRAW_DETECTION},
+        DATA_INTERPOLATION,
+    ),
+]
+
+# Options that can be changed without reloading the entry, the Legionella and
+# hot water sensors are only added while tracking is enabled
+LIVE_OPTIONS = {
+    CONF_IP_ADDRESS,
+    CONF_TEMPERATURE_MODE,
+    CONF_COOL_THRESHOLD,
+}.union(*(options for _, _, options, _ in FEATURES)) - {
+    CONF_LEGIONELLA,
+    CONF_DRAW_DETECTION,
+}
+
 
 async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
     """Integration setup."""
@@ -52,6 +160,35 @@ async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
         _LOGGER.critical(msg)
         return False
 
+    hass.data[DATA_PREHEAT_SCHEDULER] = TSmartPreheatScheduler(hass)
+    hass.data[DATA_MAINTENANCE] = TSmartMaintenance(hass)
+    hass.data[DATA_METRICS] = TSmartMetrics(hass)
+    hass.data[DATA_POLLING] = TSmartPollScheduler(hass)
+    hass.data[DATA_PROFILER] = async_get_transport(hass).profiler = TSmartProfiler()
+    hass.data[DATA_TRACER] = async_get_transport(hass).tracer = TSmartTracer()
+    hass.data[DATA_LIMITER] = TSmartLimiter()
+    hass.data[DATA_RESTORE] = TSmartRestoreStore(hass)
+    await hass.data[DATA_RESTORE].async_load()
+    hass.data[DATA_CAPABILITIES] = TSmartCapabilityStore(hass)
+    await hass.data[DATA_CAPABILITIES].async_load()
+    hass.data[DATA_HOLDS] = TSmartHolds(hass)
+    await hass.data[DATA_HOLDS].async_load()
+    hass.data[DATA_DEMAND] = TSmartDemandLimiter(hass)
+    await hass.data[DATA_DEMAND].async_load()
+    hass.data[DATA_DIVERSION] = TSmartDiversion(hass)
+    hass.data[DATA_LEGIONELLA] = TSmartLegionella(hass)
+    await hass.data[DATA_LEGIONELLA].async_load()
+    hass.data[DATA_DRAW] = TSmartDrawDetector(hass)
+    await hass.data[DATA_DRAW].async_load()
+    hass.data[DATA_INTERPOLATION] = TSmartInterpolation(hass)
+    hass.data[DATA_AGGREGATES] = TSmartFleetAggregates(hass)
+    hass.async_create_task(
+        async_load_platform(hass, Platform.SENSOR, DOMAIN, {}, config)
+    )
+    hass.data[DATA_STREAM] = TSmartStatusStream(hass)
+    async_setup_services(hass)
+    async_setup_websocket_api(hass)
+
     return True
 
 
@@ -98,62 +235,201 @@ async def async_migrate_entry(hass: HomeAssistant, entry: TSmartConfigEntry) ->
 async def async_setup_entry(hass: HomeAssistant, entry: TSmartConfigEntry) -> bool:
     """Set up T-Smart Thermostat from a config entry."""
 
-    entry.async_on_unload(entry.add_update_listener(_async_update_listener))
-
+    transport = async_get_transport(hass)
     device = TSmart(
         entry.data[CONF_IP_ADDRESS],
         entry.data[CONF_DEVICE_ID],
         entry.data[CONF_DEVICE_NAME],
+        transport,
     )
+    device.profiler = hass.data[DATA_PROFILER]
+    device.capabilities = hass.data[DATA_CAPABILITIES].capabilities
+    device.tracer = hass.data[DATA_TRACER]
+    device.limiter = hass.data[DATA_LIMITER]
 
     temperature_mode = entry.data.get(CONF_TEMPERATURE_MODE, TEMPERATURE_MODE_AVERAGE)
+    cool_threshold = entry.data.get(CONF_COOL_THRESHOLD, DEFAULT_COOL_THRESHOLD)
+
+    # Entities start from the last known state when there is one, connecting
+    # to the device in the background, otherwise connect before first refresh
+    restored = hass.data[DATA_RESTORE].async_restore(device)
+    if restored is None and not await _async_connect(hass, entry, device):
+        raise ConfigEntryNotReady(
+            f"Timeout connecting to device {device.name} on {device.ip}"
+        )
 
-    # Get device configuration before first refresh
-    configuration = await device.async_get_configuration()
-    if not configuration:
-        # Attempt discovery on timeout
-        discovered_devices: list[DiscoveredDevice] = await TSmart.async_discover()
+    coordinator = TSmartCoordinator(
+        hass=hass,
+        config_entry=entry,
+        device=device,
+        temperature_mode=temperature_mode,
+        cool_threshold=cool_threshold,
+    )
+    entry.runtime_data = TSmartData(
+        device=device, coordinator=coordinator, applied_data=dict(entry.data)
+    )
+    entry.async_on_unload(entry.add_update_listener(_async_update_listener))
 
-        if not discovered_devices:
-            raise ConfigEntryNotReady(
-                f"Timeout connecting to device {device.name} on {device.ip}"
-            )
+    if restored is None:
+        await coordinator.async_config_entry_first_refresh()
+        if coordinator.device.request_successful is False:
+            raise ConfigEntryNotReady(f"Unable to connect to {coordinator.device.ip}")
+    else:
+        coordinator.async_set_restored(restored)
+        entry.async_create_background_task(
+            hass,
+            _async_refresh_restored(hass, entry),
+            f"{DOMAIN} {device.name} refresh",
+        )
 
-        for discovered_device in discovered_devices:
-            if device.device_id == entry.data[CONF_DEVICE_ID]:
-                new_data = entry.data.copy()
-                new_data[CONF_IP_ADDRESS] = discovered_device.ip
-                hass.config_entries.async_update_entry(entry, data=new_data)
-                _LOGGER.debug(
-                    "%s: Changed IP address to %s",
-                    device.device_id,
-                    device.ip,
-                )
-                device.ip = discovered_device.ip
-                configuration = await device.async_get_configuration()
-                break
+    entry.async_on_unload(hass.data[DATA_POLLING].async_add_entry(entry))
 
-    if not configuration:
-        raise ConfigEntryNotReady(f"Unable to connect to {device.ip}")
+    # Holds listen ahead of the features, so a hold let go of is seen by its
+    # feature for the same status, and features ahead of the entities, so
+    # entities showing their state see it updated for the same status
+    entry.async_on_unload(hass.data[DATA_HOLDS].async_add_entry(entry))
+    _async_update_features(hass, entry, set(entry.data))
 
-    coordinator = TSmartCoordinator(
-        hass=hass, config_entry=entry, device=device, temperature_mode=temperature_mode
-    )
-    entry.runtime_data = TSmartData(device=device, coordinator=coordinator)
+    @callback
+    def _async_remove_features() -> None:
+        for unsub in entry.runtime_data.unsubs.values():
+            unsub()
+        entry.runtime_data.unsubs.clear()
 
-    await coordinator.async_config_entry_first_refresh()
-    if coordinator.device.request_successful is False:
-        raise ConfigEntryNotReady(f"Unable to connect to {coordinator.device.ip}")
+    entry.async_on_unload(_async_remove_features)
 
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+
+    # After the platforms, so a new device is in the registry to be grouped
+    entry.async_on_unload(hass.data[DATA_AGGREGATES].async_add_entry(entry))
+    entry.async_on_unload(hass.data[DATA_STREAM].async_add_entry(entry))
+
     return True
 
 
+async def _async_connect(
+    hass: HomeAssistant, entry: TSmartConfigEntry, device: TSmart
+) -> bool:
+    """Get the device configuration, rediscovering the device if it moved."""
+    try:
+        if await device.async_get_configuration():
+            return True
+    except TSmartShedError:
+        # The device is busy answering other requests, so it hasn't moved
+        return False
+
+    # Attempt discovery on timeout
+    for discovered_device in await TSmart.async_discover(transport=device.transport):
+        if discovered_device.device_id == device.device_id:
+            _LOGGER.debug(
+                "%s: Changed IP address to %s",
+                device.device_id,
+                discovered_device.ip,
+            )
+            device.ip = discovered_device.ip
+            hass.config_entries.async_update_entry(
+                entry, data={**entry.data, CONF_IP_ADDRESS: discovered_device.ip}
+            )
+            try:
+                return await device.async_get_configuration() is not None
+            except TSmartShedError:
+                return False
+
+    return False
+
+
+async def _async_refresh_restored(
+    hass: HomeAssistant, entry: TSmartConfigEntry
+) -> None:
+    """Connect to a device set up from its last known state."""
+    device = entry.runtime_data.device
+    firmware_version = device.firmware_version
+
+    if await _async_connect(hass, entry, device) and (
+        device.firmware_version != firmware_version
+    ):
+        device_registry = dr.async_get(hass)
+        if device_entry := device_registry.async_get_device(
+            identifiers={(DOMAIN, device.device_id)}
+        ):
+            device_registry.async_update_device(
+                device_entry.id, sw_version=device.firmware_version
+            )
+
+    await entry.runtime_data.coordinator.async_refresh()
+
+
+@callback
+def _async_update_features(
+    hass: HomeAssistant, entry: TSmartConfigEntry, changed: set[str]
+) -> None:
+    """Register the device with the fleet features whose options changed."""
+    unsubs = entry.runtime_data.unsubs
+    for name, enabling_option, options, data_key in FEATURES:
+        if not changed & options:
+            continue
+        if (unsub := unsubs.pop(name, None)) is not None:
+            unsub()
+        if entry.data.get(enabling_option):
+            unsubs[name] = hass.data[data_key].async_add_entry(entry)
+
+
 async def _async_update_listener(hass: HomeAssistant, entry: TSmartConfigEntry) -> None:
-    """Handle options update."""
-    await hass.config_entries.async_reload(entry.entry_id)
+    """Handle options update.
+
+    Options the running device can adopt are applied in place, anything else
+    reloads the entry.
+    """
+    data = entry.runtime_data
+    changed = {
+        key
+        for key in data.applied_data.keys() | entry.data.keys()
+        if data.applied_data.get(key) != entry.data.get(key)
+    }
+    if not changed:
+        return
+
+    if changed - LIVE_OPTIONS:
+        await hass.config_entries.async_reload(entry.entry_id)
+        return
+
+    _LOGGER.debug("%s: Applying %s", data.device.name, ", ".join(sorted(changed)))
+    data.applied_data = dict(entry.data)
+    coordinator = data.coordinator
+
+    if CONF_TEMPERATURE_MODE in changed:
+        coordinator.temperature_mode = entry.data.get(
+            CONF_TEMPERATURE_MODE, TEMPERATURE_MODE_AVERAGE
+        )
+        coordinator.predictor.restart()
+        coordinator.estimator.restart()
+
+    if CONF_COOL_THRESHOLD in changed:
+        coordinator.cool_threshold = entry.data.get(
+            CONF_COOL_THRESHOLD, DEFAULT_COOL_THRESHOLD
+        )
+
+    _async_update_features(hass, entry, changed)
+
+    if CONF_IP_ADDRESS in changed:
+        data.device.ip = entry.data[CONF_IP_ADDRESS]
+        await coordinator.async_request_refresh()
+    else:
+        coordinator.async_update_listeners()
 
 
 async def async_unload_entry(hass: HomeAssistant, entry: TSmartConfigEntry) -> bool:
     """Unload a config entry."""
     return await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: TSmartConfigEntry) -> None:
+    """Forget the last known state, hold, Legionella cycle and usage of a device."""
+    if (store := hass.data.get(DATA_RESTORE)) is not None:
+        store.async_remove(entry.data[CONF_DEVICE_ID])
+    if (holds := hass.data.get(DATA_HOLDS)) is not None:
+        holds.async_remove(entry.data[CONF_DEVICE_ID])
+    if (legionella := hass.data.get(DATA_LEGIONELLA)) is not None:
+        legionella.async_remove(entry.data[CONF_DEVICE_ID])
+    if (draw := hass.data.get(DATA_DRAW)) is not None:
+        draw.async_remove(entry.data[CONF_DEVICE_ID])
@@ -0,0 +1,254 @@
+"""Fleet aggregates of t_smart heaters, by area and label."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime
+from typing import NamedTuple
+
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
+from homeassistant.helpers import (
+    area_registry as ar,
+    device_registry as dr,
+    label_registry as lr,
+)
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+from homeassistant.helpers.event import async_track_time_interval
+from homeassistant.util.hass_dict import HassKey
+
+from .common import TSmartConfigEntry
+from .const import DOMAIN, UPDATE_INTERVAL
+from .tsmart import TSmartMode
+
+DATA_AGGREGATES: HassKey[TSmartFleetAggregates] = HassKey(f"{DOMAIN}_aggregates")
+
+SIGNAL_GROUP_ADDED = f"{DOMAIN}_fleet_group_added"
+
+GROUP_ALL = "all"
+GROUP_AREA = "area"
+GROUP_LABEL = "label"
+
+type GroupKey = tuple[str, str]
+
+FLEET_GROUP: GroupKey = (GROUP_ALL, GROUP_ALL)
+
+
+def signal_group_updated(key: GroupKey) -> str:
+    """Return the signal sent when a group's totals change."""
+    return f"{DOMAIN}_fleet_group_updated_{key[0]}_{key[1]}"
+
+
+def signal_group_removed(key: GroupKey) -> str:
+    """Return the signal sent when a group has no heaters left."""
+    return f"{DOMAIN}_fleet_group_removed_{key[0]}_{key[1]}"
+
+
+class Sample(NamedTuple):
+    """A heater's contribution to the totals of its groups.
+
+    The temperature is kept in hundredths of a degree, so sums stay exact
+    however many times samples are added and taken away.
+    """
+
+    online: int
+    heating: int
+    critical: int
+    temperature: int
+
+
+OFFLINE = Sample(0, 0, 0, 0)
+
+
+@dataclass(slots=True)
+class FleetTotals:
+    """Running sums over the heaters in a group."""
+
+    name: str
+    members: int = 0
+    online: int = 0
+    heating: int = 0
+    critical: int = 0
+    temperature: int = 0
+
+    def add(self, sample: Sample, sign: int = 1) -> None:
+        """Add a sample to the sums, or take it away with a sign of -1."""
+        self.online += sign * sample.online
+        self.heating += sign * sample.heating
+        self.critical += sign * sample.critical
+        self.temperature += sign * sample.temperature
+
+    @property
+    def average_temperature(self) -> float | None:
+        """Return the average temperature of the heaters online."""
+        if not self.online:
+            return None
+        return round(self.temperature / self.online / 100, 1)
+
+
+@dataclass(slots=True, eq=False)
+class FleetMember:
+    """A heater and what it last added to its groups."""
+
+    entry: TSmartConfigEntry
+    groups: frozenset[GroupKey] = frozenset()
+    sample: Sample = OFFLINE
+
+
+class TSmartFleetAggregates:
+    """Keeps totals of the fleet, and of each area and label, up to date.
+
+    Each coordinator update replaces the heater's previous sample in the sums
+    of its groups, so the cost doesn't grow with the fleet. Groups whose sums
+    changed are flagged, and their sensors written once per poll interval
+    rather than on every update. A group left without heaters, such as an
+    area that was deleted, is dropped along with its sensors.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        self.hass = hass
+        self.totals: dict[GroupKey, FleetTotals] = {}
+        self._members: dict[str, FleetMember] = {}
+        self._dirty: set[GroupKey] = set()
+        self._devices: dict[str, str] = {}  # Device registry id to entry id
+        self._unsubs: list[CALLBACK_TYPE] = []
+
+    @callback
+    def async_add_entry(self, entry: TSmartConfigEntry) -> CALLBACK_TYPE:
+        """Include a heater in the totals."""
+        if not self._members:
+            self._async_start()
+
+        member = self._members[entry.entry_id] = FleetMember(entry)
+        self._async_set_groups(member, self._groups(entry))
+        self._async_update(member)
+
+        @callback
+        def _async_updated() -> None:
+            self._async_update(member)
+
+        unsub = entry.runtime_data.coordinator.async_add_listener(_async_updated)
+
+        @callback
+        def _remove() -> None:
+            unsub()
+            self._async_set_groups(member, frozenset())
+            del self._members[entry.entry_id]
+            if not self._members:
+                self._async_stop()
+
+        return _remove
+
+    @callback
+    def _async_start(self) -> None:
+        """Start following the device registry and flushing changes."""
+        self._unsubs = [
+            self.hass.bus.async_listen(
+                dr.EVENT_DEVICE_REGISTRY_UPDATED, self._async_device_updated
+            ),
+            async_track_time_interval(self.hass, self._async_flush, UPDATE_INTERVAL),
+        ]
+
+    @callback
+    def _async_stop(self) -> None:
+        """Stop following the device registry and flushing changes."""
+        for unsub in self._unsubs:
+            unsub()
+        self._unsubs = []
+        self._async_flush()
+
+    def _groups(self, entry: TSmartConfigEntry) -> frozenset[GroupKey]:
+        """Return the groups a heater is in, noting its device registry id."""
+        groups = {FLEET_GROUP}
+        device_entry = dr.async_get(self.hass).async_get_device(
+            identifiers={(DOMAIN, entry.runtime_data.device.device_id)}
+        )
+        if device_entry is not None:
+            self._devices[device_entry.id] = entry.entry_id
+            if device_entry.area_id:
+                groups.add((GROUP_AREA, device_entry.area_id))
+            groups.update((GROUP_LABEL, label) for label in device_entry.labels)
+        return frozenset(groups)
+
+    def _group_name(self, key: GroupKey) -> str:
+        """Return the name of a group for its sensors."""
+        kind, group_id = key
+        if kind == GROUP_AREA:
+            area = ar.async_get(self.hass).async_get_area(group_id)
+            return area.name if area else group_id
+        if kind == GROUP_LABEL:
+            label = lr.async_get(self.hass).async_get_label(group_id)
+            return label.name if label else group_id
+        return "Fleet"
+
+    @callback
+    def _async_device_updated(
+        self, event: Event[dr.EventDeviceRegistryUpdatedData]
+    ) -> None:
+        """Regroup a heater moved to another area or labelled differently."""
+        if event.data["action"] != "update":
+            return
+        entry_id = self._devices.get(event.data["device_id"])
+        if entry_id is None or (member := self._members.get(entry_id)) is None:
+            return
+        self._async_set_groups(member, self._groups(member.entry))
+
+    @callback
+    def _async_set_groups(
+        self, member: FleetMember, groups: frozenset[GroupKey]
+    ) -> None:
+        """Move a heater's sample from the groups it was in to the given ones."""
+        for key in member.groups - groups:
+            totals = self.totals[key]
+            totals.add(member.sample, -1)
+            totals.members -= 1
+            if totals.members:
+                self._dirty.add(key)
+            else:
+                del self.totals[key]
+                self._dirty.discard(key)
+                async_dispatcher_send(self.hass, signal_group_removed(key))
+
+        for key in groups - member.groups:
+            if (totals := self.totals.get(key)) is None:
+                totals = self.totals[key] = FleetTotals(self._group_name(key))
+                async_dispatcher_send(self.hass, SIGNAL_GROUP_ADDED, key)
+            totals.add(member.sample)
+            totals.members += 1
+            self._dirty.add(key)
+
+        member.groups = groups
+
+    @callback
+    def _async_update(self, member: FleetMember) -> None:
+        """Replace a heater's sample in the sums of its groups."""
+        coordinator = member.entry.runtime_data.coordinator
+        if (
+            not coordinator.last_update_success
+            or coordinator.restored
+            or (data := coordinator.data) is None
+        ):
+            sample = OFFLINE
+        else:
+            sample = Sample(
+                1,
+                int(data.relay),
+                int(data.mode == TSmartMode.CRITICAL),
+                round(coordinator.temperature_for_mode(data) * 100),
+            )
+
+        if sample == member.sample:
+            return
+
+        for key in member.groups:
+            totals = self.totals[key]
+            totals.add(member.sample, -1)
+            totals.add(sample)
+        self._dirty.update(member.groups)
+        member.sample = sample
+
+    @callback
+    def _async_flush(self, now: datetime | None = None) -> None:
+        """Let the sensors of groups that changed write their state."""
+        dirty, self._dirty = self._dirty, set()
+        for key in dirty:
+            async_dispatcher_send(self.hass, signal_group_updated(key))
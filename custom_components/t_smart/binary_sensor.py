@@ -11,9 +11,13 @@ from homeassistant.components.binary_sensor import (
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity import EntityCategory
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.util import dt as dt_util
 
 from .common import TSmartConfigEntry
+from .const import CONF_DRAW_DETECTION, CONF_LEGIONELLA
+from .draw import DATA_DRAW
 from .entity import TSmartEntity
+from .legionella import DATA_LEGIONELLA
 from .tsmart import TSmartMode, TSmartStatus
 
 PARALLEL_UPDATES = 0
@@ -123,6 +127,12 @@ async def async_setup_entry(
         for description in BINARY_SENSORS
     )
 
+    if config_entry.data.get(CONF_LEGIONELLA):
+        entities.append(TSmartLegionellaOverdueBinarySensorEntity(coordinator))
+
+    if config_entry.data.get(CONF_DRAW_DETECTION):
+        entities.append(TSmartHotWaterDrawBinarySensorEntity(coordinator))
+
     async_add_entities(entities)
 
 
@@ -285,3 +295,54 @@ class TSmartBinarySensorEntity(TSmartEntity, BinarySensorEntity):
         if super_attrs:
             attrs.update(super_attrs)
         return attrs
+
+
+class TSmartLegionellaOverdueBinarySensorEntity(TSmartEntity, BinarySensorEntity):
+    """t_smart Legionella Cycle Overdue Binary Sensor class."""
+
+    _attr_translation_key = "legionella_overdue"
+    _attr_device_class = BinarySensorDeviceClass.PROBLEM
+
+    @property
+    def unique_id(self) -> str:
+        """Return a unique ID."""
+        return f"{self.device.device_id}_legionella_overdue"
+
+    @property
+    def available(self) -> bool:
+        """Return if the heater is being tracked."""
+        return (
+            super().available
+            and self.device.device_id in self.hass.data[DATA_LEGIONELLA].cycles
+        )
+
+    @property
+    def is_on(self) -> bool | None:
+        """Return true if no compliant cycle has completed in the last week."""
+        cycle = self.hass.data[DATA_LEGIONELLA].cycles[self.device.device_id]
+        return cycle.overdue(dt_util.utcnow())
+
+
+class TSmartHotWaterDrawBinarySensorEntity(TSmartEntity, BinarySensorEntity):
+    """t_smart Hot Water Draw Binary Sensor class."""
+
+    _attr_translation_key = "hot_water_draw"
+    _attr_device_class = BinarySensorDeviceClass.RUNNING
+
+    @property
+    def unique_id(self) -> str:
+        """Return a unique ID."""
+        return f"{self.device.device_id}_hot_water_draw"
+
+    @property
+    def available(self) -> bool:
+        """Return if draws are being detected."""
+        return (
+            super().available
+            and self.device.device_id in self.hass.data[DATA_DRAW].usage
+        )
+
+    @property
+    def is_on(self) -> bool | None:
+        """Return true while hot water is being drawn."""
+        return self.hass.data[DATA_DRAW].usage[self.device.device_id].draw is not None
@@ -6,11 +6,13 @@ import logging
 
 from homeassistant.components.button import ButtonEntity
 from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import HomeAssistantError
 from homeassistant.helpers.entity import EntityCategory
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
 from .common import TSmartConfigEntry
 from .entity import TSmartEntity
+from .tsmart import PRIORITY_CONTROL, TSmartUnsupportedError
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -43,7 +45,7 @@ class TSmartRestartButtonEntity(TSmartEntity, ButtonEntity):
     async def async_press(self) -> None:
         """Handle the button press."""
         _LOGGER.info("Restart button pressed for %s", self.device.name)
-        await self.device.async_restart(1000)
+        await self.device.async_restart(1000, priority=PRIORITY_CONTROL)
 
 
 class TSmartTimesyncButtonEntity(TSmartEntity, ButtonEntity):
@@ -62,4 +64,10 @@ class TSmartTimesyncButtonEntity(TSmartEntity, ButtonEntity):
     async def async_press(self) -> None:
         """Handle the button press."""
         _LOGGER.info("Timesync button pressed for %s", self.device.name)
-        await self.device.async_timesync()
+        try:
+            await self.device.async_timesync(priority=PRIORITY_CONTROL)
+        except TSmartUnsupportedError as err:
+            raise HomeAssistantError(
+                f"{self.device.name} doesn't answer time sync, firmware "
+                f"{err.firmware}"
+            ) from err
@@ -0,0 +1,52 @@
+"""Persistence of the commands each t_smart firmware answers."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+from homeassistant.util.hass_dict import HassKey
+
+from .const import DOMAIN, RESTORE_SAVE_DELAY
+from .tsmart import TSmartCapabilities
+
+DATA_CAPABILITIES: HassKey[TSmartCapabilityStore] = HassKey(f"{DOMAIN}_capabilities")
+
+STORAGE_VERSION = 1
+STORAGE_KEY = f"{DOMAIN}.capabilities"
+
+
+class TSmartCapabilityStore:
+    """Keeps the capabilities shared by every device over restarts.
+
+    Devices on the same firmware learn from each other, and the store is
+    saved a while after anything new is learned.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        self._store: Store[dict[str, dict[str, dict[str, Any]]]] = Store(
+            hass, STORAGE_VERSION, STORAGE_KEY
+        )
+        self.capabilities = TSmartCapabilities()
+        self._save_pending = False
+
+    async def async_load(self) -> None:
+        """Load what was learned before."""
+        self.capabilities = TSmartCapabilities.from_dict(
+            await self._store.async_load() or {}
+        )
+        self.capabilities.on_change = self._async_changed
+
+    @callback
+    def _async_changed(self) -> None:
+        """Schedule a save of the capabilities."""
+        if not self._save_pending:
+            self._save_pending = True
+            self._store.async_delay_save(self._data_to_save, RESTORE_SAVE_DELAY)
+
+    @callback
+    def _data_to_save(self) -> dict[str, dict[str, dict[str, Any]]]:
+        """Return the data to store."""
+        self._save_pending = False
+        return self.capabilities.as_dict()
@@ -1,6 +1,5 @@
 """Climate platform for t_smart."""
 
-import asyncio
 import logging
 
 from homeassistant.components.climate import (
@@ -33,7 +32,7 @@ from .const import (
     TEMPERATURE_MODE_HIGH,
     TEMPERATURE_MODE_LOW,
 )
-from .entity import TSmartEntity
+from .entity import TSmartEstimatedTemperatureEntity
 from .tsmart import TSmartMode
 
 PARALLEL_UPDATES = 0
@@ -49,8 +48,6 @@ PRESET_MAP = {
     PRESET_BOOST: TSmartMode.BOOST,
 }
 
-AFTER_SET_SLEEP = 2  # Seconds
-
 
 async def async_setup_entry(
     hass: HomeAssistant,
@@ -62,7 +59,7 @@ async def async_setup_entry(
     async_add_entities([TSmartClimateEntity(coordinator)])
 
 
-class TSmartClimateEntity(TSmartEntity, ClimateEntity):
+class TSmartClimateEntity(TSmartEstimatedTemperatureEntity, ClimateEntity):
     """t_smart Climate class."""
 
     _attr_temperature_unit = UnitOfTemperature.CELSIUS
@@ -121,12 +118,14 @@ class TSmartClimateEntity(TSmartEntity, ClimateEntity):
             self.target_temperature,
         )
 
-        await asyncio.sleep(AFTER_SET_SLEEP)
-        await self.coordinator.async_request_refresh()
+        await self.coordinator.async_confirm()
 
     @property
     def current_temperature(self):
         """Get the current temperature."""
+        if (estimate := self.estimate) is not None:
+            return round(estimate[0], 1)
+
         if self.coordinator.temperature_mode == TEMPERATURE_MODE_HIGH:
             return self.coordinator.data.temperature_high
 
@@ -154,8 +153,7 @@ class TSmartClimateEntity(TSmartEntity, ClimateEntity):
                 PRESET_MAP[self.preset_mode],
                 temperature,
             )
-            await asyncio.sleep(AFTER_SET_SLEEP)
-            await self.coordinator.async_request_refresh()
+            await self.coordinator.async_confirm()
 
         # Write updated temperature to HA state to avoid flapping
         self.async_write_ha_state()
@@ -176,8 +174,7 @@ class TSmartClimateEntity(TSmartEntity, ClimateEntity):
             PRESET_MAP[preset_mode],
             self.target_temperature,
         )
-        await asyncio.sleep(AFTER_SET_SLEEP)
-        await self.coordinator.async_request_refresh()
+        await self.coordinator.async_confirm()
 
     @property
     def extra_state_attributes(self) -> dict[str, str] | None:
@@ -2,12 +2,16 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import TYPE_CHECKING
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any
 
 from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
+from homeassistant.util.hass_dict import HassKey
 
-from .tsmart import TSmart
+from .const import CONF_NETWORK_THREAD, DOMAIN, MAX_IN_FLIGHT, MAX_SEND_RATE
+from .tsmart import TSmart, TSmartLimiter, TSmartThreadedTransport, TSmartTransport
 
 if TYPE_CHECKING:
     from .coordinator import TSmartCoordinator
@@ -15,10 +19,51 @@ if TYPE_CHECKING:
 
 @dataclass
 class TSmartData:
-    """T-Smart data type."""
+    """T-Smart data type.
+
+    applied_data is the entry data the running device was set up with, and
+    unsubs removes the device from the fleet features it is registered with.
+    """
 
     device: TSmart
     coordinator: TSmartCoordinator
+    applied_data: dict[str, Any] = field(default_factory=dict)
+    unsubs: dict[str, CALLBACK_TYPE] = field(default_factory=dict)
 
 
 type TSmartConfigEntry = ConfigEntry[TSmartData]
+
+DATA_TRANSPORT: HassKey[TSmartTransport | TSmartThreadedTransport] = HassKey(
+    f"{DOMAIN}_transport"
+)
+DATA_LIMITER: HassKey[TSmartLimiter] = HassKey(f"{DOMAIN}_limiter")
+
+
+@callback
+def async_get_transport(
+    hass: HomeAssistant,
+) -> TSmartTransport | TSmartThreadedTransport:
+    """Return the UDP transport shared by all devices.
+
+    It runs on a thread of its own when any device has the network thread
+    option set when it is created, so the option applies from the next start.
+    """
+    if (transport := hass.data.get(DATA_TRANSPORT)) is None:
+        if any(
+            entry.data.get(CONF_NETWORK_THREAD)
+            for entry in hass.config_entries.async_entries(DOMAIN)
+        ):
+            transport = TSmartThreadedTransport()
+        else:
+            transport = TSmartTransport()
+        hass.data[DATA_TRANSPORT] = transport
+        transport.max_in_flight = MAX_IN_FLIGHT
+        transport.rate = MAX_SEND_RATE
+
+        @callback
+        def _async_close(event: Event) -> None:
+            transport.close()
+
+        hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, _async_close)
+
+    return transport
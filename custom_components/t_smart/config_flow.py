@@ -19,9 +19,40 @@ from homeassistant.core import callback
 from homeassistant.data_entry_flow import FlowResult
 from homeassistant.helpers import selector
 
+from .common import async_get_transport
 from .const import (
+    CONF_COOL_THRESHOLD,
+    CONF_DEMAND_LIMITED,
     CONF_DEVICE_NAME,
+    CONF_DIVERSION_SETPOINT,
+    CONF_EXPORT_SENSOR,
+    CONF_HEATER_POWER,
+    CONF_DRAW_DETECTION,
+    CONF_INLET_TEMPERATURE,
+    CONF_INTERPOLATION,
+    CONF_INTERPOLATION_UNCERTAINTY,
+    CONF_LEGIONELLA,
+    CONF_LEGIONELLA_BOOST,
+    CONF_LEGIONELLA_DURATION,
+    CONF_LEGIONELLA_TEMPERATURE,
+    CONF_METRICS,
+    CONF_NETWORK_THREAD,
+    CONF_PREHEAT_READY_BY,
+    CONF_PREHEAT_TARGET,
+    CONF_TANK_VOLUME,
+    CONF_TARIFF_SENSOR,
     CONF_TEMPERATURE_MODE,
+    CONF_TIMESYNC,
+    DEFAULT_COOL_THRESHOLD,
+    DEFAULT_DIVERSION_SETPOINT,
+    DEFAULT_HEATER_POWER,
+    DEFAULT_INLET_TEMPERATURE,
+    DEFAULT_INTERPOLATION_UNCERTAINTY,
+    DEFAULT_LEGIONELLA_DURATION,
+    DEFAULT_LEGIONELLA_TEMPERATURE,
+    DEFAULT_PREHEAT_READY_BY,
+    DEFAULT_PREHEAT_TARGET,
+    DEFAULT_TANK_VOLUME,
     DOMAIN,
     TEMPERATURE_MODE_AVERAGE,
     TEMPERATURE_MODES,
@@ -99,7 +130,9 @@ class TSmartConfigFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
         """Discover an unconfigured TSmart thermostat."""
         self.discovery_info = None
 
-        devices: list[DiscoveredDevice] = await TSmart.async_discover()
+        devices: list[DiscoveredDevice] = await TSmart.async_discover(
+            transport=async_get_transport(self.hass)
+        )
 
         for device in devices:
             existing_entries = [
@@ -129,7 +162,9 @@ class TSmartConfigFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
 
         Abort if device_id already configured.
         """
-        device = TSmart(ip=data[CONF_IP_ADDRESS])
+        device = TSmart(
+            ip=data[CONF_IP_ADDRESS], transport=async_get_transport(self.hass)
+        )
 
         try:
             async with asyncio.timeout(TIMEOUT):
@@ -150,7 +185,10 @@ class TSmartConfigFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
 
         if user_input is not None:
             # Try to connect and do any error checking here
-            device = TSmart(ip=user_input[CONF_IP_ADDRESS])
+            device = TSmart(
+                ip=user_input[CONF_IP_ADDRESS],
+                transport=async_get_transport(self.hass),
+            )
 
             try:
                 async with asyncio.timeout(TIMEOUT):
@@ -220,7 +258,10 @@ class OptionsFlowHandler(OptionsFlow):
 
         if user_input is not None:
             # Try to connect and do any error checking here
-            device = TSmart(ip=user_input[CONF_IP_ADDRESS])
+            device = TSmart(
+                ip=user_input[CONF_IP_ADDRESS],
+                transport=async_get_transport(self.hass),
+            )
 
             try:
                 async with asyncio.timeout(TIMEOUT):
@@ -287,6 +328,136 @@ class OptionsFlowHandler(OptionsFlow):
                         mode=selector.SelectSelectorMode.DROPDOWN,
                     ),
                 ),
+                vol.Optional(
+                    CONF_COOL_THRESHOLD, default=DEFAULT_COOL_THRESHOLD
+                ): selector.NumberSelector(
+                    selector.NumberSelectorConfig(
+                        min=10,
+                        max=75,
+                        step=1,
+                        unit_of_measurement="°C",
+                        mode=selector.NumberSelectorMode.BOX,
+                    ),
+                ),
+                vol.Optional(CONF_TARIFF_SENSOR): selector.EntitySelector(
+                    selector.EntitySelectorConfig(domain="sensor"),
+                ),
+                vol.Optional(
+                    CONF_PREHEAT_TARGET, default=DEFAULT_PREHEAT_TARGET
+                ): selector.NumberSelector(
+                    selector.NumberSelectorConfig(
+                        min=10,
+                        max=75,
+                        step=5,
+                        unit_of_measurement="°C",
+                        mode=selector.NumberSelectorMode.BOX,
+                    ),
+                ),
+                vol.Optional(
+                    CONF_PREHEAT_READY_BY, default=DEFAULT_PREHEAT_READY_BY
+                ): selector.TimeSelector(),
+                vol.Optional(CONF_TIMESYNC, default=False): selector.BooleanSelector(),
+                vol.Optional(CONF_METRICS, default=False): selector.BooleanSelector(),
+                vol.Optional(
+                    CONF_DEMAND_LIMITED, default=False
+                ): selector.BooleanSelector(),
+                vol.Optional(
+                    CONF_HEATER_POWER, default=DEFAULT_HEATER_POWER
+                ): selector.NumberSelector(
+                    selector.NumberSelectorConfig(
+                        min=0.5,
+                        max=12,
+                        step=0.5,
+                        unit_of_measurement="kW",
+                        mode=selector.NumberSelectorMode.BOX,
+                    )
+                ),
+                vol.Optional(CONF_EXPORT_SENSOR): selector.EntitySelector(
+                    selector.EntitySelectorConfig(
+                        domain="sensor", device_class="power"
+                    ),
+                ),
+                vol.Optional(
+                    CONF_DIVERSION_SETPOINT, default=DEFAULT_DIVERSION_SETPOINT
+                ): selector.NumberSelector(
+                    selector.NumberSelectorConfig(
+                        min=15,
+                        max=75,
+                        step=5,
+                        unit_of_measurement="°C",
+                    )
+                ),
+                vol.Optional(
+                    CONF_LEGIONELLA, default=False
+                ): selector.BooleanSelector(),
+                vol.Optional(
+                    CONF_LEGIONELLA_TEMPERATURE, default=DEFAULT_LEGIONELLA_TEMPERATURE
+                ): selector.NumberSelector(
+                    selector.NumberSelectorConfig(
+                        min=50,
+                        max=75,
+                        step=1,
+                        unit_of_measurement="°C",
+                        mode=selector.NumberSelectorMode.BOX,
+                    )
+                ),
+                vol.Optional(
+                    CONF_LEGIONELLA_DURATION, default=DEFAULT_LEGIONELLA_DURATION
+                ): selector.NumberSelector(
+                    selector.NumberSelectorConfig(
+                        min=1,
+                        max=240,
+                        step=1,
+                        unit_of_measurement="min",
+                        mode=selector.NumberSelectorMode.BOX,
+                    )
+                ),
+                vol.Optional(
+                    CONF_LEGIONELLA_BOOST, default=False
+                ): selector.BooleanSelector(),
+                vol.Optional(
+                    CONF_DRAW_DETECTION, default=False
+                ): selector.BooleanSelector(),
+                vol.Optional(
+                    CONF_TANK_VOLUME, default=DEFAULT_TANK_VOLUME
+                ): selector.NumberSelector(
+                    selector.NumberSelectorConfig(
+                        min=30,
+                        max=500,
+                        step=5,
+                        unit_of_measurement="L",
+                        mode=selector.NumberSelectorMode.BOX,
+                    )
+                ),
+                vol.Optional(
+                    CONF_INLET_TEMPERATURE, default=DEFAULT_INLET_TEMPERATURE
+                ): selector.NumberSelector(
+                    selector.NumberSelectorConfig(
+                        min=0,
+                        max=30,
+                        step=1,
+                        unit_of_measurement="°C",
+                        mode=selector.NumberSelectorMode.BOX,
+                    )
+                ),
+                vol.Optional(
+                    CONF_INTERPOLATION, default=False
+                ): selector.BooleanSelector(),
+                vol.Optional(
+                    CONF_INTERPOLATION_UNCERTAINTY,
+                    default=DEFAULT_INTERPOLATION_UNCERTAINTY,
+                ): selector.NumberSelector(
+                    selector.NumberSelectorConfig(
+                        min=0.2,
+                        max=5,
+                        step=0.1,
+                        unit_of_measurement="°C",
+                        mode=selector.NumberSelectorMode.BOX,
+                    )
+                ),
+                vol.Optional(
+                    CONF_NETWORK_THREAD, default=False
+                ): selector.BooleanSelector(),
             }
         )
 
@@ -1,5 +1,7 @@
 """Constants for the T-Smart Thermostat integration."""
 
+from datetime import timedelta
+
 MIN_HA_VERSION = "2025.9"
 
 DOMAIN = "t_smart"
@@ -10,7 +12,80 @@ PRESET_SMART = "smart"
 PRESET_TIMER = "timer"
 
 CONF_DEVICE_NAME = "device_name"
+CONF_NETWORK_THREAD = "network_thread"
 CONF_TEMPERATURE_MODE = "temperature_mode"
+CONF_COOL_THRESHOLD = "cool_threshold"
+CONF_TARIFF_SENSOR = "tariff_sensor"
+CONF_PREHEAT_TARGET = "preheat_target"
+CONF_PREHEAT_READY_BY = "preheat_ready_by"
+CONF_TIMESYNC = "timesync"
+CONF_METRICS = "metrics"
+CONF_DEMAND_LIMITED = "demand_limited"
+CONF_HEATER_POWER = "heater_power"
+CONF_EXPORT_SENSOR = "export_sensor"
+CONF_DIVERSION_SETPOINT = "diversion_setpoint"
+CONF_LEGIONELLA = "legionella"
+CONF_LEGIONELLA_TEMPERATURE = "legionella_temperature"
+CONF_LEGIONELLA_DURATION = "legionella_duration"
+CONF_LEGIONELLA_BOOST = "legionella_boost"
+CONF_DRAW_DETECTION = "draw_detection"
+CONF_TANK_VOLUME = "tank_volume"
+CONF_INLET_TEMPERATURE = "inlet_temperature"
+CONF_INTERPOLATION = "interpolation"
+CONF_INTERPOLATION_UNCERTAINTY = "interpolation_uncertainty"
+
+UPDATE_INTERVAL = timedelta(seconds=10)
+FAST_POLL_INTERVAL = timedelta(seconds=2)
+INTERPOLATED_POLL_INTERVAL = timedelta(minutes=2)
+DEFAULT_INTERPOLATION_UNCERTAINTY = 0.5  # °C
+MAX_IN_FLIGHT = 8  # Requests outstanding across all devices
+MAX_SEND_RATE = 20  # Datagrams per second across all devices
+RESTORE_SAVE_DELAY = 60  # Seconds
+HOLD_CONFIRM_DELAY = 15  # Seconds for a command to show in the status
+HOLD_RELEASE_RETRY = timedelta(minutes=1)
+
+DEFAULT_COOL_THRESHOLD = 40  # °C
+
+PREDICTION_TOLERANCE = 2  # Minutes
+
+DEFAULT_PREHEAT_TARGET = 60  # °C
+DEFAULT_PREHEAT_READY_BY = "07:00:00"
+DEFAULT_HEATING_RATE = 0.4 / 60  # °C per second, a 3 kW element in a 100 l tank
+PREHEAT_STAGGER = 5  # Seconds between heaters in a batch
+PREHEAT_REPLAN_INTERVAL = timedelta(minutes=15)
+
+DEFAULT_HEATER_POWER = 3.0  # kW
+DEFAULT_SETBACK_TEMPERATURE = 10  # °C
+DEMAND_CONFIRM_DELAY = 15  # Seconds for a command to show in the status
+DEMAND_MIN_DWELL = 300  # Seconds
+DEMAND_ROTATION_INTERVAL = 1200  # Seconds
+DEMAND_COMMAND_RETRY = 60  # Seconds before resending a failed command
+
+DEFAULT_DIVERSION_SETPOINT = 70  # °C
+DIVERSION_HYSTERESIS = 200  # W
+DIVERSION_MIN_ON = 300  # Seconds
+DIVERSION_MIN_OFF = 300  # Seconds
+DIVERSION_MAX_COMMANDS = 2  # Per heater per minute
+
+DEFAULT_LEGIONELLA_TEMPERATURE = 60  # °C
+DEFAULT_LEGIONELLA_DURATION = 60  # Minutes
+LEGIONELLA_PERIOD = timedelta(days=7)
+LEGIONELLA_MAX_GAP = timedelta(minutes=5)  # Longest gap between statuses counted
+LEGIONELLA_BOOST_RETRY = timedelta(hours=6)
+
+DEFAULT_TANK_VOLUME = 150  # Litres
+DEFAULT_INLET_TEMPERATURE = 10  # °C
+WATER_HEAT_CAPACITY = 4.186  # kJ per litre per °C
+DRAW_START_DROP = 1.0  # °C fall of the bottom sensor between statuses
+DRAW_HIGH_STEADY = 0.5  # °C the top sensor may move as a draw starts
+DRAW_NOISE = 0.2  # °C the bottom sensor may move without the draw changing
+DRAW_END_QUIET = timedelta(seconds=30)  # Without the bottom sensor falling
+DRAW_MAX_DURATION = timedelta(minutes=30)
+DRAW_MAX_GAP = timedelta(seconds=30)  # Longest gap between statuses compared
+
+TIMESYNC_INTERVAL = timedelta(hours=6)
+TIMESYNC_STAGGER = 0.5  # Seconds between devices
+TIMESYNC_STARTUP_DELAY = 60  # Seconds
 
 TEMPERATURE_MODE_HIGH = "temperature_mode_high"
 TEMPERATURE_MODE_LOW = "temperature_mode_low"
@@ -25,3 +100,30 @@ TEMPERATURE_MODES = [
 ATTR_TEMPERATURE_LOW = "temperature_low"
 ATTR_TEMPERATURE_HIGH = "temperature_high"
 ATTR_TEMPERATURE_AVERAGE = "temperature_average"
+
+ATTR_RESTORED = "restored"
+ATTR_UNCERTAINTY = "uncertainty"
+
+ATTR_POWER = "power"
+ATTR_MAX_CONCURRENT = "max_concurrent"
+ATTR_STAGGER = "stagger"
+ATTR_MAX_FAILURE_RATE = "max_failure_rate"
+ATTR_RECOVERY_TIMEOUT = "recovery_timeout"
+ATTR_DURATION = "duration"
+ATTR_CYCLES = "cycles"
+ATTR_MAX_RELAYS = "max_relays"
+ATTR_MAX_POWER = "max_power"
+ATTR_SETBACK_TEMPERATURE = "setback_temperature"
+ATTR_ENABLED = "enabled"
+ATTR_FRAME_RATE = "frame_rate"
+
+SERVICE_SET_FLEET = "set_fleet"
+SERVICE_ROLLING_RESTART = "rolling_restart"
+SERVICE_CAPTURE_TRAFFIC = "capture_traffic"
+SERVICE_PROFILE = "profile"
+SERVICE_SET_DEMAND_LIMIT = "set_demand_limit"
+SERVICE_SET_TRACE = "set_trace"
+
+RESTART_OFFSET = 1000  # Milliseconds
+RECOVERY_POLL_INTERVAL = 2  # Seconds
+RESTART_SETTLE = 10  # Seconds after the restart before any answer counts
@@ -1,23 +1,53 @@
 """DataUpdateCoordinator for thermostats."""
 
 import logging
-from datetime import timedelta
+import time
+from datetime import datetime
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.update_coordinator import (
     DataUpdateCoordinator,
     UpdateFailed,
 )
+from homeassistant.util import dt as dt_util
 
-from .const import DOMAIN
-from .tsmart import TSmart, TSmartStatus
+from .const import (
+    DOMAIN,
+    TEMPERATURE_MODE_HIGH,
+    TEMPERATURE_MODE_LOW,
+)
+from .estimator import TSmartEstimator
+from .faults import EVENT_FAULT, FaultTransition, fault_transitions
+from .predictor import TSmartPredictor
+from .profiling import PHASE_LISTENERS
+from .restore import DATA_RESTORE
+from .tsmart import (
+    PRIORITY_CONFIRM,
+    PRIORITY_POLL,
+    TSmart,
+    TSmartShedError,
+    TSmartStatus,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
+AFTER_SET_SLEEP = 2  # Seconds
+
 
 class TSmartCoordinator(DataUpdateCoordinator[TSmartStatus]):
-    """Manages polling for state changes from the device."""
+    """Manages polling for state changes from the device.
+
+    Polls are triggered by the fleet's poll scheduler rather than an update
+    interval, so devices are spread over the interval. Those are routine
+    polls, which give way to commands and are skipped when the device is
+    busy, while other refreshes confirm a change and are never skipped.
+    polled_at is when the last status was received from the device, which
+    doesn't move when listeners are updated with a status kept from before.
+
+    Waits and sample times are taken from the device's clock, so a
+    coordinator whose device replays a recording runs on its virtual clock.
+    """
 
     device: TSmart
     config_entry: ConfigEntry
@@ -28,6 +58,7 @@ class TSmartCoordinator(DataUpdateCoordinator[TSmartStatus]):
         config_entry: ConfigEntry,
         device: TSmart,
         temperature_mode: str,
+        cool_threshold: float,
     ) -> None:
         """Initialize the data update coordinator."""
 
@@ -35,19 +66,95 @@ class TSmartCoordinator(DataUpdateCoordinator[TSmartStatus]):
         self._attr_unique_id = self.device.device_id
 
         self.temperature_mode = temperature_mode
+        self.cool_threshold = cool_threshold
+        self.predictor = TSmartPredictor()
+        self.estimator = TSmartEstimator(self.predictor)
+        self.restored = False
+        self.polled_at: datetime | None = None
+        self.faults: list[FaultTransition] = []
+        self._priority = PRIORITY_CONFIRM
 
         super().__init__(
             hass,
             _LOGGER,
             name=f"{DOMAIN}-{self.device.device_id}",
-            update_interval=timedelta(seconds=10),
+            update_interval=None,
             config_entry=config_entry,
         )
 
     async def _async_update_data(self) -> TSmartStatus:
         """Update the state of the device."""
         # Get device status
-        status = await self.device.async_get_status()
+        try:
+            status = await self.device.async_get_status(self._priority)
+        except TSmartShedError as err:
+            if self.data is None or not self.last_update_success:
+                raise UpdateFailed(f"Device {self.device.name} is busy") from err
+            _LOGGER.debug("%s: Skipped poll, device busy", self.device.name)
+            return self.data
         if not status:
             raise UpdateFailed(f"Unsuccessful request to device {self.device.name}")
+
+        # The estimator scores the previous fit before the predictor refits
+        timestamp = self.device.monotonic()
+        temperature = self.temperature_for_mode(status)
+        self.estimator.add_sample(
+            timestamp, temperature, relay=status.relay, setpoint=status.setpoint
+        )
+        self.predictor.add_sample(timestamp, temperature, relay=status.relay)
+        self.restored = False
+        self.polled_at = dt_util.utcnow()
+        self.hass.data[DATA_RESTORE].async_save(self.device, self.device.status_frame)
+
+        # Errors and warnings rarely change, so they are reported as events
+        # only when they do
+        self.faults = fault_transitions(self.data, status) if self.data else []
+        for fault in self.faults:
+            _LOGGER.debug("%s: %s %s", self.device.name, fault.code, fault.type)
+            self.hass.bus.async_fire(
+                EVENT_FAULT,
+                {
+                    "device_id": self.device.device_id,
+                    "name": self.device.name,
+                    "type": fault.type,
+                    **fault.as_dict(),
+                },
+            )
         return status
+
+    async def async_poll(self) -> None:
+        """Refresh as a routine poll."""
+        self._priority = PRIORITY_POLL
+        try:
+            await self.async_refresh()
+        finally:
+            self._priority = PRIORITY_CONFIRM
+
+    async def async_confirm(self) -> None:
+        """Refresh once the device has had time to apply a command."""
+        await self.device.async_sleep(AFTER_SET_SLEEP)
+        await self.async_request_refresh()
+
+    @callback
+    def async_set_restored(self, status: TSmartStatus) -> None:
+        """Use the last known status until the first refresh succeeds."""
+        self.data = status
+        self.restored = True
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Update all registered listeners, timing the fan-out."""
+        start = time.perf_counter()
+        super().async_update_listeners()
+        if self.device.profiler is not None:
+            self.device.profiler.add(PHASE_LISTENERS, time.perf_counter() - start)
+
+    def temperature_for_mode(self, status: TSmartStatus) -> float:
+        """Return the temperature selected by the configured temperature mode."""
+        if self.temperature_mode == TEMPERATURE_MODE_HIGH:
+            return status.temperature_high
+
+        if self.temperature_mode == TEMPERATURE_MODE_LOW:
+            return status.temperature_low
+
+        return status.temperature_average
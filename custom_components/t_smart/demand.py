@@ -0,0 +1,317 @@
+"""Fleet demand limiting for t_smart heaters."""
+
+from __future__ import annotations
+
+import logging
+import time
+from dataclasses import asdict, dataclass
+from typing import Any
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+from homeassistant.util.hass_dict import HassKey
+
+from .common import TSmartConfigEntry
+from .const import (
+    CONF_HEATER_POWER,
+    DEFAULT_HEATER_POWER,
+    DEFAULT_SETBACK_TEMPERATURE,
+    DEMAND_COMMAND_RETRY,
+    DEMAND_CONFIRM_DELAY,
+    DEMAND_MIN_DWELL,
+    DEMAND_ROTATION_INTERVAL,
+    DOMAIN,
+)
+from .holds import DATA_HOLDS, OWNER_DEMAND
+from .tsmart import TSmartMode
+
+_LOGGER = logging.getLogger(__name__)
+
+DATA_DEMAND: HassKey[TSmartDemandLimiter] = HassKey(f"{DOMAIN}_demand")
+
+STORAGE_VERSION = 1
+STORAGE_KEY = f"{DOMAIN}.demand"
+
+COMMAND_HOLD = "hold"
+COMMAND_RELEASE = "release"
+
+
+@dataclass(slots=True)
+class DemandSettings:
+    """Fleet load budget, either limit may be unset."""
+
+    max_relays: int | None = None
+    max_power: float | None = None  # kW
+    setback: float = DEFAULT_SETBACK_TEMPERATURE
+
+
+@dataclass(slots=True, eq=False)
+class ManagedHeater:
+    """A heater under demand control.
+
+    held is whether the heater is held at the setback temperature, and since
+    when it was last held or released. pending marks a released heater whose
+    relay hasn't been reported yet, which is counted as on. command is the
+    command in flight, whose outcome is assumed when counting the load, and
+    retry_after is when a heater whose command failed may be sent another.
+    """
+
+    entry: TSmartConfigEntry
+    power: float
+    held: bool = False
+    since: float = 0
+    pending: bool = False
+    command: str | None = None
+    retry_after: float = 0
+
+
+class TSmartDemandLimiter:
+    """Keeps the fleet's heating load within a budget.
+
+    Evaluated whenever a managed heater's coordinator updates. Heaters are
+    held at the setback temperature when the budget would be exceeded, longest
+    heating first, and released when their load fits again, longest held
+    first. While heaters are held and the budget is full, the longest heating
+    one is swapped for the longest held one once it has heated for the
+    rotation interval, so each gets its turn. A heater is only swapped in after
+    being held for a minimum dwell, so rotation never flaps. A heater whose
+    command fails is left alone for a minute before it is sent another.
+
+    Heaters are held through the fleet's holds, which come before any other
+    feature's, and which restore them.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        self.hass = hass
+        self.settings = DemandSettings()
+        self._store: Store[dict[str, Any]] = Store(hass, STORAGE_VERSION, STORAGE_KEY)
+        self._heaters: dict[str, ManagedHeater] = {}
+        self._evaluate_scheduled = False
+
+    async def async_load(self) -> None:
+        """Load the settings."""
+        if (data := await self._store.async_load()) is not None:
+            self.settings = DemandSettings(**data["settings"])
+
+    @callback
+    def async_add_entry(self, entry: TSmartConfigEntry) -> CALLBACK_TYPE:
+        """Put a heater under demand control."""
+        device = entry.runtime_data.device
+        holds = self.hass.data[DATA_HOLDS]
+        heater = self._heaters[entry.entry_id] = ManagedHeater(
+            entry,
+            entry.data.get(CONF_HEATER_POWER, DEFAULT_HEATER_POWER),
+            held=holds.owner(device.device_id) == OWNER_DEMAND,
+            since=time.monotonic(),
+        )
+
+        @callback
+        def _async_updated() -> None:
+            self._async_heater_updated(heater)
+
+        unsub = entry.runtime_data.coordinator.async_add_listener(_async_updated)
+        self._async_schedule_evaluate()
+
+        @callback
+        def _remove() -> None:
+            unsub()
+            self._heaters.pop(entry.entry_id, None)
+            # Held heaters are restored when control is turned off, but stay
+            # held over a restart so they are picked up again
+            if heater.held and heater.command is None and self.hass.is_running:
+                self._async_command(heater, COMMAND_RELEASE)
+            self._async_schedule_evaluate()
+
+        return _remove
+
+    async def async_configure(
+        self, max_relays: int | None, max_power: float | None, setback: float
+    ) -> dict[str, Any]:
+        """Change the budget, returning the state of the fleet."""
+        self.settings = DemandSettings(max_relays, max_power, setback)
+        self._async_save()
+        self._async_schedule_evaluate()
+        return self.as_dict()
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the settings and the state of every managed heater."""
+        return {
+            "settings": asdict(self.settings),
+            "heaters": {
+                heater.entry.runtime_data.device.device_id: self.heater_as_dict(heater)
+                for heater in self._heaters.values()
+            },
+        }
+
+    def heater_as_dict(self, heater: ManagedHeater) -> dict[str, Any]:
+        """Return the state of a managed heater."""
+        return {
+            "name": heater.entry.runtime_data.device.name,
+            "power": heater.power,
+            "held": heater.held,
+            "seconds_in_state": round(time.monotonic() - heater.since),
+        }
+
+    def entry_as_dict(self, entry_id: str) -> dict[str, Any] | None:
+        """Return the state of a heater for diagnostics."""
+        heater = self._heaters.get(entry_id)
+        return self.heater_as_dict(heater) if heater else None
+
+    @callback
+    def _async_heater_updated(self, heater: ManagedHeater) -> None:
+        """Take note of a new status, then re-evaluate."""
+        if heater.command is None:
+            if time.monotonic() - heater.since > DEMAND_CONFIRM_DELAY:
+                heater.pending = False
+            device_id = heater.entry.runtime_data.device.device_id
+            if heater.held and self.hass.data[DATA_HOLDS].owner(device_id) != (
+                OWNER_DEMAND
+            ):
+                # The hold was let go of, see TSmartHolds
+                self._async_set_held(heater, held=False)
+
+        self._async_schedule_evaluate()
+
+    @callback
+    def _async_schedule_evaluate(self) -> None:
+        """Evaluate once the current burst of updates has been handled."""
+        if not self._evaluate_scheduled:
+            self._evaluate_scheduled = True
+            self.hass.loop.call_soon(self._async_evaluate)
+
+    @callback
+    def _async_evaluate(self) -> None:
+        """Hold or release heaters to keep within the budget."""
+        self._evaluate_scheduled = False
+        settings = self.settings
+        now = time.monotonic()
+        heaters = [
+            heater
+            for heater in self._heaters.values()
+            if heater.command is None and now >= heater.retry_after
+        ]
+
+        if settings.max_relays is None and settings.max_power is None:
+            for heater in heaters:
+                if heater.held:
+                    self._async_command(heater, COMMAND_RELEASE)
+            return
+
+        relays = 0
+        load = 0.0
+        heating: list[ManagedHeater] = []
+        for heater in self._heaters.values():
+            if heater.command == COMMAND_RELEASE or (
+                heater.command is None
+                and not heater.held
+                and (heater.pending or heater.entry.runtime_data.coordinator.data.relay)
+            ):
+                relays += 1
+                load += heater.power
+                if heater.command is None and now >= heater.retry_after:
+                    heating.append(heater)
+        held = [heater for heater in heaters if heater.held]
+        heating.sort(key=lambda heater: heater.since)
+        held.sort(key=lambda heater: heater.since)
+
+        def _fits(extra_relays: int, extra_load: float) -> bool:
+            return (
+                settings.max_relays is None
+                or relays + extra_relays <= settings.max_relays
+            ) and (
+                settings.max_power is None or load + extra_load <= settings.max_power
+            )
+
+        # Over budget, hold heaters regardless of how long they've been on
+        while heating and not _fits(0, 0):
+            heater = heating.pop(0)
+            relays -= 1
+            load -= heater.power
+            self._async_command(heater, COMMAND_HOLD)
+
+        # Release held heaters that fit
+        for heater in list(held):
+            if _fits(1, heater.power):
+                held.remove(heater)
+                relays += 1
+                load += heater.power
+                self._async_command(heater, COMMAND_RELEASE)
+
+        # Give the longest held heater a turn
+        if held and heating:
+            heater_out = heating[0]
+            heater_in = held[0]
+            if (
+                now - heater_out.since >= DEMAND_ROTATION_INTERVAL
+                and now - heater_in.since >= DEMAND_MIN_DWELL
+                and _fits(0, heater_in.power - heater_out.power)
+            ):
+                self._async_command(heater_out, COMMAND_HOLD)
+                self._async_command(heater_in, COMMAND_RELEASE)
+
+    @callback
+    def _async_command(self, heater: ManagedHeater, command: str) -> None:
+        """Send a command to a heater in the background."""
+        heater.command = command
+        self.hass.async_create_background_task(
+            self._async_hold(heater)
+            if command == COMMAND_HOLD
+            else self._async_release(heater),
+            f"{DOMAIN} demand {command}",
+        )
+
+    async def _async_hold(self, heater: ManagedHeater) -> None:
+        """Hold a heater at the setback temperature."""
+        entry = heater.entry
+        try:
+            if await self.hass.data[DATA_HOLDS].async_hold(
+                entry,
+                OWNER_DEMAND,
+                power=entry.runtime_data.coordinator.data.power,
+                mode=TSmartMode.MANUAL,
+                setpoint=self.settings.setback,
+            ):
+                _LOGGER.debug("%s: Held for demand limit", entry.title)
+                self._async_set_held(heater, held=True)
+            else:
+                self._async_retry_later(heater)
+        finally:
+            heater.command = None
+
+    async def _async_release(self, heater: ManagedHeater) -> None:
+        """Restore the mode and setpoint of a held heater."""
+        entry = heater.entry
+        try:
+            if await self.hass.data[DATA_HOLDS].async_release(entry, OWNER_DEMAND):
+                _LOGGER.debug("%s: Released from demand limit", entry.title)
+                self._async_set_held(heater, held=False)
+                heater.pending = True
+            elif self.hass.data[DATA_HOLDS].owner(
+                entry.runtime_data.device.device_id
+            ) == OWNER_DEMAND:
+                self._async_retry_later(heater)
+            else:
+                self._async_set_held(heater, held=False)
+        finally:
+            heater.command = None
+
+    @callback
+    def _async_retry_later(self, heater: ManagedHeater) -> None:
+        """Back off from a heater that didn't acknowledge a command."""
+        _LOGGER.debug(
+            "%s: Demand limit command failed, retrying in %ds",
+            heater.entry.runtime_data.device.name,
+            DEMAND_COMMAND_RETRY,
+        )
+        heater.retry_after = time.monotonic() + DEMAND_COMMAND_RETRY
+
+    @callback
+    def _async_set_held(self, heater: ManagedHeater, *, held: bool) -> None:
+        """Record whether a heater is held."""
+        heater.held = held
+        heater.since = time.monotonic()
+
+    @callback
+    def _async_save(self) -> None:
+        """Store the settings."""
+        self._store.async_delay_save(lambda: {"settings": asdict(self.settings)}, 1)
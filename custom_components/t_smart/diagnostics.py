@@ -2,12 +2,26 @@
 
 from __future__ import annotations
 
+from dataclasses import asdict
 from typing import Any
 
 from homeassistant.components.diagnostics import async_redact_data
 from homeassistant.core import HomeAssistant
 
-from .common import TSmartConfigEntry
+from .capabilities import DATA_CAPABILITIES
+from .common import DATA_LIMITER, TSmartConfigEntry
+from .demand import DATA_DEMAND
+from .diversion import DATA_DIVERSION
+from .draw import DATA_DRAW
+from .holds import DATA_HOLDS
+from .interpolation import DATA_INTERPOLATION
+from .legionella import DATA_LEGIONELLA
+from .maintenance import DATA_MAINTENANCE
+from .polling import DATA_POLLING
+from .profiling import DATA_PROFILER
+from .scheduler import DATA_PREHEAT_SCHEDULER
+from .tracing import DATA_TRACER
+from .tsmart.capabilities import firmware_key
 
 TO_REDACT = {"ip_address"}
 
@@ -18,6 +32,9 @@ async def async_get_config_entry_diagnostics(
     """Return diagnostics for a config entry."""
     device = entry.runtime_data.device
     data = entry.runtime_data.coordinator.data
+    plan = hass.data[DATA_PREHEAT_SCHEDULER].plans.get(entry.entry_id)
+    timesync = hass.data[DATA_MAINTENANCE].timesync.get(device.device_id)
+    capabilities = hass.data[DATA_CAPABILITIES].capabilities
 
     return {
         "entry": {
@@ -28,6 +45,7 @@ async def async_get_config_entry_diagnostics(
         "device": {
             "firmware_name": device.firmware_name,
             "firmware_version": device.firmware_version,
+            "restored": entry.runtime_data.coordinator.restored,
             "power": data.power,
             "mode": data.mode.name if data.mode is not None else None,
             "setpoint": data.setpoint,
@@ -52,4 +70,27 @@ async def async_get_config_entry_diagnostics(
             "w03": data.w03,
             "w03_count": data.w03_count,
         },
+        "preheat": {
+            "start": plan.start.isoformat(),
+            "ready_by": plan.ready_by.isoformat(),
+            "setpoint": plan.setpoint,
+            "cost": plan.cost,
+        }
+        if plan
+        else None,
+        "capabilities": capabilities.firmware_as_dict(
+            firmware_key(device.firmware_name, device.firmware_version)
+        ),
+        "requests": asdict(device.stats),
+        "limiter": hass.data[DATA_LIMITER].device_as_dict(device.ip),
+        "polling": hass.data[DATA_POLLING].entry_as_dict(entry.entry_id),
+        "interpolation": hass.data[DATA_INTERPOLATION].entry_as_dict(entry.entry_id),
+        "hold": hass.data[DATA_HOLDS].device_as_dict(device.device_id),
+        "demand": hass.data[DATA_DEMAND].entry_as_dict(entry.entry_id),
+        "diversion": hass.data[DATA_DIVERSION].entry_as_dict(entry.entry_id),
+        "legionella": hass.data[DATA_LEGIONELLA].device_as_dict(device.device_id),
+        "hot_water": hass.data[DATA_DRAW].device_as_dict(device.device_id),
+        "timings": hass.data[DATA_PROFILER].percentiles(),
+        "timesync": timesync.as_dict() if timesync else None,
+        "trace": hass.data[DATA_TRACER].records_as_dict(device.ip),
     }
@@ -0,0 +1,227 @@
+"""Solar surplus diversion for t_smart heaters."""
+
+from __future__ import annotations
+
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any
+
+from homeassistant.const import ATTR_UNIT_OF_MEASUREMENT, UnitOfPower
+from homeassistant.core import (
+    CALLBACK_TYPE,
+    Event,
+    EventStateChangedData,
+    HomeAssistant,
+    callback,
+)
+from homeassistant.helpers.event import async_track_state_change_event
+from homeassistant.util.hass_dict import HassKey
+
+from .common import TSmartConfigEntry
+from .const import (
+    CONF_DIVERSION_SETPOINT,
+    CONF_EXPORT_SENSOR,
+    CONF_HEATER_POWER,
+    DEFAULT_DIVERSION_SETPOINT,
+    DEFAULT_HEATER_POWER,
+    DIVERSION_HYSTERESIS,
+    DIVERSION_MAX_COMMANDS,
+    DIVERSION_MIN_OFF,
+    DIVERSION_MIN_ON,
+    DOMAIN,
+)
+from .holds import DATA_HOLDS, OWNER_DIVERSION
+from .tsmart import TSmartMode
+
+_LOGGER = logging.getLogger(__name__)
+
+DATA_DIVERSION: HassKey[TSmartDiversion] = HassKey(f"{DOMAIN}_diversion")
+
+
+@dataclass(slots=True, eq=False)
+class DivertingHeater:
+    """A heater soaking up surplus power.
+
+    diverting is whether the heater is held for diversion, and since when
+    diversion last started or stopped. commands are the times of the commands
+    sent in the last minute.
+    """
+
+    entry: TSmartConfigEntry
+    diverting: bool = False
+    since: float = float("-inf")
+    commands: deque[float] = field(default_factory=deque)
+    busy: bool = False
+
+
+class TSmartDiversion:
+    """Raises heaters' setpoints while the grid export sensor shows a surplus.
+
+    Diversion starts once the export exceeds the heater's power by the
+    hysteresis, and stops once power is imported by more than the hysteresis,
+    each after a minimum time in the other state. Commands are only sent when
+    they would switch the relay, and at most a few a minute per heater, so
+    noisy power sensors don't flood the devices.
+
+    Heaters are held through the fleet's holds, so diversion gives way to any
+    other feature that takes a heater over.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        self.hass = hass
+        self._heaters: dict[str, DivertingHeater] = {}
+
+    @callback
+    def async_add_entry(self, entry: TSmartConfigEntry) -> CALLBACK_TYPE:
+        """Start diverting surplus to a heater."""
+        device = entry.runtime_data.device
+        heater = self._heaters[entry.entry_id] = DivertingHeater(
+            entry,
+            diverting=self.hass.data[DATA_HOLDS].owner(device.device_id)
+            == OWNER_DIVERSION,
+        )
+
+        @callback
+        def _async_evaluate(event: Event[EventStateChangedData] | None = None) -> None:
+            self._async_evaluate(heater)
+
+        unsubs = [
+            async_track_state_change_event(
+                self.hass, entry.data[CONF_EXPORT_SENSOR], _async_evaluate
+            ),
+            entry.runtime_data.coordinator.async_add_listener(_async_evaluate),
+        ]
+
+        @callback
+        def _remove() -> None:
+            for unsub in unsubs:
+                unsub()
+            self._heaters.pop(entry.entry_id, None)
+            # Heaters stop diverting when it is turned off, but carry on over a
+            # restart so they are picked up again
+            if heater.diverting and not heater.busy and self.hass.is_running:
+                self.hass.async_create_background_task(
+                    self._async_stop(heater), f"{DOMAIN} diversion stop"
+                )
+
+        return _remove
+
+    def entry_as_dict(self, entry_id: str) -> dict[str, Any] | None:
+        """Return the state of a heater for diagnostics."""
+        if (heater := self._heaters.get(entry_id)) is None:
+            return None
+        return {
+            "diverting": heater.diverting,
+            "commands_last_minute": len(heater.commands),
+        }
+
+    def _export(self, entry: TSmartConfigEntry) -> float | None:
+        """Return the exported power in W, or None if it isn't known."""
+        state = self.hass.states.get(entry.data[CONF_EXPORT_SENSOR])
+        if state is None:
+            return None
+        try:
+            value = float(state.state)
+        except ValueError:
+            return None
+        if state.attributes.get(ATTR_UNIT_OF_MEASUREMENT) == UnitOfPower.KILO_WATT:
+            return value * 1000
+        return value
+
+    @callback
+    def _async_evaluate(self, heater: DivertingHeater) -> None:
+        """Start or stop diverting if the relay would switch."""
+        coordinator = heater.entry.runtime_data.coordinator
+        if heater.busy or (data := coordinator.data) is None:
+            return
+
+        entry = heater.entry
+        holds = self.hass.data[DATA_HOLDS]
+        device_id = entry.runtime_data.device.device_id
+        now = time.monotonic()
+        setpoint = entry.data.get(CONF_DIVERSION_SETPOINT, DEFAULT_DIVERSION_SETPOINT)
+        temperature = coordinator.temperature_for_mode(data)
+
+        hold = holds.holds.get(device_id)
+        if heater.diverting and (hold is None or hold.owner != OWNER_DIVERSION):
+            # The hold was let go of or taken over, see TSmartHolds
+            self._async_set_diverting(heater, diverting=False)
+            return
+
+        export = self._export(entry)
+        power = entry.data.get(CONF_HEATER_POWER, DEFAULT_HEATER_POWER) * 1000
+
+        if hold is None or not heater.diverting:
+            if (
+                export is not None
+                and export >= power + DIVERSION_HYSTERESIS
+                and now - heater.since >= DIVERSION_MIN_OFF
+                # Raising the setpoint only matters if it switches the relay on
+                and not data.relay
+                and temperature < setpoint
+                and holds.can_hold(device_id, OWNER_DIVERSION)
+                and self._async_allow_command(heater, now)
+            ):
+                heater.busy = True
+                self.hass.async_create_background_task(
+                    self._async_start(heater, setpoint), f"{DOMAIN} diversion start"
+                )
+            return
+
+        restore_power, _, restore_setpoint = hold.restore
+        if (
+            (export is None or export < -DIVERSION_HYSTERESIS)
+            and now - heater.since >= DIVERSION_MIN_ON
+            # Restoring only matters if it switches the relay off
+            and data.relay
+            and (not restore_power or temperature >= restore_setpoint)
+            and self._async_allow_command(heater, now)
+        ):
+            heater.busy = True
+            self.hass.async_create_background_task(
+                self._async_stop(heater), f"{DOMAIN} diversion stop"
+            )
+
+    @callback
+    def _async_allow_command(self, heater: DivertingHeater, now: float) -> bool:
+        """Count a command against the rate limit, unless it has been reached."""
+        while heater.commands and now - heater.commands[0] >= 60:
+            heater.commands.popleft()
+        if len(heater.commands) >= DIVERSION_MAX_COMMANDS:
+            return False
+        heater.commands.append(now)
+        return True
+
+    async def _async_start(self, heater: DivertingHeater, setpoint: float) -> None:
+        """Raise the setpoint to soak up the surplus."""
+        entry = heater.entry
+        try:
+            if await self.hass.data[DATA_HOLDS].async_hold(
+                entry,
+                OWNER_DIVERSION,
+                power=True,
+                mode=TSmartMode.MANUAL,
+                setpoint=setpoint,
+            ):
+                _LOGGER.debug("%s: Diverting surplus", entry.title)
+                self._async_set_diverting(heater, diverting=True)
+        finally:
+            heater.busy = False
+
+    async def _async_stop(self, heater: DivertingHeater) -> None:
+        """Go back to the power, mode and setpoint from before diverting."""
+        entry = heater.entry
+        try:
+            if await self.hass.data[DATA_HOLDS].async_release(entry, OWNER_DIVERSION):
+                _LOGGER.debug("%s: Stopped diverting surplus", entry.title)
+                self._async_set_diverting(heater, diverting=False)
+        finally:
+            heater.busy = False
+
+    @callback
+    def _async_set_diverting(self, heater: DivertingHeater, *, diverting: bool) -> None:
+        """Record whether a heater is diverting."""
+        heater.diverting = diverting
+        heater.since = time.monotonic()
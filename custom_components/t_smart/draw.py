@@ -0,0 +1,279 @@
+"""Hot water draw detection for t_smart heaters."""
+
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Any
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+from homeassistant.util.hass_dict import HassKey
+
+from .common import TSmartConfigEntry
+from .const import (
+    CONF_INLET_TEMPERATURE,
+    CONF_TANK_VOLUME,
+    DEFAULT_INLET_TEMPERATURE,
+    DEFAULT_TANK_VOLUME,
+    DOMAIN,
+    DRAW_END_QUIET,
+    DRAW_HIGH_STEADY,
+    DRAW_MAX_DURATION,
+    DRAW_MAX_GAP,
+    DRAW_NOISE,
+    DRAW_START_DROP,
+    RESTORE_SAVE_DELAY,
+    WATER_HEAT_CAPACITY,
+)
+from .polling import DATA_POLLING
+
+_LOGGER = logging.getLogger(__name__)
+
+DATA_DRAW: HassKey[TSmartDrawDetector] = HassKey(f"{DOMAIN}_draw")
+
+EVENT_DRAW = f"{DOMAIN}_draw"
+
+STORAGE_VERSION = 1
+STORAGE_KEY = f"{DOMAIN}.draw"
+
+
+@dataclass(slots=True)
+class HotWaterDraw:
+    """A draw in progress.
+
+    start_low and start_high are the sensor temperatures before it, and
+    min_low the lowest the bottom sensor has fallen to since, at fell_at.
+    """
+
+    start: datetime
+    start_low: float
+    start_high: float
+    min_low: float
+    fell_at: datetime
+
+
+@dataclass(slots=True)
+class HotWaterUsage:
+    """Hot water drawn from a heater on day, with the detector's state.
+
+    last_sample, last_low and last_high are the previous status, which a new
+    one is compared against to spot the start of a draw.
+    """
+
+    day: date
+    draws: int = 0
+    volume: float = 0
+    energy: float = 0
+    last_draw: datetime | None = None
+    last_sample: datetime | None = None
+    last_low: float = 0
+    last_high: float = 0
+    draw: HotWaterDraw | None = None
+
+    def rollover(self, today: date) -> None:
+        """Start counting afresh on a new day."""
+        if today != self.day:
+            self.day = today
+            self.draws = 0
+            self.volume = 0
+            self.energy = 0
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the counters to store."""
+        return {
+            "day": self.day.isoformat(),
+            "draws": self.draws,
+            "volume": round(self.volume, 1),
+            "energy": round(self.energy, 3),
+            "last_draw": self.last_draw.isoformat() if self.last_draw else None,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> HotWaterUsage:
+        """Return the counters loaded from the store."""
+        return cls(
+            day=date.fromisoformat(data["day"]),
+            draws=data["draws"],
+            volume=data["volume"],
+            energy=data["energy"],
+            last_draw=dt_util.parse_datetime(data["last_draw"])
+            if data.get("last_draw")
+            else None,
+        )
+
+
+class TSmartDrawDetector:
+    """Spots hot water draws as statuses arrive, and counts the day's usage.
+
+    A draw shows as the bottom sensor falling as cold water flows in while the
+    top sensor holds steady. Each status is only compared with the previous one
+    and the draw in progress, so no history is kept. While a draw is running
+    the heater is polled on the fast interval, and it ends once the bottom
+    sensor stops falling.
+
+    The energy drawn is the fall of the tank's average temperature over its
+    volume, and the volume of hot water the energy carries out above the inlet
+    temperature.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        self.hass = hass
+        self._store: Store[dict[str, dict[str, Any]]] = Store(
+            hass, STORAGE_VERSION, STORAGE_KEY
+        )
+        self.usage: dict[str, HotWaterUsage] = {}
+        self._save_pending = False
+
+    async def async_load(self) -> None:
+        """Load the stored counters."""
+        self.usage = {
+            device_id: HotWaterUsage.from_dict(data)
+            for device_id, data in (await self._store.async_load() or {}).items()
+        }
+
+    @callback
+    def async_add_entry(self, entry: TSmartConfigEntry) -> CALLBACK_TYPE:
+        """Start detecting draws from a heater."""
+        device_id = entry.runtime_data.device.device_id
+        if device_id not in self.usage:
+            self.usage[device_id] = HotWaterUsage(day=dt_util.now().date())
+            self._async_save()
+
+        @callback
+        def _async_updated() -> None:
+            self._async_update(entry)
+
+        unsub = entry.runtime_data.coordinator.async_add_listener(_async_updated)
+
+        @callback
+        def _remove() -> None:
+            unsub()
+            if (usage := self.usage.get(device_id)) is not None:
+                usage.draw = None
+                usage.last_sample = None
+            self.hass.data[DATA_POLLING].async_set_fast(entry.entry_id, fast=False)
+
+        return _remove
+
+    @callback
+    def async_remove(self, device_id: str) -> None:
+        """Forget a device."""
+        if self.usage.pop(device_id, None) is not None:
+            self._async_save()
+
+    def device_as_dict(self, device_id: str) -> dict[str, Any] | None:
+        """Return the usage of a heater for diagnostics."""
+        if (usage := self.usage.get(device_id)) is None:
+            return None
+        return {
+            **usage.as_dict(),
+            "drawing": usage.draw is not None,
+        }
+
+    @callback
+    def _async_update(self, entry: TSmartConfigEntry) -> None:
+        """Compare a new status with the previous one."""
+        coordinator = entry.runtime_data.coordinator
+        device_id = entry.runtime_data.device.device_id
+        if (
+            not coordinator.last_update_success
+            or coordinator.restored
+            or (usage := self.usage.get(device_id)) is None
+        ):
+            return
+
+        now = dt_util.utcnow()
+        low = coordinator.data.temperature_low
+        high = coordinator.data.temperature_high
+        usage.rollover(dt_util.as_local(now).date())
+        recent = (
+            usage.last_sample is not None and now - usage.last_sample <= DRAW_MAX_GAP
+        )
+
+        if (draw := usage.draw) is not None:
+            if low < draw.min_low - DRAW_NOISE:
+                draw.min_low = low
+                draw.fell_at = now
+            if (
+                not recent
+                or low > draw.min_low + DRAW_NOISE
+                or now - draw.fell_at >= DRAW_END_QUIET
+                or now - draw.start >= DRAW_MAX_DURATION
+            ):
+                self._async_end_draw(entry, usage, draw, now, high)
+        elif (
+            recent
+            and usage.last_low - low >= DRAW_START_DROP
+            and abs(high - usage.last_high) <= DRAW_HIGH_STEADY
+        ):
+            _LOGGER.debug("%s: Hot water draw started", entry.title)
+            usage.draw = HotWaterDraw(
+                start=usage.last_sample,
+                start_low=usage.last_low,
+                start_high=usage.last_high,
+                min_low=low,
+                fell_at=now,
+            )
+            self.hass.data[DATA_POLLING].async_set_fast(entry.entry_id, fast=True)
+
+        usage.last_sample = now
+        usage.last_low = low
+        usage.last_high = high
+
+    @callback
+    def _async_end_draw(
+        self,
+        entry: TSmartConfigEntry,
+        usage: HotWaterUsage,
+        draw: HotWaterDraw,
+        now: datetime,
+        high: float,
+    ) -> None:
+        """Count a draw that finished, and fire its event."""
+        usage.draw = None
+        self.hass.data[DATA_POLLING].async_set_fast(entry.entry_id, fast=False)
+
+        tank_volume = entry.data.get(CONF_TANK_VOLUME, DEFAULT_TANK_VOLUME)
+        inlet = entry.data.get(CONF_INLET_TEMPERATURE, DEFAULT_INLET_TEMPERATURE)
+        drop = (draw.start_low - draw.min_low + max(draw.start_high - high, 0)) / 2
+        energy = tank_volume * drop * WATER_HEAT_CAPACITY / 3600
+        volume = tank_volume * drop / max(draw.start_high - inlet, 1)
+        duration = (draw.fell_at - draw.start).total_seconds()
+
+        usage.draws += 1
+        usage.volume += volume
+        usage.energy += energy
+        usage.last_draw = draw.start
+        self._async_save()
+
+        _LOGGER.debug(
+            "%s: Hot water draw of %.0f l over %.0fs", entry.title, volume, duration
+        )
+        self.hass.bus.async_fire(
+            EVENT_DRAW,
+            {
+                "device_id": entry.runtime_data.device.device_id,
+                "name": entry.runtime_data.device.name,
+                "start": draw.start.isoformat(),
+                "duration": round(duration),
+                "temperature_drop": round(draw.start_low - draw.min_low, 1),
+                "volume": round(volume, 1),
+                "energy": round(energy, 3),
+            },
+        )
+
+    @callback
+    def _async_save(self) -> None:
+        """Schedule a write of the counters."""
+        if not self._save_pending:
+            self._save_pending = True
+            self._store.async_delay_save(self._data_to_save, RESTORE_SAVE_DELAY)
+
+    @callback
+    def _data_to_save(self) -> dict[str, dict[str, Any]]:
+        """Return the data to store."""
+        self._save_pending = False
+        return {device_id: usage.as_dict() for device_id, usage in self.usage.items()}
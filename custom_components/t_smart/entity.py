@@ -1,10 +1,16 @@
 """Base entity for t_smart."""
 
+import time
+
+from homeassistant.core import callback
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from homeassistant.helpers.entity import DeviceInfo
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
-from .const import DOMAIN
+from .const import ATTR_RESTORED, DOMAIN
 from .coordinator import TSmartCoordinator
+from .interpolation import DATA_INTERPOLATION, signal_estimate_updated
+from .profiling import PHASE_STATE_WRITE
 
 
 class TSmartEntity(CoordinatorEntity[TSmartCoordinator]):
@@ -17,6 +23,21 @@ class TSmartEntity(CoordinatorEntity[TSmartCoordinator]):
         super().__init__(coordinator)
         self.device = coordinator.device
 
+    @callback
+    def async_write_ha_state(self) -> None:
+        """Write the state to the state machine, timing the write."""
+        start = time.perf_counter()
+        super().async_write_ha_state()
+        if self.device.profiler is not None:
+            self.device.profiler.add(PHASE_STATE_WRITE, time.perf_counter() - start)
+
+    @property
+    def extra_state_attributes(self) -> dict[str, bool] | None:
+        """Flag states restored from before a restart."""
+        if self.coordinator.restored:
+            return {ATTR_RESTORED: True}
+        return None
+
     @property
     def device_info(self) -> DeviceInfo:
         """Return the device info."""
@@ -30,3 +51,25 @@ class TSmartEntity(CoordinatorEntity[TSmartCoordinator]):
             model="T-Smart",
             sw_version=self.device.firmware_version,
         )
+
+
+class TSmartEstimatedTemperatureEntity(TSmartEntity):
+    """Base entity showing a temperature estimated between polls when interpolated."""
+
+    async def async_added_to_hass(self) -> None:
+        """Write the state as the estimate moves on."""
+        await super().async_added_to_hass()
+        self.async_on_remove(
+            async_dispatcher_connect(
+                self.hass,
+                signal_estimate_updated(self.coordinator.config_entry.entry_id),
+                self.async_write_ha_state,
+            )
+        )
+
+    @property
+    def estimate(self) -> tuple[float, float] | None:
+        """Return the estimated temperature and its bound, if interpolated."""
+        return self.hass.data[DATA_INTERPOLATION].estimate(
+            self.coordinator.config_entry.entry_id
+        )
@@ -0,0 +1,74 @@
+"""Temperature interpolation between polls for t_smart."""
+
+from __future__ import annotations
+
+import math
+
+from .predictor import TSmartPredictor
+
+# Variance of a reading, the sensors report to 0.1 °C
+ESTIMATOR_READING_VARIANCE = 0.05**2
+ESTIMATOR_INITIAL_DRIFT = 0.001  # °C² per second until fitted
+ESTIMATOR_SMOOTHING = 0.1  # Weight of each new sample in the fitted drift
+
+
+class TSmartEstimator:
+    """Estimate the temperature between polls, with a confidence bound.
+
+    The temperature is carried forward from the last sample at the rate the
+    predictor fitted for the relay state, heating up to no further than the
+    setpoint. The variance of the estimate grows linearly with the time since
+    the sample, at a drift rate fitted online: each sample is compared with
+    what was estimated for it, and the squared error, less the reading noise,
+    is averaged over recent samples. Each sample costs O(1).
+    """
+
+    def __init__(self, predictor: TSmartPredictor) -> None:
+        self._predictor = predictor
+        self._timestamp: float | None = None
+        self._temperature = 0.0
+        self._setpoint = 0.0
+        self._relay = False
+        self.drift = ESTIMATOR_INITIAL_DRIFT
+
+    def add_sample(
+        self, timestamp: float, temperature: float, *, relay: bool, setpoint: float
+    ) -> None:
+        """Add a status sample, refitting the drift from the estimate's error."""
+        elapsed = 0 if self._timestamp is None else timestamp - self._timestamp
+        if elapsed > 0:
+            error = temperature - self._extrapolate(elapsed)
+            drift = max(error * error - 2 * ESTIMATOR_READING_VARIANCE, 0) / elapsed
+            self.drift += ESTIMATOR_SMOOTHING * (drift - self.drift)
+
+        self._timestamp = timestamp
+        self._temperature = temperature
+        self._relay = relay
+        self._setpoint = setpoint
+
+    def estimate(self, timestamp: float) -> tuple[float, float] | None:
+        """Return the estimated temperature and its 95% bound, in °C."""
+        if self._timestamp is None:
+            return None
+
+        elapsed = max(timestamp - self._timestamp, 0)
+        variance = ESTIMATOR_READING_VARIANCE + self.drift * elapsed
+        return self._extrapolate(elapsed), 2 * math.sqrt(variance)
+
+    def restart(self) -> None:
+        """Forget the last sample, keeping the fitted drift.
+
+        Used when samples are about to be taken from a different sensor.
+        """
+        self._timestamp = None
+
+    def _extrapolate(self, elapsed: float) -> float:
+        """Return the temperature carried forward from the last sample."""
+        if self._relay:
+            rate = self._predictor.heating_rate or 0.0
+            return min(
+                self._temperature + rate * elapsed,
+                max(self._temperature, self._setpoint),
+            )
+        rate = self._predictor.cooling_rate or 0.0
+        return self._temperature + rate * elapsed
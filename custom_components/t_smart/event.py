@@ -0,0 +1,60 @@
+"""Event platform for t_smart."""
+
+from homeassistant.components.event import EventEntity
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.entity import EntityCategory
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+
+from .common import TSmartConfigEntry
+from .entity import TSmartEntity
+from .faults import FAULT_TYPES, FaultTransition
+
+PARALLEL_UPDATES = 0
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    config_entry: TSmartConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    """Set up the event platform."""
+    coordinator = config_entry.runtime_data.coordinator
+    async_add_entities([TSmartFaultEventEntity(coordinator)])
+
+
+class TSmartFaultEventEntity(TSmartEntity, EventEntity):
+    """t_smart Fault Event class.
+
+    Fires when an error or warning is raised, cleared or counted again, and
+    otherwise only writes its state when the availability changes.
+    """
+
+    _attr_event_types = FAULT_TYPES
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_translation_key = "fault"
+
+    def __init__(self, coordinator) -> None:
+        """Initialize the event."""
+        super().__init__(coordinator)
+        self._handled: list[FaultTransition] = coordinator.faults
+        self._written_available: bool | None = None
+
+    @property
+    def unique_id(self) -> str:
+        """Return a unique ID."""
+        return f"{self.device.device_id}_fault"
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Fire the transitions of a new status."""
+        faults = self.coordinator.faults
+        if faults is not self._handled:
+            self._handled = faults
+            for fault in faults:
+                self._trigger_event(fault.type, fault.as_dict())
+                self._written_available = self.available
+                self.async_write_ha_state()
+
+        if self._written_available != self.available:
+            self._written_available = self.available
+            self.async_write_ha_state()
@@ -0,0 +1,61 @@
+"""Error and warning transitions of t_smart devices."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+from .const import DOMAIN
+from .tsmart import TSmartStatus
+
+EVENT_FAULT = f"{DOMAIN}_fault"
+
+FAULT_RAISED = "raised"
+FAULT_CLEARED = "cleared"
+FAULT_COUNTED = "counted"
+
+FAULT_TYPES = [FAULT_RAISED, FAULT_CLEARED, FAULT_COUNTED]
+
+FAULT_CODES = ("e01", "e02", "e03", "e04", "e05", "w01", "w02", "w03")
+
+
+@dataclass(frozen=True, slots=True)
+class FaultTransition:
+    """An error or warning that was raised, cleared, or counted again."""
+
+    code: str
+    type: str
+    count: int
+    count_delta: int
+    mode: str
+
+    def as_dict(self) -> dict[str, str | int]:
+        """Return the event data."""
+        return {
+            "code": self.code,
+            "count": self.count,
+            "count_delta": self.count_delta,
+            "mode": self.mode,
+        }
+
+
+def fault_transitions(old: TSmartStatus, new: TSmartStatus) -> list[FaultTransition]:
+    """Return the errors and warnings that changed between two statuses.
+
+    A code is counted when its counter went up while it stayed raised, or
+    cleared again in between polls.
+    """
+    transitions = []
+    for code in FAULT_CODES:
+        active = getattr(new, code)
+        count = getattr(new, f"{code}_count")
+        count_delta = count - getattr(old, f"{code}_count")
+        if active != getattr(old, code):
+            fault_type = FAULT_RAISED if active else FAULT_CLEARED
+        elif count_delta > 0:
+            fault_type = FAULT_COUNTED
+        else:
+            continue
+        transitions.append(
+            FaultTransition(code, fault_type, count, count_delta, new.mode.name)
+        )
+    return transitions
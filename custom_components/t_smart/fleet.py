@@ -0,0 +1,216 @@
+"""Fleet wide operations for t_smart."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections.abc import Iterable
+from itertools import count
+from typing import Any
+
+from homeassistant.const import (
+    ATTR_AREA_ID,
+    ATTR_DEVICE_ID,
+    ATTR_ENTITY_ID,
+    ATTR_LABEL_ID,
+)
+from homeassistant.core import HomeAssistant, ServiceCall, callback
+from homeassistant.exceptions import ServiceValidationError
+from homeassistant.helpers import (
+    config_validation as cv,
+    device_registry as dr,
+    entity_registry as er,
+)
+
+from .common import TSmartConfigEntry
+from .const import DOMAIN, RECOVERY_POLL_INTERVAL, RESTART_OFFSET, RESTART_SETTLE
+from .tsmart import PRIORITY_CONFIRM, PRIORITY_CONTROL, TSmartMode, settable_mode
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@callback
+def async_get_target_entries(
+    hass: HomeAssistant, call: ServiceCall
+) -> list[TSmartConfigEntry]:
+    """Return the loaded config entries targeted by a service call."""
+    device_registry = dr.async_get(hass)
+    entity_registry = er.async_get(hass)
+
+    device_ids: set[str] = set(cv.ensure_list(call.data.get(ATTR_DEVICE_ID)))
+    entry_ids: set[str] = set()
+
+    for area_id in cv.ensure_list(call.data.get(ATTR_AREA_ID)):
+        device_ids.update(
+            device.id for device in dr.async_entries_for_area(device_registry, area_id)
+        )
+        entry_ids.update(
+            entity.config_entry_id
+            for entity in er.async_entries_for_area(entity_registry, area_id)
+            if entity.config_entry_id
+        )
+
+    for label_id in cv.ensure_list(call.data.get(ATTR_LABEL_ID)):
+        device_ids.update(
+            device.id
+            for device in dr.async_entries_for_label(device_registry, label_id)
+        )
+        entry_ids.update(
+            entity.config_entry_id
+            for entity in er.async_entries_for_label(entity_registry, label_id)
+            if entity.config_entry_id
+        )
+
+    for entity_id in cv.ensure_list(call.data.get(ATTR_ENTITY_ID)):
+        if (entity := entity_registry.async_get(entity_id)) and entity.config_entry_id:
+            entry_ids.add(entity.config_entry_id)
+
+    for device_id in device_ids:
+        if device := device_registry.async_get(device_id):
+            entry_ids.update(device.config_entries)
+
+    entries = [
+        entry
+        for entry in hass.config_entries.async_loaded_entries(DOMAIN)
+        if entry.entry_id in entry_ids
+    ]
+    if not entries:
+        raise ServiceValidationError("No T-Smart thermostats targeted")
+
+    return entries
+
+
+async def async_set_fleet(
+    entries: Iterable[TSmartConfigEntry],
+    *,
+    power: bool | None,
+    mode: TSmartMode | None,
+    setpoint: float | None,
+    max_concurrent: int,
+    stagger: float,
+) -> dict[str, Any]:
+    """Send one control command to each heater concurrently.
+
+    Settings left as None keep each heater's current value. Heaters being
+    switched on are delayed by stagger seconds each, so their load comes on
+    gradually.
+    """
+    entries = list(entries)
+    semaphore = asyncio.Semaphore(max_concurrent)
+    switch_on = count()
+
+    async def _async_set(entry: TSmartConfigEntry) -> tuple[str, dict[str, Any]]:
+        device = entry.runtime_data.device
+        data = entry.runtime_data.coordinator.data
+
+        new_power = data.power if power is None else power
+        new_mode = settable_mode(data.mode) if mode is None else mode
+        if stagger and new_power and not data.power:
+            await asyncio.sleep(next(switch_on) * stagger)
+
+        async with semaphore:
+            start = time.monotonic()
+            success = await device.async_control_set(
+                new_power,
+                new_mode,
+                data.setpoint if setpoint is None else setpoint,
+            )
+            latency = time.monotonic() - start
+
+        _LOGGER.debug(
+            "%s: Fleet set %s in %.3fs",
+            device.name,
+            "acknowledged" if success else "failed",
+            latency,
+        )
+        return device.device_id, {
+            "name": device.name,
+            "success": success,
+            "latency_ms": round(latency * 1000),
+        }
+
+    results = dict(await asyncio.gather(*(_async_set(entry) for entry in entries)))
+
+    await asyncio.gather(
+        *(entry.runtime_data.coordinator.async_confirm() for entry in entries)
+    )
+
+    return {"devices": results}
+
+
+async def async_rolling_restart(
+    entries: Iterable[TSmartConfigEntry],
+    max_concurrent: int,
+    max_failure_rate: float,
+    recovery_timeout: float,
+) -> dict[str, Any]:
+    """Restart heaters a few at a time, waiting for each to come back.
+
+    A heater has recovered once it answers a status request again, after it
+    has stopped answering or enough time has passed for the answer not to be
+    from before the restart. The rollout is aborted, leaving the remaining
+    heaters untouched, as soon as the share of the targeted heaters that
+    failed to recover exceeds max_failure_rate.
+    """
+    entries = list(entries)
+    semaphore = asyncio.Semaphore(max_concurrent)
+    failed = 0
+    aborted = False
+
+    async def _async_restart(entry: TSmartConfigEntry) -> tuple[str, dict[str, Any]]:
+        nonlocal failed, aborted
+
+        device = entry.runtime_data.device
+        async with semaphore:
+            if aborted:
+                return device.device_id, {"name": device.name, "status": "skipped"}
+
+            start = time.monotonic()
+            await device.async_restart(RESTART_OFFSET, priority=PRIORITY_CONTROL)
+            await asyncio.sleep(RESTART_OFFSET / 1000)
+
+            # Wait for the heater to go down, so an answer sent before it
+            # restarted isn't taken for it having recovered
+            while time.monotonic() - start < RESTART_OFFSET / 1000 + RESTART_SETTLE:
+                if await device.async_get_status(PRIORITY_CONFIRM) is None:
+                    break
+                await asyncio.sleep(RECOVERY_POLL_INTERVAL)
+
+            recovered = False
+            while time.monotonic() - start < recovery_timeout:
+                if await device.async_get_status(PRIORITY_CONFIRM) is not None:
+                    recovered = True
+                    break
+                await asyncio.sleep(RECOVERY_POLL_INTERVAL)
+            recovery_time = time.monotonic() - start
+
+            if not recovered:
+                failed += 1
+            if failed / len(entries) > max_failure_rate and not aborted:
+                _LOGGER.warning(
+                    "Aborting rolling restart, %d of %d thermostats failed to recover",
+                    failed,
+                    len(entries),
+                )
+                aborted = True
+
+        _LOGGER.debug(
+            "%s: Restart %s after %.1fs",
+            device.name,
+            "recovered" if recovered else "failed",
+            recovery_time,
+        )
+        return device.device_id, {
+            "name": device.name,
+            "status": "recovered" if recovered else "failed",
+            "recovery_time_s": round(recovery_time, 1),
+        }
+
+    results = dict(await asyncio.gather(*(_async_restart(entry) for entry in entries)))
+
+    await asyncio.gather(
+        *(entry.runtime_data.coordinator.async_request_refresh() for entry in entries)
+    )
+
+    return {"aborted": aborted, "devices": results}
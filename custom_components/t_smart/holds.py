@@ -0,0 +1,297 @@
+"""Temporary control of t_smart heaters by the fleet features."""
+
+from __future__ import annotations
+
+import logging
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_track_point_in_utc_time
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+from homeassistant.util.hass_dict import HassKey
+
+from .common import TSmartConfigEntry
+from .const import (
+    DOMAIN,
+    HOLD_CONFIRM_DELAY,
+    HOLD_RELEASE_RETRY,
+    RESTORE_SAVE_DELAY,
+)
+from .tsmart import TSmartMode, settable_mode
+
+_LOGGER = logging.getLogger(__name__)
+
+DATA_HOLDS: HassKey[TSmartHolds] = HassKey(f"{DOMAIN}_holds")
+
+STORAGE_VERSION = 1
+STORAGE_KEY = f"{DOMAIN}.holds"
+
+# Features that take heaters over, each giving way to the ones before it
+OWNER_DEMAND = "demand"
+OWNER_LEGIONELLA = "legionella"
+OWNER_PREHEAT = "preheat"
+OWNER_DIVERSION = "diversion"
+OWNERS = (OWNER_DEMAND, OWNER_LEGIONELLA, OWNER_PREHEAT, OWNER_DIVERSION)
+
+
+@dataclass(slots=True)
+class Hold:
+    """A heater taken over by a feature.
+
+    power, mode and setpoint are what the heater is held at, and restore what
+    it goes back to: its settings from before any feature took it over. until
+    is when the hold ends by itself, if it does. since is when the hold was
+    last set, by the monotonic clock.
+    """
+
+    owner: str
+    power: bool
+    mode: TSmartMode
+    setpoint: float
+    restore: tuple[bool, TSmartMode, float]
+    until: datetime | None = None
+    since: float = field(default_factory=time.monotonic)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the hold to store."""
+        return {
+            "owner": self.owner,
+            "power": self.power,
+            "mode": int(self.mode),
+            "setpoint": self.setpoint,
+            "restore": [self.restore[0], int(self.restore[1]), self.restore[2]],
+            "until": self.until.isoformat() if self.until else None,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> Hold:
+        """Return the hold loaded from the store."""
+        power, mode, setpoint = data["restore"]
+        return cls(
+            owner=data["owner"],
+            power=data["power"],
+            mode=TSmartMode(data["mode"]),
+            setpoint=data["setpoint"],
+            restore=(power, TSmartMode(mode), setpoint),
+            until=dt_util.parse_datetime(data["until"]) if data.get("until") else None,
+        )
+
+
+class TSmartHolds:
+    """Hands each heater to one feature at a time, and puts it back after.
+
+    A feature holding a heater can be overridden by one listed before it in
+    OWNERS, which takes over the settings to restore, so a heater always goes
+    back to how it was before the first one. Once a hold has had time to show
+    in the status, a different setpoint means someone else changed it, and
+    the heater is left to them. A hold with an end time is released at that
+    time. Holds are stored, so heaters are picked up again after a restart.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        self.hass = hass
+        self._store: Store[dict[str, dict[str, Any]]] = Store(
+            hass, STORAGE_VERSION, STORAGE_KEY
+        )
+        self.holds: dict[str, Hold] = {}
+        self._busy: set[str] = set()
+        self._entries: dict[str, TSmartConfigEntry] = {}
+        self._unsub_expiry: dict[str, CALLBACK_TYPE] = {}
+        self._save_pending = False
+
+    async def async_load(self) -> None:
+        """Load the holds in place when Home Assistant stopped."""
+        self.holds = {
+            device_id: Hold.from_dict(data)
+            for device_id, data in (await self._store.async_load() or {}).items()
+        }
+
+    @callback
+    def async_add_entry(self, entry: TSmartConfigEntry) -> CALLBACK_TYPE:
+        """Watch a heater for changes made while it is held."""
+        device_id = entry.runtime_data.device.device_id
+        self._entries[device_id] = entry
+        self._async_schedule_expiry(device_id)
+
+        @callback
+        def _async_updated() -> None:
+            self._async_updated(entry)
+
+        unsub = entry.runtime_data.coordinator.async_add_listener(_async_updated)
+
+        @callback
+        def _remove() -> None:
+            unsub()
+            self._entries.pop(device_id, None)
+            if (unsub_expiry := self._unsub_expiry.pop(device_id, None)) is not None:
+                unsub_expiry()
+
+        return _remove
+
+    @callback
+    def async_remove(self, device_id: str) -> None:
+        """Forget a device."""
+        if self.holds.pop(device_id, None) is not None:
+            self._async_save()
+
+    def owner(self, device_id: str) -> str | None:
+        """Return the feature holding a heater, if any."""
+        hold = self.holds.get(device_id)
+        return hold.owner if hold else None
+
+    def busy(self, device_id: str) -> bool:
+        """Return whether a hold or release of a heater is in flight."""
+        return device_id in self._busy
+
+    def can_hold(self, device_id: str, owner: str) -> bool:
+        """Return whether a feature may take a heater over now."""
+        if device_id in self._busy:
+            return False
+        hold = self.holds.get(device_id)
+        return hold is None or OWNERS.index(owner) <= OWNERS.index(hold.owner)
+
+    def device_as_dict(self, device_id: str) -> dict[str, Any] | None:
+        """Return the hold of a heater for diagnostics."""
+        if (hold := self.holds.get(device_id)) is None:
+            return None
+        return {
+            **hold.as_dict(),
+            "seconds_held": round(time.monotonic() - hold.since),
+        }
+
+    async def async_hold(
+        self,
+        entry: TSmartConfigEntry,
+        owner: str,
+        *,
+        power: bool,
+        mode: TSmartMode,
+        setpoint: float,
+        until: datetime | None = None,
+    ) -> bool:
+        """Hold a heater at a setting, returning whether it acknowledged.
+
+        The hold is released at until, if given. Nothing is sent if the heater
+        is held by a feature that comes first.
+        """
+        device = entry.runtime_data.device
+        data = entry.runtime_data.coordinator.data
+        if not self.can_hold(device.device_id, owner):
+            return False
+
+        self._busy.add(device.device_id)
+        try:
+            if not await device.async_control_set(power, mode, setpoint):
+                return False
+            if (current := self.holds.get(device.device_id)) is not None:
+                restore = current.restore
+            else:
+                restore = (data.power, data.mode, data.setpoint)
+            self.holds[device.device_id] = Hold(
+                owner, power, mode, setpoint, restore, until
+            )
+            self._async_schedule_expiry(device.device_id)
+            self._async_save()
+            await self._async_refresh(entry)
+        finally:
+            self._busy.discard(device.device_id)
+        return True
+
+    async def async_release(self, entry: TSmartConfigEntry, owner: str) -> bool:
+        """Put back a heater a feature holds, returning whether it acknowledged."""
+        device = entry.runtime_data.device
+        hold = self.holds.get(device.device_id)
+        if hold is None or hold.owner != owner or device.device_id in self._busy:
+            return False
+
+        power, mode, setpoint = hold.restore
+        self._busy.add(device.device_id)
+        try:
+            if not await device.async_control_set(
+                power, settable_mode(mode), setpoint
+            ):
+                return False
+            self.holds.pop(device.device_id, None)
+            self._async_schedule_expiry(device.device_id)
+            self._async_save()
+            await self._async_refresh(entry)
+        finally:
+            self._busy.discard(device.device_id)
+        return True
+
+    @callback
+    def _async_updated(self, entry: TSmartConfigEntry) -> None:
+        """Let go of a held heater whose setpoint was changed by someone else."""
+        coordinator = entry.runtime_data.coordinator
+        device_id = entry.runtime_data.device.device_id
+        hold = self.holds.get(device_id)
+        if (
+            hold is None
+            or device_id in self._busy
+            or not coordinator.last_update_success
+            or coordinator.restored
+            or time.monotonic() - hold.since <= HOLD_CONFIRM_DELAY
+            or coordinator.data.setpoint == hold.setpoint
+        ):
+            return
+
+        # Someone else changed the setpoint, leave the heater to them
+        _LOGGER.debug("%s: Setpoint changed while held for %s", entry.title, hold.owner)
+        del self.holds[device_id]
+        self._async_schedule_expiry(device_id)
+        self._async_save()
+
+    @callback
+    def _async_schedule_expiry(self, device_id: str) -> None:
+        """Schedule the release of a heater at the end of its hold."""
+        if (unsub := self._unsub_expiry.pop(device_id, None)) is not None:
+            unsub()
+        hold = self.holds.get(device_id)
+        if hold is None or hold.until is None or device_id not in self._entries:
+            return
+
+        @callback
+        def _async_expired(now: datetime) -> None:
+            self._unsub_expiry.pop(device_id, None)
+            if (entry := self._entries.get(device_id)) is None:
+                return
+            _LOGGER.debug("%s: Hold for %s ended", entry.title, hold.owner)
+            self.hass.async_create_background_task(
+                self._async_expire(entry, hold), f"{DOMAIN} hold expiry"
+            )
+
+        # A hold that ended while Home Assistant was stopped is released now
+        self._unsub_expiry[device_id] = async_track_point_in_utc_time(
+            self.hass, _async_expired, max(hold.until, dt_util.utcnow())
+        )
+
+    async def _async_expire(self, entry: TSmartConfigEntry, hold: Hold) -> None:
+        """Release a heater at the end of its hold, retrying until it answers."""
+        device_id = entry.runtime_data.device.device_id
+        if (
+            not await self.async_release(entry, hold.owner)
+            and self.holds.get(device_id) is hold
+        ):
+            hold.until = dt_util.utcnow() + HOLD_RELEASE_RETRY
+            self._async_schedule_expiry(device_id)
+
+    async def _async_refresh(self, entry: TSmartConfigEntry) -> None:
+        """Refresh a heater after a command."""
+        await entry.runtime_data.coordinator.async_confirm()
+
+    @callback
+    def _async_save(self) -> None:
+        """Schedule a write of the holds."""
+        if not self._save_pending:
+            self._save_pending = True
+            self._store.async_delay_save(self._data_to_save, RESTORE_SAVE_DELAY)
+
+    @callback
+    def _data_to_save(self) -> dict[str, dict[str, Any]]:
+        """Return the data to store."""
+        self._save_pending = False
+        return {device_id: hold.as_dict() for device_id, hold in self.holds.items()}
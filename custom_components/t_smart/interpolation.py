@@ -0,0 +1,118 @@
+"""Interpolated temperatures between sparse polls of t_smart heaters."""
+
+from __future__ import annotations
+
+import logging
+from datetime import datetime
+from typing import Any
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+from homeassistant.helpers.event import async_track_time_interval
+from homeassistant.util.hass_dict import HassKey
+
+from .common import TSmartConfigEntry
+from .const import (
+    CONF_DRAW_DETECTION,
+    CONF_INTERPOLATION_UNCERTAINTY,
+    DEFAULT_INTERPOLATION_UNCERTAINTY,
+    DOMAIN,
+    INTERPOLATED_POLL_INTERVAL,
+    UPDATE_INTERVAL,
+)
+from .polling import DATA_POLLING
+
+_LOGGER = logging.getLogger(__name__)
+
+DATA_INTERPOLATION: HassKey[TSmartInterpolation] = HassKey(f"{DOMAIN}_interpolation")
+
+
+def signal_estimate_updated(entry_id: str) -> str:
+    """Return the signal sent when a heater's estimated temperature moves on."""
+    return f"{DOMAIN}_estimate_updated_{entry_id}"
+
+
+class TSmartInterpolation:
+    """Publishes estimated temperatures for heaters polled less often.
+
+    Interpolated heaters are polled on a longer interval, and in between the
+    coordinator's estimator carries the temperature forward every usual poll
+    interval. A real poll is requested from the poll scheduler as soon as the
+    estimate's bound grows past the configured uncertainty, so a heater
+    behaving unlike its fit is still followed closely. Heaters with hot water
+    draw detection keep the usual interval, as draws are only seen between
+    statuses close together.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        self.hass = hass
+        self._entries: dict[str, TSmartConfigEntry] = {}
+        self._unsub_interval: CALLBACK_TYPE | None = None
+
+    @callback
+    def async_add_entry(self, entry: TSmartConfigEntry) -> CALLBACK_TYPE:
+        """Start interpolating a heater's temperature."""
+        self._entries[entry.entry_id] = entry
+        if self._unsub_interval is None:
+            self._unsub_interval = async_track_time_interval(
+                self.hass, self._async_tick, UPDATE_INTERVAL
+            )
+        if not entry.data.get(CONF_DRAW_DETECTION):
+            self.hass.data[DATA_POLLING].async_set_interval(
+                entry.entry_id, INTERPOLATED_POLL_INTERVAL
+            )
+
+        @callback
+        def _remove() -> None:
+            del self._entries[entry.entry_id]
+            if not self._entries and self._unsub_interval is not None:
+                self._unsub_interval()
+                self._unsub_interval = None
+            self.hass.data[DATA_POLLING].async_set_interval(entry.entry_id, None)
+            async_dispatcher_send(self.hass, signal_estimate_updated(entry.entry_id))
+
+        return _remove
+
+    def estimate(self, entry_id: str) -> tuple[float, float] | None:
+        """Return the estimated temperature of a heater and its bound, in °C.
+
+        None if the heater isn't interpolated or has no status to estimate from.
+        """
+        if (entry := self._entries.get(entry_id)) is None:
+            return None
+        coordinator = entry.runtime_data.coordinator
+        if not coordinator.last_update_success or coordinator.restored:
+            return None
+        return coordinator.estimator.estimate(coordinator.device.monotonic())
+
+    def entry_as_dict(self, entry_id: str) -> dict[str, Any] | None:
+        """Return the estimate of a heater for diagnostics."""
+        if (entry := self._entries.get(entry_id)) is None:
+            return None
+        estimate = self.estimate(entry_id)
+        return {
+            "temperature": round(estimate[0], 2) if estimate else None,
+            "uncertainty": round(estimate[1], 2) if estimate else None,
+            "drift": entry.runtime_data.coordinator.estimator.drift,
+        }
+
+    @callback
+    def _async_tick(self, now: datetime) -> None:
+        """Move the estimates on, polling heaters that are too uncertain."""
+        polling = self.hass.data[DATA_POLLING]
+        for entry_id, entry in self._entries.items():
+            # A poll in flight will move the estimate on itself
+            if polling.polling(entry_id):
+                continue
+            if (estimate := self.estimate(entry_id)) is None:
+                continue
+            threshold = entry.data.get(
+                CONF_INTERPOLATION_UNCERTAINTY, DEFAULT_INTERPOLATION_UNCERTAINTY
+            )
+            if estimate[1] > threshold and polling.async_poll_now(entry_id):
+                _LOGGER.debug(
+                    "%s: Estimate uncertain by %.2f°C, polling",
+                    entry.title,
+                    estimate[1],
+                )
+            async_dispatcher_send(self.hass, signal_estimate_updated(entry_id))
@@ -0,0 +1,282 @@
+"""Legionella compliance tracking for t_smart heaters."""
+
+from __future__ import annotations
+
+import logging
+from collections.abc import Coroutine
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+from homeassistant.util.hass_dict import HassKey
+
+from .common import TSmartConfigEntry
+from .const import (
+    CONF_LEGIONELLA_BOOST,
+    CONF_LEGIONELLA_DURATION,
+    CONF_LEGIONELLA_TEMPERATURE,
+    DEFAULT_LEGIONELLA_DURATION,
+    DEFAULT_LEGIONELLA_TEMPERATURE,
+    DOMAIN,
+    LEGIONELLA_BOOST_RETRY,
+    LEGIONELLA_MAX_GAP,
+    LEGIONELLA_PERIOD,
+    RESTORE_SAVE_DELAY,
+)
+from .holds import DATA_HOLDS, OWNER_LEGIONELLA
+from .tsmart import TSmartMode
+
+_LOGGER = logging.getLogger(__name__)
+
+DATA_LEGIONELLA: HassKey[TSmartLegionella] = HassKey(f"{DOMAIN}_legionella")
+
+STORAGE_VERSION = 1
+STORAGE_KEY = f"{DOMAIN}.legionella"
+
+
+@dataclass(slots=True)
+class LegionellaCycle:
+    """Compliance state of a heater.
+
+    time_above is the seconds spent at or above the threshold in the window
+    starting at window_start, and run the seconds of the current spell above
+    it. tracked_since is when tracking started, from which a heater that has
+    never been compliant is overdue. last_sample is when the previous status
+    was taken, and whether it was above the threshold.
+    """
+
+    window_start: datetime
+    tracked_since: datetime
+    time_above: float = 0
+    run: float = 0
+    last_compliant: datetime | None = None
+    last_boost: datetime | None = None
+    last_sample: datetime | None = None
+    last_above: bool = False
+
+    def overdue(self, now: datetime) -> bool:
+        """Return whether a compliant cycle is overdue."""
+        return now - (self.last_compliant or self.tracked_since) > LEGIONELLA_PERIOD
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the state to store."""
+        return {
+            "window_start": self.window_start.isoformat(),
+            "tracked_since": self.tracked_since.isoformat(),
+            "time_above": self.time_above,
+            "last_compliant": self.last_compliant.isoformat()
+            if self.last_compliant
+            else None,
+            "last_boost": self.last_boost.isoformat() if self.last_boost else None,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> LegionellaCycle:
+        """Return the state loaded from the store."""
+        return cls(
+            window_start=dt_util.parse_datetime(data["window_start"]),
+            tracked_since=dt_util.parse_datetime(data["tracked_since"]),
+            time_above=data["time_above"],
+            last_compliant=dt_util.parse_datetime(data["last_compliant"])
+            if data["last_compliant"]
+            else None,
+            last_boost=dt_util.parse_datetime(data["last_boost"])
+            if data.get("last_boost")
+            else None,
+        )
+
+
+class TSmartLegionella:
+    """Tracks whether heaters reach the Legionella threshold every week.
+
+    Each status received adds the time since the previous one when both were
+    at or above the threshold, so no history is queried. Statuses further apart than
+    the maximum gap, such as over a restart, break the spell rather than count
+    time that wasn't seen. A cycle is compliant once a spell lasts the
+    configured duration, and overdue when none has been for a week, in which
+    case the heater can be boosted. A boost holds the heater through the
+    fleet's holds until the cycle completes, then puts it back.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        self.hass = hass
+        self._store: Store[dict[str, dict[str, Any]]] = Store(
+            hass, STORAGE_VERSION, STORAGE_KEY
+        )
+        self.cycles: dict[str, LegionellaCycle] = {}
+        self._boosting: set[str] = set()
+        self._save_pending = False
+
+    async def async_load(self) -> None:
+        """Load the stored cycles."""
+        self.cycles = {
+            device_id: LegionellaCycle.from_dict(data)
+            for device_id, data in (await self._store.async_load() or {}).items()
+        }
+
+    @callback
+    def async_add_entry(self, entry: TSmartConfigEntry) -> CALLBACK_TYPE:
+        """Start tracking a heater."""
+        device_id = entry.runtime_data.device.device_id
+        if device_id not in self.cycles:
+            now = dt_util.utcnow()
+            self.cycles[device_id] = LegionellaCycle(
+                window_start=now, tracked_since=now
+            )
+            self._async_save()
+
+        @callback
+        def _async_updated() -> None:
+            self._async_update(entry)
+
+        unsub = entry.runtime_data.coordinator.async_add_listener(_async_updated)
+
+        @callback
+        def _remove() -> None:
+            unsub()
+            # Boosts end when tracking is turned off, but carry on over a
+            # restart so they are picked up again
+            if (
+                self.hass.data[DATA_HOLDS].owner(device_id) == OWNER_LEGIONELLA
+                and self.hass.is_running
+            ):
+                self._async_command(entry, self._async_release(entry))
+
+        return _remove
+
+    @callback
+    def async_remove(self, device_id: str) -> None:
+        """Forget a device."""
+        if self.cycles.pop(device_id, None) is not None:
+            self._async_save()
+
+    def device_as_dict(self, device_id: str) -> dict[str, Any] | None:
+        """Return the state of a heater for diagnostics."""
+        if (cycle := self.cycles.get(device_id)) is None:
+            return None
+        return {
+            **cycle.as_dict(),
+            "run": round(cycle.run),
+            "overdue": cycle.overdue(dt_util.utcnow()),
+        }
+
+    @callback
+    def _async_update(self, entry: TSmartConfigEntry) -> None:
+        """Add a new status to the heater's cycle."""
+        coordinator = entry.runtime_data.coordinator
+        device_id = entry.runtime_data.device.device_id
+        now = coordinator.polled_at
+        if (
+            not coordinator.last_update_success
+            or coordinator.restored
+            or now is None
+            or (cycle := self.cycles.get(device_id)) is None
+            # Listeners are also updated without a new status, such as when a
+            # poll is skipped, which mustn't count the time again
+            or (cycle.last_sample is not None and now <= cycle.last_sample)
+        ):
+            return
+
+        data = coordinator.data
+        threshold = entry.data.get(
+            CONF_LEGIONELLA_TEMPERATURE, DEFAULT_LEGIONELLA_TEMPERATURE
+        )
+        duration = 60 * entry.data.get(
+            CONF_LEGIONELLA_DURATION, DEFAULT_LEGIONELLA_DURATION
+        )
+        above = data.temperature_high >= threshold
+
+        if now - cycle.window_start >= LEGIONELLA_PERIOD:
+            periods = (now - cycle.window_start) // LEGIONELLA_PERIOD
+            cycle.window_start += periods * LEGIONELLA_PERIOD
+            cycle.time_above = 0
+
+        if (
+            above
+            and cycle.last_above
+            and cycle.last_sample is not None
+            and now - cycle.last_sample <= LEGIONELLA_MAX_GAP
+        ):
+            elapsed = (now - cycle.last_sample).total_seconds()
+            cycle.time_above += elapsed
+            if cycle.run < duration <= cycle.run + elapsed:
+                _LOGGER.debug("%s: Legionella cycle completed", entry.title)
+                cycle.last_compliant = now
+            cycle.run += elapsed
+        else:
+            cycle.run = 0
+
+        cycle.last_sample = now
+        cycle.last_above = above
+        self._async_save()
+
+        holds = self.hass.data[DATA_HOLDS]
+        if holds.owner(device_id) == OWNER_LEGIONELLA:
+            if not cycle.overdue(now) and device_id not in self._boosting:
+                self._async_command(entry, self._async_release(entry))
+            return
+
+        if (
+            entry.data.get(CONF_LEGIONELLA_BOOST)
+            and cycle.overdue(now)
+            and not above
+            and data.mode != TSmartMode.BOOST
+            and device_id not in self._boosting
+            and holds.can_hold(device_id, OWNER_LEGIONELLA)
+            and (
+                cycle.last_boost is None
+                or now - cycle.last_boost >= LEGIONELLA_BOOST_RETRY
+            )
+        ):
+            cycle.last_boost = now
+            self._async_command(
+                entry, self._async_boost(entry, max(data.setpoint, threshold))
+            )
+
+    @callback
+    def _async_command(
+        self, entry: TSmartConfigEntry, command: Coroutine[Any, Any, None]
+    ) -> None:
+        """Send a command to a heater in the background, one at a time."""
+        device_id = entry.runtime_data.device.device_id
+        self._boosting.add(device_id)
+
+        async def _async_run() -> None:
+            try:
+                await command
+            finally:
+                self._boosting.discard(device_id)
+
+        self.hass.async_create_background_task(_async_run(), f"{DOMAIN} legionella")
+
+    async def _async_boost(self, entry: TSmartConfigEntry, setpoint: float) -> None:
+        """Boost a heater that is overdue a cycle."""
+        if await self.hass.data[DATA_HOLDS].async_hold(
+            entry,
+            OWNER_LEGIONELLA,
+            power=True,
+            mode=TSmartMode.BOOST,
+            setpoint=setpoint,
+        ):
+            _LOGGER.debug("%s: Boosting for overdue Legionella cycle", entry.title)
+
+    async def _async_release(self, entry: TSmartConfigEntry) -> None:
+        """Put back a heater boosted for a cycle."""
+        if await self.hass.data[DATA_HOLDS].async_release(entry, OWNER_LEGIONELLA):
+            _LOGGER.debug("%s: Legionella boost ended", entry.title)
+
+    @callback
+    def _async_save(self) -> None:
+        """Schedule a write of the cycles."""
+        if not self._save_pending:
+            self._save_pending = True
+            self._store.async_delay_save(self._data_to_save, RESTORE_SAVE_DELAY)
+
+    @callback
+    def _data_to_save(self) -> dict[str, dict[str, Any]]:
+        """Return the data to store."""
+        self._save_pending = False
+        return {device_id: cycle.as_dict() for device_id, cycle in self.cycles.items()}
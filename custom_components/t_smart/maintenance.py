@@ -0,0 +1,161 @@
+"""Background maintenance of t_smart devices."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later, async_track_time_interval
+from homeassistant.util import dt as dt_util
+from homeassistant.util.hass_dict import HassKey
+
+from .common import TSmartConfigEntry
+from .const import (
+    DOMAIN,
+    TIMESYNC_INTERVAL,
+    TIMESYNC_STAGGER,
+    TIMESYNC_STARTUP_DELAY,
+)
+from .tsmart import TSmartShedError, TSmartUnsupportedError
+
+_LOGGER = logging.getLogger(__name__)
+
+DATA_MAINTENANCE: HassKey[TSmartMaintenance] = HassKey(f"{DOMAIN}_maintenance")
+
+
+@dataclass(slots=True)
+class TimesyncStats:
+    """Time synchronisation history of a device.
+
+    The protocol has no way to read the device clock back, so the drift can't be
+    observed directly. The error bound is half the round trip of the last
+    acknowledged sync, which is how far the clock may be off straight after it.
+    """
+
+    attempts: int = 0
+    successes: int = 0
+    failures: int = 0
+    last_attempt: datetime | None = None
+    last_success: datetime | None = None
+    last_round_trip_ms: float | None = None
+    error_bound_ms: float | None = None
+
+    def as_dict(self) -> dict:
+        """Return the statistics for diagnostics."""
+        return {
+            "attempts": self.attempts,
+            "successes": self.successes,
+            "failures": self.failures,
+            "last_attempt": self.last_attempt.isoformat()
+            if self.last_attempt
+            else None,
+            "last_success": self.last_success.isoformat()
+            if self.last_success
+            else None,
+            "last_round_trip_ms": self.last_round_trip_ms,
+            "error_bound_ms": self.error_bound_ms,
+        }
+
+
+class TSmartMaintenance:
+    """Periodically synchronises the clocks of the fleet.
+
+    Every registered device is synced once per interval over the shared
+    transport. Sends are staggered so a large fleet doesn't burst the network.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        self.hass = hass
+        self.timesync: dict[str, TimesyncStats] = {}
+        self._entries: dict[str, TSmartConfigEntry] = {}
+        self._unsub_interval: CALLBACK_TYPE | None = None
+        self._unsub_startup: CALLBACK_TYPE | None = None
+        self._task: asyncio.Task | None = None
+
+    @callback
+    def async_add_entry(self, entry: TSmartConfigEntry) -> CALLBACK_TYPE:
+        """Include a device in the scheduled time synchronisation."""
+        self._entries[entry.entry_id] = entry
+
+        if self._unsub_interval is None:
+            self._unsub_interval = async_track_time_interval(
+                self.hass, self._async_start_timesync, TIMESYNC_INTERVAL
+            )
+            self._unsub_startup = async_call_later(
+                self.hass, TIMESYNC_STARTUP_DELAY, self._async_start_timesync
+            )
+
+        @callback
+        def _remove() -> None:
+            self._entries.pop(entry.entry_id, None)
+            if not self._entries:
+                self._async_stop()
+
+        return _remove
+
+    @callback
+    def _async_stop(self) -> None:
+        """Stop scheduling time synchronisation, and any sync running."""
+        if self._task and not self._task.done():
+            self._task.cancel()
+        self._task = None
+        if self._unsub_interval:
+            self._unsub_interval()
+            self._unsub_interval = None
+        if self._unsub_startup:
+            self._unsub_startup()
+            self._unsub_startup = None
+
+    @callback
+    def _async_start_timesync(self, now: datetime) -> None:
+        """Start a fleet time synchronisation unless one is running."""
+        self._unsub_startup = None
+        if self._task and not self._task.done():
+            return
+        self._task = self.hass.async_create_background_task(
+            self.async_timesync_fleet(), f"{DOMAIN} timesync"
+        )
+
+    async def async_timesync_fleet(self) -> None:
+        """Synchronise the clock of every registered device."""
+        await asyncio.gather(
+            *(
+                self._async_timesync(entry, index * TIMESYNC_STAGGER)
+                for index, entry in enumerate(list(self._entries.values()))
+            )
+        )
+
+    async def _async_timesync(self, entry: TSmartConfigEntry, delay: float) -> None:
+        """Synchronise the clock of a device after a delay."""
+        await asyncio.sleep(delay)
+        if entry.entry_id not in self._entries:
+            return
+
+        device = entry.runtime_data.device
+        stats = self.timesync.setdefault(device.device_id, TimesyncStats())
+
+        start = time.monotonic()
+        try:
+            success = await device.async_timesync(tries=1)
+        except TSmartUnsupportedError:
+            _LOGGER.debug("%s: Firmware doesn't answer time sync", device.name)
+            return
+        except TSmartShedError:
+            _LOGGER.debug("%s: Skipped time sync, device busy", device.name)
+            return
+        round_trip_ms = (time.monotonic() - start) * 1000
+
+        stats.attempts += 1
+        stats.last_attempt = dt_util.utcnow()
+        if success:
+            stats.successes += 1
+            stats.last_success = stats.last_attempt
+            stats.last_round_trip_ms = round(round_trip_ms, 1)
+            stats.error_bound_ms = round(round_trip_ms / 2, 1)
+        else:
+            stats.failures += 1
+            _LOGGER.debug("%s: Scheduled time sync failed", device.name)
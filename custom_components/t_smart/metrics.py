@@ -0,0 +1,212 @@
+"""Prometheus metrics endpoint for t_smart devices."""
+
+from __future__ import annotations
+
+from datetime import datetime
+from http import HTTPStatus
+
+from aiohttp import web
+
+from homeassistant.components.http import KEY_HASS, HomeAssistantView
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_track_time_interval
+from homeassistant.util.hass_dict import HassKey
+
+from .common import TSmartConfigEntry
+from .const import DOMAIN, UPDATE_INTERVAL
+from .maintenance import DATA_MAINTENANCE
+
+DATA_METRICS: HassKey[TSmartMetrics] = HassKey(f"{DOMAIN}_metrics")
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Metric families as (name, type, help), in output order
+FAMILIES = [
+    ("tsmart_up", "gauge", "Whether the last poll of the device succeeded."),
+    ("tsmart_temperature_celsius", "gauge", "Water temperature by sensor."),
+    ("tsmart_setpoint_celsius", "gauge", "Target water temperature."),
+    ("tsmart_power", "gauge", "Whether the thermostat is switched on."),
+    ("tsmart_relay", "gauge", "Whether the heating element is on."),
+    ("tsmart_mode", "gauge", "Current operating mode."),
+    ("tsmart_error_active", "gauge", "Whether an error is active, by code."),
+    ("tsmart_errors_total", "counter", "Times the device counted an error, by code."),
+    ("tsmart_warning_active", "gauge", "Whether a warning is active, by code."),
+    (
+        "tsmart_warnings_total",
+        "counter",
+        "Times the device counted a warning, by code.",
+    ),
+    ("tsmart_requests_total", "counter", "Requests sent to the device."),
+    ("tsmart_timeouts_total", "counter", "Requests the device didn't answer."),
+    ("tsmart_shed_total", "counter", "Requests dropped as the device was busy."),
+    ("tsmart_round_trip_seconds", "gauge", "Round trip of the last answered request."),
+    ("tsmart_timesync_failures_total", "counter", "Scheduled time syncs that failed."),
+]
+
+ERROR_CODES = ("e01", "e02", "e03", "e04", "e05")
+WARNING_CODES = ("w01", "w02", "w03")
+
+
+def _escape(value: str) -> str:
+    """Escape a label value."""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class TSmartMetrics:
+    """Renders metrics for the registered devices.
+
+    Devices whose coordinator updated are flagged, and the page re-rendered
+    once per poll interval rather than on every update, so a scrape only
+    returns bytes already rendered. The endpoint is registered when the first
+    device exports metrics, and answers not found while none do.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        self.hass = hass
+        self.page = b""
+        self._entries: dict[str, TSmartConfigEntry] = {}
+        self._samples: dict[str, dict[str, list[str]]] = {}
+        self._dirty: set[str] = set()
+        self._unsub_flush: CALLBACK_TYPE | None = None
+        self._view_registered = False
+
+    @property
+    def enabled(self) -> bool:
+        """Return whether any device exports metrics."""
+        return bool(self._entries)
+
+    @callback
+    def async_add_entry(self, entry: TSmartConfigEntry) -> CALLBACK_TYPE:
+        """Export metrics for a device."""
+        entry_id = entry.entry_id
+        if not self._entries:
+            self._async_start()
+        self._entries[entry_id] = entry
+        self._dirty.add(entry_id)
+        self._async_flush()
+
+        @callback
+        def _async_updated() -> None:
+            self._dirty.add(entry_id)
+
+        unsub = entry.runtime_data.coordinator.async_add_listener(_async_updated)
+
+        @callback
+        def _remove() -> None:
+            unsub()
+            del self._entries[entry_id]
+            self._samples.pop(entry_id, None)
+            self._dirty.discard(entry_id)
+            if not self._entries:
+                self._async_stop()
+            self._async_flush()
+
+        return _remove
+
+    @callback
+    def _async_start(self) -> None:
+        """Register the endpoint if it isn't already, and start rendering."""
+        if not self._view_registered:
+            self.hass.http.register_view(TSmartMetricsView())
+            self._view_registered = True
+        self._unsub_flush = async_track_time_interval(
+            self.hass, self._async_flush, UPDATE_INTERVAL
+        )
+
+    @callback
+    def _async_stop(self) -> None:
+        """Stop rendering."""
+        if self._unsub_flush is not None:
+            self._unsub_flush()
+            self._unsub_flush = None
+
+    @callback
+    def _async_flush(self, now: datetime | None = None) -> None:
+        """Render the samples of the devices that updated, then the page."""
+        if not self._dirty and now is not None:
+            return
+
+        dirty, self._dirty = self._dirty, set()
+        for entry_id in dirty:
+            self._samples[entry_id] = self._render(self._entries[entry_id])
+        self.page = self._render_page()
+
+    def _render(self, entry: TSmartConfigEntry) -> dict[str, list[str]]:
+        """Render the samples of a device by metric family."""
+        device = entry.runtime_data.device
+        coordinator = entry.runtime_data.coordinator
+        labels = (
+            f'device_id="{_escape(device.device_id)}",name="{_escape(device.name)}"'
+        )
+
+        samples: dict[str, list[str]] = {
+            "tsmart_up": [f"{{{labels}}} {int(coordinator.last_update_success)}"],
+            "tsmart_requests_total": [f"{{{labels}}} {device.stats.requests}"],
+            "tsmart_timeouts_total": [f"{{{labels}}} {device.stats.timeouts}"],
+            "tsmart_shed_total": [f"{{{labels}}} {device.stats.shed}"],
+        }
+
+        if device.stats.round_trip is not None:
+            samples["tsmart_round_trip_seconds"] = [
+                f"{{{labels}}} {device.stats.round_trip:.4f}"
+            ]
+
+        timesync = self.hass.data[DATA_MAINTENANCE].timesync.get(device.device_id)
+        if timesync is not None:
+            samples["tsmart_timesync_failures_total"] = [
+                f"{{{labels}}} {timesync.failures}"
+            ]
+
+        if (status := coordinator.data) is not None:
+            samples["tsmart_temperature_celsius"] = [
+                f'{{{labels},sensor="high"}} {status.temperature_high}',
+                f'{{{labels},sensor="low"}} {status.temperature_low}',
+                f'{{{labels},sensor="average"}} {status.temperature_average}',
+            ]
+            samples["tsmart_setpoint_celsius"] = [f"{{{labels}}} {status.setpoint}"]
+            samples["tsmart_power"] = [f"{{{labels}}} {int(status.power)}"]
+            samples["tsmart_relay"] = [f"{{{labels}}} {int(status.relay)}"]
+            samples["tsmart_mode"] = [
+                f'{{{labels},mode="{status.mode.name.lower()}"}} 1'
+            ]
+            for kind, codes in (("error", ERROR_CODES), ("warning", WARNING_CODES)):
+                samples[f"tsmart_{kind}_active"] = [
+                    f'{{{labels},code="{code}"}} {int(getattr(status, code))}'
+                    for code in codes
+                ]
+                samples[f"tsmart_{kind}s_total"] = [
+                    f'{{{labels},code="{code}"}} {getattr(status, f"{code}_count")}'
+                    for code in codes
+                ]
+
+        return samples
+
+    def _render_page(self) -> bytes:
+        """Return the metrics of every device in the exposition format."""
+        lines = []
+        for name, metric_type, description in FAMILIES:
+            family = [
+                f"{name}{sample}"
+                for samples in self._samples.values()
+                for sample in samples.get(name, ())
+            ]
+            if family:
+                lines.append(f"# HELP {name} {description}")
+                lines.append(f"# TYPE {name} {metric_type}")
+                lines.extend(family)
+
+        return "".join(f"{line}\n" for line in lines).encode()
+
+
+class TSmartMetricsView(HomeAssistantView):
+    """Serves the metrics to Prometheus, authenticated with a token."""
+
+    url = f"/api/{DOMAIN}/metrics"
+    name = f"api:{DOMAIN}:metrics"
+
+    async def get(self, request: web.Request) -> web.Response:
+        """Return the metrics."""
+        metrics = request.app[KEY_HASS].data[DATA_METRICS]
+        if not metrics.enabled:
+            return self.json_message("No device exports metrics", HTTPStatus.NOT_FOUND)
+        return web.Response(body=metrics.page, headers={"Content-Type": CONTENT_TYPE})
@@ -0,0 +1,158 @@
+"""Phase-spread polling of t_smart devices."""
+
+from __future__ import annotations
+
+import math
+import zlib
+from collections.abc import Callable
+from datetime import timedelta
+from typing import Any
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_call_at
+from homeassistant.util.hass_dict import HassKey
+
+from .common import TSmartConfigEntry
+from .const import DOMAIN, FAST_POLL_INTERVAL, UPDATE_INTERVAL
+
+DATA_POLLING: HassKey[TSmartPollScheduler] = HassKey(f"{DOMAIN}_polling")
+
+
+def phase_offset(device_id: str, interval: float) -> float:
+    """Return where in the poll interval a device is polled, in seconds."""
+    return zlib.crc32(device_id.encode()) / 2**32 * interval
+
+
+class TSmartPollScheduler:
+    """Polls every device on a fixed grid, each at its own phase.
+
+    Coordinators left to themselves start polling at setup and stay in step,
+    so after a restart every device is polled in the same instant. Here each
+    device is polled at an offset within the interval hashed from its id,
+    which spreads the fleet evenly and stays put over restarts. A poll still
+    running when the next is due is skipped rather than queued. A device can
+    be polled on a longer interval of its own, or on the shorter fast interval
+    for a while, such as to follow a hot water draw, and polled out of turn.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        self.hass = hass
+        self._device_ids: dict[str, str] = {}
+        self._fast: set[str] = set()
+        self._intervals: dict[str, timedelta] = {}
+        self._reschedules: dict[str, CALLBACK_TYPE] = {}
+        self._polls: dict[str, Callable[[], bool]] = {}
+        self._polling: set[str] = set()
+
+    @callback
+    def async_add_entry(self, entry: TSmartConfigEntry) -> CALLBACK_TYPE:
+        """Start polling a device."""
+        coordinator = entry.runtime_data.coordinator
+        device_id = self._device_ids[entry.entry_id] = (
+            entry.runtime_data.device.device_id
+        )
+        unsub: CALLBACK_TYPE | None = None
+
+        @callback
+        def _async_schedule() -> None:
+            nonlocal unsub
+            if unsub is not None:
+                unsub()
+            interval = self._interval(entry.entry_id)
+            offset = phase_offset(device_id, interval)
+            now = self.hass.loop.time()
+            due = offset + (math.floor((now - offset) / interval) + 1) * interval
+            unsub = async_call_at(self.hass, _async_due, due)
+
+        async def _async_poll() -> None:
+            self._polling.add(entry.entry_id)
+            try:
+                await coordinator.async_poll()
+            finally:
+                self._polling.discard(entry.entry_id)
+
+        @callback
+        def _async_start_poll() -> bool:
+            if entry.entry_id in self._polling or entry.pref_disable_polling:
+                return False
+            entry.async_create_background_task(
+                self.hass, _async_poll(), f"{DOMAIN} {entry.title} poll"
+            )
+            return True
+
+        @callback
+        def _async_due(_: Any) -> None:
+            _async_schedule()
+            _async_start_poll()
+
+        _async_schedule()
+        self._reschedules[entry.entry_id] = _async_schedule
+        self._polls[entry.entry_id] = _async_start_poll
+
+        @callback
+        def _remove() -> None:
+            if unsub is not None:
+                unsub()
+            self._device_ids.pop(entry.entry_id, None)
+            self._reschedules.pop(entry.entry_id, None)
+            self._polls.pop(entry.entry_id, None)
+            self._fast.discard(entry.entry_id)
+            self._intervals.pop(entry.entry_id, None)
+
+        return _remove
+
+    def polling(self, entry_id: str) -> bool:
+        """Return whether a poll of a device is running."""
+        return entry_id in self._polling
+
+    @callback
+    def async_poll_now(self, entry_id: str) -> bool:
+        """Poll a device out of turn, returning whether a poll was started.
+
+        Like a scheduled poll, it is skipped if one is still running or polling
+        is disabled for the device.
+        """
+        if (poll := self._polls.get(entry_id)) is None:
+            return False
+        return poll()
+
+    @callback
+    def async_set_interval(self, entry_id: str, interval: timedelta | None) -> None:
+        """Poll a device on an interval of its own, or the usual one if None."""
+        if interval == self._intervals.get(entry_id):
+            return
+        if interval is None:
+            del self._intervals[entry_id]
+        else:
+            self._intervals[entry_id] = interval
+        if (reschedule := self._reschedules.get(entry_id)) is not None:
+            reschedule()
+
+    @callback
+    def async_set_fast(self, entry_id: str, *, fast: bool) -> None:
+        """Poll a device on the fast interval, or go back to the usual one."""
+        if fast == (entry_id in self._fast):
+            return
+        if fast:
+            self._fast.add(entry_id)
+        else:
+            self._fast.discard(entry_id)
+        if (reschedule := self._reschedules.get(entry_id)) is not None:
+            reschedule()
+
+    def _interval(self, entry_id: str) -> float:
+        """Return the seconds between polls of a device."""
+        if entry_id in self._fast:
+            return FAST_POLL_INTERVAL.total_seconds()
+        return self._intervals.get(entry_id, UPDATE_INTERVAL).total_seconds()
+
+    def entry_as_dict(self, entry_id: str) -> dict[str, Any] | None:
+        """Return the poll phase of a device for diagnostics."""
+        if (device_id := self._device_ids.get(entry_id)) is None:
+            return None
+        interval = self._interval(entry_id)
+        return {
+            "interval": interval,
+            "offset": round(phase_offset(device_id, interval), 3),
+            "fast": entry_id in self._fast,
+        }
@@ -0,0 +1,108 @@
+"""Online temperature trend estimation for t_smart."""
+
+from __future__ import annotations
+
+from collections import deque
+
+PREDICTOR_WINDOW = 30  # Samples, 5 minutes at the default poll interval
+PREDICTOR_MIN_SAMPLES = 4
+
+
+class TSmartPredictor:
+    """Fit heat-up and cool-down rates from recent status samples.
+
+    Samples are grouped into phases by relay state. Each phase keeps a sliding
+    window and its slope is refitted by least squares as samples arrive, using
+    running sums so each sample costs O(1). The last good fit for each phase is
+    kept, so a heater that has just switched on can still be predicted from the
+    previous heating cycle.
+    """
+
+    def __init__(self, window: int = PREDICTOR_WINDOW) -> None:
+        self._window = window
+        self._samples: deque[tuple[float, float]] = deque()
+        self._origin = 0.0
+        self._sum_x = 0.0
+        self._sum_y = 0.0
+        self._sum_xx = 0.0
+        self._sum_xy = 0.0
+        self.relay: bool | None = None
+        self.heating_rate: float | None = None  # °C per second, positive
+        self.cooling_rate: float | None = None  # °C per second, negative
+
+    def add_sample(self, timestamp: float, temperature: float, *, relay: bool) -> None:
+        """Add a status sample and refit the current phase."""
+        if relay != self.relay:
+            self._reset(timestamp)
+            self.relay = relay
+
+        x = timestamp - self._origin
+        self._samples.append((x, temperature))
+        self._sum_x += x
+        self._sum_y += temperature
+        self._sum_xx += x * x
+        self._sum_xy += x * temperature
+
+        if len(self._samples) > self._window:
+            old_x, old_y = self._samples.popleft()
+            self._sum_x -= old_x
+            self._sum_y -= old_y
+            self._sum_xx -= old_x * old_x
+            self._sum_xy -= old_x * old_y
+
+        slope = self._slope()
+        if slope is None:
+            return
+
+        if relay and slope > 0:
+            self.heating_rate = slope
+        elif not relay and slope < 0:
+            self.cooling_rate = slope
+
+    def time_to_setpoint(self, temperature: float, setpoint: float) -> float | None:
+        """Return the estimated seconds until the setpoint is reached."""
+        if not self.relay:
+            return None
+        if temperature >= setpoint:
+            return 0
+        if self.heating_rate is None:
+            return None
+        return (setpoint - temperature) / self.heating_rate
+
+    def time_to_cool(self, temperature: float, threshold: float) -> float | None:
+        """Return the estimated seconds until the temperature drops below threshold."""
+        if self.relay is not False:
+            return None
+        if temperature <= threshold:
+            return 0
+        if self.cooling_rate is None:
+            return None
+        return (temperature - threshold) / -self.cooling_rate
+
+    def restart(self) -> None:
+        """Drop the samples of the current phase, keeping the fitted rates.
+
+        Used when samples are about to be taken from a different sensor.
+        """
+        self.relay = None
+
+    def _reset(self, timestamp: float) -> None:
+        """Start a new phase."""
+        self._samples.clear()
+        self._origin = timestamp
+        self._sum_x = 0.0
+        self._sum_y = 0.0
+        self._sum_xx = 0.0
+        self._sum_xy = 0.0
+
+    def _slope(self) -> float | None:
+        """Return the least squares slope of the current phase."""
+        n = len(self._samples)
+        if n < PREDICTOR_MIN_SAMPLES:
+            return None
+
+        denominator = n * self._sum_xx - self._sum_x * self._sum_x
+        if denominator <= 0:
+            return None
+
+        return (n * self._sum_xy - self._sum_x * self._sum_y) / denominator
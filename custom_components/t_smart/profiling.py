@@ -0,0 +1,89 @@
+"""Profiling of t_smart polling."""
+
+from __future__ import annotations
+
+import asyncio
+import cProfile
+import logging
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.exceptions import ServiceValidationError
+from homeassistant.util import dt as dt_util
+from homeassistant.util.hass_dict import HassKey
+
+from .common import TSmartConfigEntry
+from .const import DOMAIN, UPDATE_INTERVAL
+from .tsmart import TSmartProfiler
+
+_LOGGER = logging.getLogger(__name__)
+
+DATA_PROFILER: HassKey[TSmartProfiler] = HassKey(f"{DOMAIN}_profiler")
+
+# Phases reported by the coordinator and entities, on top of the client's
+PHASE_LISTENERS = "listeners"
+PHASE_STATE_WRITE = "state_write"
+
+
+async def async_profile(hass: HomeAssistant, cycles: int) -> dict[str, Any]:
+    """Run cProfile until every device has been polled a number of times.
+
+    The statistics are written to the configuration directory, for example to
+    open with snakeviz, and the path is returned with the phase timings.
+    """
+    entries = hass.config_entries.async_loaded_entries(DOMAIN)
+    if not entries:
+        raise ServiceValidationError("No T-Smart thermostats loaded")
+
+    remaining = {entry.entry_id: cycles for entry in entries}
+    requests = {
+        entry.entry_id: entry.runtime_data.device.stats.requests for entry in entries
+    }
+    finished = asyncio.Event()
+    unsubs = []
+
+    for entry in entries:
+
+        @callback
+        def _async_polled(entry: TSmartConfigEntry = entry) -> None:
+            # Only count polls that reached the device and were answered, not
+            # failed or shed ones, nor updates pushed without a poll
+            sent = entry.runtime_data.device.stats.requests
+            if (
+                not entry.runtime_data.coordinator.last_update_success
+                or sent == requests[entry.entry_id]
+            ):
+                return
+            requests[entry.entry_id] = sent
+            remaining[entry.entry_id] -= 1
+            if all(count <= 0 for count in remaining.values()):
+                finished.set()
+
+        coordinator = entry.runtime_data.coordinator
+        unsubs.append(coordinator.async_add_listener(_async_polled))
+
+    profile = cProfile.Profile()
+    try:
+        profile.enable()
+    except ValueError as err:
+        for unsub in unsubs:
+            unsub()
+        raise ServiceValidationError("Another profiler is already running") from err
+
+    timeout = cycles * UPDATE_INTERVAL.total_seconds() * 2 + 30
+    try:
+        async with asyncio.timeout(timeout):
+            await finished.wait()
+    except TimeoutError:
+        _LOGGER.warning("Not every device was polled %d times, saving anyway", cycles)
+    finally:
+        profile.disable()
+        for unsub in unsubs:
+            unsub()
+
+    path = hass.config.path(
+        f"{DOMAIN}_profile_{dt_util.now().strftime('%Y%m%d_%H%M%S')}.prof"
+    )
+    await hass.async_add_executor_job(profile.dump_stats, path)
+
+    return {"path": path, "timings": hass.data[DATA_PROFILER].percentiles()}
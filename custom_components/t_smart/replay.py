@@ -0,0 +1,38 @@
+"""Replay of recorded t_smart traffic through the coordinator."""
+
+from __future__ import annotations
+
+from .coordinator import TSmartCoordinator
+from .tsmart import TSmartStatus
+from .tsmart.capture import CapturedFrame
+from .tsmart.protocol import status_request
+from .tsmart.replay import is_request
+
+
+async def async_replay_polls(
+    coordinator: TSmartCoordinator, frames: list[CapturedFrame]
+) -> list[TSmartStatus | None]:
+    """Poll the coordinator at the time of each poll of its device in a recording.
+
+    The coordinator's device must use a TSmartReplayTransport of the same
+    recording, so polls, and any waits of the coordinator, run on its virtual
+    clock. Returns the data after each poll, or None where the poll failed.
+    """
+    device = coordinator.device
+    command = status_request()[0]
+    results: list[TSmartStatus | None] = []
+
+    for frame in frames:
+        if (
+            not is_request(frame)
+            or frame.destination[0] != device.ip
+            or frame.data[0] != command
+            # Retries were resent by the poll before
+            or frame.timestamp < device.monotonic()
+        ):
+            continue
+        await device.async_sleep(frame.timestamp - device.monotonic())
+        await coordinator.async_poll()
+        results.append(coordinator.data if coordinator.last_update_success else None)
+
+    return results
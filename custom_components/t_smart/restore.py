@@ -0,0 +1,84 @@
+"""Persistence of the last known state of t_smart devices."""
+
+from __future__ import annotations
+
+import base64
+import binascii
+import struct
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+from homeassistant.util.hass_dict import HassKey
+
+from .const import DOMAIN, RESTORE_SAVE_DELAY
+from .tsmart import TSmart, TSmartStatus
+from .tsmart.protocol import decode_status
+
+DATA_RESTORE: HassKey[TSmartRestoreStore] = HassKey(f"{DOMAIN}_restore")
+
+STORAGE_VERSION = 1
+STORAGE_KEY = f"{DOMAIN}.status"
+
+
+class TSmartRestoreStore:
+    """Keeps the last status frame and firmware of every device.
+
+    Frames are stored raw, base64 encoded, and decoded again on restore. Saves
+    are batched: the first change schedules a write of every device changed
+    until it happens.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        self._store: Store[dict[str, dict[str, Any]]] = Store(
+            hass, STORAGE_VERSION, STORAGE_KEY
+        )
+        self._devices: dict[str, dict[str, Any]] = {}
+        self._save_pending = False
+
+    async def async_load(self) -> None:
+        """Load the stored devices."""
+        self._devices = await self._store.async_load() or {}
+
+    @callback
+    def async_restore(self, device: TSmart) -> TSmartStatus | None:
+        """Restore the firmware of a device, returning its last status if known."""
+        if (stored := self._devices.get(device.device_id)) is None:
+            return None
+
+        try:
+            status = decode_status(base64.b64decode(stored["status"]))
+        except (KeyError, binascii.Error, struct.error, ValueError):
+            return None
+
+        device.firmware_name = stored.get("firmware_name", "")
+        device.firmware_version = stored.get("firmware_version", "")
+        return status
+
+    @callback
+    def async_save(self, device: TSmart, frame: bytes) -> None:
+        """Store the last status frame of a device."""
+        self._devices[device.device_id] = {
+            "status": base64.b64encode(frame).decode(),
+            "firmware_name": device.firmware_name,
+            "firmware_version": device.firmware_version,
+            "updated": dt_util.utcnow().isoformat(),
+        }
+
+        if not self._save_pending:
+            self._save_pending = True
+            self._store.async_delay_save(self._data_to_save, RESTORE_SAVE_DELAY)
+
+    @callback
+    def async_remove(self, device_id: str) -> None:
+        """Forget a device."""
+        if self._devices.pop(device_id, None) is not None:
+            self._save_pending = True
+            self._store.async_delay_save(self._data_to_save, RESTORE_SAVE_DELAY)
+
+    @callback
+    def _data_to_save(self) -> dict[str, dict[str, Any]]:
+        """Return the data to store."""
+        self._save_pending = False
+        return self._devices
@@ -0,0 +1,348 @@
+"""Tariff aware preheat scheduling for t_smart."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections import defaultdict
+from collections.abc import Iterable
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from functools import partial
+
+from homeassistant.core import (
+    CALLBACK_TYPE,
+    Event,
+    EventStateChangedData,
+    HomeAssistant,
+    State,
+    callback,
+)
+from homeassistant.helpers.event import (
+    async_track_point_in_utc_time,
+    async_track_state_change_event,
+    async_track_time_interval,
+)
+from homeassistant.util import dt as dt_util
+from homeassistant.util.hass_dict import HassKey
+
+from .common import TSmartConfigEntry
+from .const import (
+    CONF_PREHEAT_READY_BY,
+    CONF_PREHEAT_TARGET,
+    CONF_TARIFF_SENSOR,
+    DEFAULT_HEATING_RATE,
+    DEFAULT_PREHEAT_READY_BY,
+    DEFAULT_PREHEAT_TARGET,
+    DOMAIN,
+    PREHEAT_REPLAN_INTERVAL,
+    PREHEAT_STAGGER,
+)
+from .holds import DATA_HOLDS, OWNER_PREHEAT
+from .tsmart import TSmartMode
+
+_LOGGER = logging.getLogger(__name__)
+
+DATA_PREHEAT_SCHEDULER: HassKey[TSmartPreheatScheduler] = HassKey(f"{DOMAIN}_preheat")
+
+# Attributes used by common price integrations (Nord Pool, Octopus Energy,
+# Tibber, EPEX Spot...) to publish their upcoming rates
+TARIFF_ATTRIBUTES = ("raw_today", "raw_tomorrow", "rates", "prices", "forecast", "data")
+TARIFF_START_KEYS = ("start", "start_time", "from", "valid_from")
+TARIFF_END_KEYS = ("end", "end_time", "till", "to", "valid_to")
+TARIFF_PRICE_KEYS = ("value", "price", "value_inc_vat", "total", "price_per_kwh")
+
+
+@dataclass(frozen=True, slots=True)
+class TariffSlot:
+    """A period with a fixed price."""
+
+    start: datetime
+    end: datetime
+    price: float
+
+
+@dataclass(frozen=True, slots=True)
+class PreheatPlan:
+    """Planned preheat for a heater."""
+
+    entry_id: str
+    start: datetime
+    ready_by: datetime
+    setpoint: float
+    cost: float
+
+
+def _first(item: dict, keys: Iterable[str]):
+    """Return the first value present for any of keys."""
+    return next((item[key] for key in keys if item.get(key) is not None), None)
+
+
+def _as_datetime(value) -> datetime | None:
+    """Convert a tariff timestamp to an aware UTC datetime."""
+    if isinstance(value, str):
+        value = dt_util.parse_datetime(value)
+    if not isinstance(value, datetime):
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=dt_util.get_default_time_zone())
+    return dt_util.as_utc(value)
+
+
+def parse_tariff(state: State) -> list[TariffSlot]:
+    """Extract the upcoming price slots published by a tariff sensor."""
+    slots: dict[datetime, TariffSlot] = {}
+
+    for attribute in TARIFF_ATTRIBUTES:
+        items = state.attributes.get(attribute)
+        if not isinstance(items, list):
+            continue
+
+        for item in items:
+            if not isinstance(item, dict):
+                continue
+            start = _as_datetime(_first(item, TARIFF_START_KEYS))
+            end = _as_datetime(_first(item, TARIFF_END_KEYS))
+            price = _first(item, TARIFF_PRICE_KEYS)
+            if start is None or end is None or end <= start:
+                continue
+            try:
+                slots[start] = TariffSlot(start, end, float(price))
+            except (TypeError, ValueError):
+                continue
+
+    return sorted(slots.values(), key=lambda slot: slot.start)
+
+
+def _window_cost(slots: list[TariffSlot], start: datetime, end: datetime) -> float:
+    """Return the cost of heating between start and end.
+
+    Periods the tariff does not cover are charged at the highest known price.
+    """
+    fallback = max(slot.price for slot in slots)
+    cost = 0.0
+    covered = 0.0
+    for slot in slots:
+        overlap = (min(end, slot.end) - max(start, slot.start)).total_seconds()
+        if overlap > 0:
+            cost += overlap * slot.price
+            covered += overlap
+    return cost + ((end - start).total_seconds() - covered) * fallback
+
+
+def plan_preheat(
+    slots: list[TariffSlot],
+    now: datetime,
+    ready_by: datetime,
+    duration: timedelta,
+) -> tuple[datetime, float]:
+    """Return the cheapest start time, and its cost, to finish by ready_by.
+
+    With piecewise constant prices the optimal window either starts or ends on a
+    slot boundary, so only those candidates (and the latest possible start) are
+    evaluated. Ties prefer the later start to limit standing losses.
+    """
+    latest = ready_by - duration
+    if latest <= now or not slots:
+        start = max(now, latest)
+        return start, _window_cost(slots, start, start + duration) if slots else 0.0
+
+    candidates = {latest, now}
+    for slot in slots:
+        for boundary in (slot.start, slot.end):
+            candidates.add(boundary)
+            candidates.add(boundary - duration)
+
+    best_start = latest
+    best_cost = _window_cost(slots, latest, ready_by)
+    for start in sorted(candidates, reverse=True):
+        if not now <= start <= latest:
+            continue
+        cost = _window_cost(slots, start, start + duration)
+        if cost < best_cost - 1e-9:
+            best_start = start
+            best_cost = cost
+
+    return best_start, best_cost
+
+
+class TSmartPreheatScheduler:
+    """Schedules preheating of heaters into the cheapest tariff window.
+
+    Plans for every heater are recalculated whenever a tariff sensor changes.
+    Heaters whose preheat starts at the same time are switched on together as
+    one batch, staggered so they do not all draw load at once. Preheating
+    holds a heater through the fleet's holds until it is ready, then puts it
+    back to its own mode and setpoint.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        self.hass = hass
+        self.plans: dict[str, PreheatPlan] = {}
+        self._entries: dict[str, TSmartConfigEntry] = {}
+        self._dispatched: dict[str, datetime] = {}
+        self._unsub_timers: list[CALLBACK_TYPE] = []
+        self._unsub_state: CALLBACK_TYPE | None = None
+        self._unsub_interval: CALLBACK_TYPE | None = None
+
+    @callback
+    def async_add_entry(self, entry: TSmartConfigEntry) -> CALLBACK_TYPE:
+        """Start scheduling preheats for a heater."""
+        self._entries[entry.entry_id] = entry
+        self._async_track()
+        self.async_replan()
+
+        @callback
+        def _remove() -> None:
+            self._entries.pop(entry.entry_id, None)
+            self._dispatched.pop(entry.entry_id, None)
+            self._async_track()
+            self.async_replan()
+            # Preheats end when scheduling is turned off, but carry on over a
+            # restart so they are released at their time
+            device_id = entry.runtime_data.device.device_id
+            holds = self.hass.data[DATA_HOLDS]
+            if holds.owner(device_id) == OWNER_PREHEAT and self.hass.is_running:
+                self.hass.async_create_background_task(
+                    holds.async_release(entry, OWNER_PREHEAT),
+                    f"{DOMAIN} preheat release",
+                )
+
+        return _remove
+
+    @callback
+    def _async_track(self) -> None:
+        """Track the tariff sensors used by the registered heaters."""
+        if self._unsub_state:
+            self._unsub_state()
+            self._unsub_state = None
+
+        sensors = {entry.data[CONF_TARIFF_SENSOR] for entry in self._entries.values()}
+        if sensors:
+            self._unsub_state = async_track_state_change_event(
+                self.hass, list(sensors), self._async_tariff_changed
+            )
+            if self._unsub_interval is None:
+                self._unsub_interval = async_track_time_interval(
+                    self.hass, self._async_replan_interval, PREHEAT_REPLAN_INTERVAL
+                )
+        elif self._unsub_interval:
+            self._unsub_interval()
+            self._unsub_interval = None
+
+    @callback
+    def _async_tariff_changed(self, event: Event[EventStateChangedData]) -> None:
+        """Replan when a tariff changes."""
+        self.async_replan()
+
+    @callback
+    def _async_replan_interval(self, now: datetime) -> None:
+        """Replan periodically to pick up new temperatures and heating rates."""
+        self.async_replan()
+
+    @callback
+    def async_replan(self) -> None:
+        """Recalculate the preheat plans and reschedule the batches."""
+        for unsub in self._unsub_timers:
+            unsub()
+        self._unsub_timers.clear()
+        self.plans.clear()
+
+        now = dt_util.utcnow()
+        batches: dict[datetime, list[PreheatPlan]] = defaultdict(list)
+        for entry in self._entries.values():
+            if plan := self._async_plan_entry(entry, now):
+                self.plans[entry.entry_id] = plan
+                batches[plan.start].append(plan)
+
+        for start, plans in batches.items():
+            if start <= now:
+                self._async_start_batch(plans, now)
+                continue
+            self._unsub_timers.append(
+                async_track_point_in_utc_time(
+                    self.hass, partial(self._async_start_batch, plans), start
+                )
+            )
+
+    def _async_plan_entry(
+        self, entry: TSmartConfigEntry, now: datetime
+    ) -> PreheatPlan | None:
+        """Calculate the preheat plan for a heater."""
+        coordinator = entry.runtime_data.coordinator
+        if coordinator.data is None:
+            return None
+
+        ready_by = self._next_ready_by(entry, now)
+        if self._dispatched.get(entry.entry_id) == ready_by:
+            return None
+
+        state = self.hass.states.get(entry.data[CONF_TARIFF_SENSOR])
+        if state is None:
+            return None
+
+        setpoint = entry.data.get(CONF_PREHEAT_TARGET, DEFAULT_PREHEAT_TARGET)
+        temperature = coordinator.temperature_for_mode(coordinator.data)
+        if temperature >= setpoint:
+            return None
+
+        rate = coordinator.predictor.heating_rate or DEFAULT_HEATING_RATE
+        duration = timedelta(seconds=(setpoint - temperature) / rate)
+        start, cost = plan_preheat(parse_tariff(state), now, ready_by, duration)
+
+        return PreheatPlan(
+            entry_id=entry.entry_id,
+            start=start,
+            ready_by=ready_by,
+            setpoint=setpoint,
+            cost=cost,
+        )
+
+    @staticmethod
+    def _next_ready_by(entry: TSmartConfigEntry, now: datetime) -> datetime:
+        """Return the next time the heater should be up to temperature."""
+        ready_by = dt_util.parse_time(
+            entry.data.get(CONF_PREHEAT_READY_BY, DEFAULT_PREHEAT_READY_BY)
+        )
+        local_now = dt_util.as_local(now)
+        target = local_now.replace(
+            hour=ready_by.hour, minute=ready_by.minute, second=0, microsecond=0
+        )
+        if target <= local_now:
+            target += timedelta(days=1)
+        return dt_util.as_utc(target)
+
+    @callback
+    def _async_start_batch(self, plans: list[PreheatPlan], now: datetime) -> None:
+        """Start a batch of preheats."""
+        for plan in plans:
+            self._dispatched[plan.entry_id] = plan.ready_by
+        self.hass.async_create_background_task(
+            self._async_dispatch(plans), f"{DOMAIN} preheat batch"
+        )
+
+    async def _async_dispatch(self, plans: list[PreheatPlan]) -> None:
+        """Send the preheat commands for a batch, staggered across heaters."""
+        for index, plan in enumerate(plans):
+            if index:
+                await asyncio.sleep(PREHEAT_STAGGER)
+
+            entry = self._entries.get(plan.entry_id)
+            if entry is None:
+                continue
+
+            _LOGGER.debug(
+                "%s: Starting preheat to %s, ready by %s",
+                entry.runtime_data.device.name,
+                plan.setpoint,
+                plan.ready_by,
+            )
+            if not await self.hass.data[DATA_HOLDS].async_hold(
+                entry,
+                OWNER_PREHEAT,
+                power=True,
+                mode=TSmartMode.MANUAL,
+                setpoint=plan.setpoint,
+                until=plan.ready_by,
+            ):
+                _LOGGER.debug("%s: Preheat not started", entry.runtime_data.device.name)
@@ -1,31 +1,97 @@
 """Sensor platform for t_smart."""
 
+from abc import abstractmethod
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import datetime
+
 from homeassistant.components.sensor import (
     SensorDeviceClass,
     SensorEntity,
+    SensorEntityDescription,
     SensorStateClass,
 )
 from homeassistant.const import (
     PRECISION_TENTHS,
+    UnitOfEnergy,
     UnitOfTemperature,
+    UnitOfTime,
+    UnitOfVolume,
 )
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.temperature import display_temp
+from homeassistant.helpers.typing import ConfigType, DiscoveryInfoType
 
+from .aggregates import (
+    DATA_AGGREGATES,
+    SIGNAL_GROUP_ADDED,
+    FleetTotals,
+    GroupKey,
+    TSmartFleetAggregates,
+    signal_group_removed,
+    signal_group_updated,
+)
 from .common import TSmartConfigEntry
 from .const import (
     ATTR_TEMPERATURE_AVERAGE,
     ATTR_TEMPERATURE_HIGH,
     ATTR_TEMPERATURE_LOW,
+    ATTR_UNCERTAINTY,
+    CONF_DRAW_DETECTION,
+    CONF_LEGIONELLA,
+    CONF_LEGIONELLA_TEMPERATURE,
+    DEFAULT_LEGIONELLA_TEMPERATURE,
+    PREDICTION_TOLERANCE,
     TEMPERATURE_MODE_HIGH,
     TEMPERATURE_MODE_LOW,
 )
-from .entity import TSmartEntity
+from .draw import DATA_DRAW, HotWaterUsage
+from .entity import TSmartEntity, TSmartEstimatedTemperatureEntity
+from .legionella import DATA_LEGIONELLA, LegionellaCycle
 
 PARALLEL_UPDATES = 0
 
 
+@dataclass(frozen=True, kw_only=True)
+class TSmartFleetSensorEntityDescription(SensorEntityDescription):
+    """Describes T-Smart fleet sensor entity."""
+
+    value_fn: Callable[[FleetTotals], float | int | None]
+
+
+FLEET_SENSORS: tuple[TSmartFleetSensorEntityDescription, ...] = (
+    TSmartFleetSensorEntityDescription(
+        key="heating",
+        translation_key="fleet_heating",
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda totals: totals.heating,
+    ),
+    TSmartFleetSensorEntityDescription(
+        key="online",
+        translation_key="fleet_online",
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda totals: totals.online,
+    ),
+    TSmartFleetSensorEntityDescription(
+        key="critical",
+        translation_key="fleet_critical",
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda totals: totals.critical,
+    ),
+    TSmartFleetSensorEntityDescription(
+        key="temperature",
+        translation_key="fleet_temperature",
+        device_class=SensorDeviceClass.TEMPERATURE,
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement=UnitOfTemperature.CELSIUS,
+        suggested_display_precision=1,
+        value_fn=lambda totals: totals.average_temperature,
+    ),
+)
+
+
 async def async_setup_entry(
     hass: HomeAssistant,
     config_entry: TSmartConfigEntry,
@@ -33,10 +99,57 @@ async def async_setup_entry(
 ) -> None:
     """Set up the sensor platform."""
     coordinator = config_entry.runtime_data.coordinator
-    async_add_entities([TSmartTemperatureSensorEntity(coordinator)])
+    entities: list[SensorEntity] = [
+        TSmartTemperatureSensorEntity(coordinator),
+        TSmartTimeToSetpointSensorEntity(coordinator),
+        TSmartTimeToCoolSensorEntity(coordinator),
+    ]
+
+    if config_entry.data.get(CONF_LEGIONELLA):
+        entities.extend(
+            [
+                TSmartLegionellaTimeAboveSensorEntity(coordinator),
+                TSmartLegionellaLastCycleSensorEntity(coordinator),
+            ]
+        )
+
+    if config_entry.data.get(CONF_DRAW_DETECTION):
+        entities.extend(
+            [
+                TSmartHotWaterVolumeSensorEntity(coordinator),
+                TSmartHotWaterEnergySensorEntity(coordinator),
+                TSmartHotWaterDrawsSensorEntity(coordinator),
+            ]
+        )
+
+    async_add_entities(entities)
+
+
+async def async_setup_platform(
+    hass: HomeAssistant,
+    config: ConfigType,
+    async_add_entities: AddEntitiesCallback,
+    discovery_info: DiscoveryInfoType | None = None,
+) -> None:
+    """Set up the fleet sensors, loaded once for the whole integration."""
+    if discovery_info is None:
+        return
+
+    aggregates = hass.data[DATA_AGGREGATES]
+
+    @callback
+    def _async_add_group(key: GroupKey) -> None:
+        async_add_entities(
+            TSmartFleetSensorEntity(aggregates, key, description)
+            for description in FLEET_SENSORS
+        )
+
+    for key in aggregates.totals:
+        _async_add_group(key)
+    async_dispatcher_connect(hass, SIGNAL_GROUP_ADDED, _async_add_group)
 
 
-class TSmartTemperatureSensorEntity(TSmartEntity, SensorEntity):
+class TSmartTemperatureSensorEntity(TSmartEstimatedTemperatureEntity, SensorEntity):
     """t_smart Temperature Sensor class."""
 
     _attr_device_class = SensorDeviceClass.TEMPERATURE
@@ -52,8 +165,10 @@ class TSmartTemperatureSensorEntity(TSmartEntity, SensorEntity):
 
     @property
     def native_value(self) -> int | None:
-        """Return the value reported by the sensor."""
-        if self.coordinator.temperature_mode == TEMPERATURE_MODE_HIGH:
+        """Return the value reported by the sensor, or estimated since."""
+        if (estimate := self.estimate) is not None:
+            new_value = estimate[0]
+        elif self.coordinator.temperature_mode == TEMPERATURE_MODE_HIGH:
             new_value = self.coordinator.data.temperature_high
         elif self.coordinator.temperature_mode == TEMPERATURE_MODE_LOW:
             new_value = self.coordinator.data.temperature_low
@@ -92,8 +207,304 @@ class TSmartTemperatureSensorEntity(TSmartEntity, SensorEntity):
                 PRECISION_TENTHS,
             ),
         }
+        if (estimate := self.estimate) is not None:
+            attrs[ATTR_UNCERTAINTY] = round(estimate[1], 2)
+
+        super_attrs = super().extra_state_attributes
+        if super_attrs:
+            attrs.update(super_attrs)
+        return attrs
+
+
+class TSmartPredictionSensorEntity(TSmartEntity, SensorEntity):
+    """t_smart base class for predicted durations.
+
+    State is only written when the estimate moves by more than the prediction
+    tolerance, or the availability or attributes change, so automations can
+    trigger on it without chasing every poll.
+    """
+
+    _attr_device_class = SensorDeviceClass.DURATION
+    _attr_native_unit_of_measurement = UnitOfTime.MINUTES
+    _attr_suggested_display_precision = 0
+
+    def __init__(self, coordinator) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator)
+        self._attr_native_value = self._estimate()
+        self._written_available: bool | None = None
+        self._written_attributes: dict | None = None
+
+    @abstractmethod
+    def _estimate(self) -> float | None:
+        """Return the estimate in minutes."""
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Handle updated data from the coordinator."""
+        value = self._estimate()
+        old_value = self._attr_native_value
+
+        changed = (
+            (value is None) != (old_value is None)
+            or (value is not None and abs(value - old_value) > PREDICTION_TOLERANCE)
+            or (value == 0) != (old_value == 0)
+        )
+        attributes = self.extra_state_attributes
+        if (
+            not changed
+            and self._written_available == self.available
+            and self._written_attributes == attributes
+        ):
+            return
+
+        self._attr_native_value = value
+        self._written_available = self.available
+        self._written_attributes = attributes
+        self.async_write_ha_state()
+
+
+class TSmartTimeToSetpointSensorEntity(TSmartPredictionSensorEntity):
+    """t_smart Time to Setpoint Sensor class."""
+
+    _attr_translation_key = "time_to_setpoint"
+
+    @property
+    def unique_id(self) -> str:
+        """Return a unique ID."""
+        return f"{self.device.device_id}_time_to_setpoint"
+
+    def _estimate(self) -> float | None:
+        """Return the minutes until the setpoint is reached while heating."""
+        data = self.coordinator.data
+        seconds = self.coordinator.predictor.time_to_setpoint(
+            self.coordinator.temperature_for_mode(data), data.setpoint
+        )
+        return None if seconds is None else round(seconds / 60, 1)
+
+
+class TSmartTimeToCoolSensorEntity(TSmartPredictionSensorEntity):
+    """t_smart Time to Cool Sensor class."""
+
+    _attr_translation_key = "time_to_cool"
+
+    @property
+    def unique_id(self) -> str:
+        """Return a unique ID."""
+        return f"{self.device.device_id}_time_to_cool"
+
+    def _estimate(self) -> float | None:
+        """Return the minutes until the temperature falls below the threshold."""
+        seconds = self.coordinator.predictor.time_to_cool(
+            self.coordinator.temperature_for_mode(self.coordinator.data),
+            self.coordinator.cool_threshold,
+        )
+        return None if seconds is None else round(seconds / 60, 1)
+
+    @property
+    def extra_state_attributes(self) -> dict[str, float] | None:
+        """Return the state attributes of the sensor."""
+        attrs = {"threshold": self.coordinator.cool_threshold}
 
         super_attrs = super().extra_state_attributes
         if super_attrs:
             attrs.update(super_attrs)
         return attrs
+
+
+class TSmartLegionellaSensorEntity(TSmartEntity, SensorEntity):
+    """t_smart base class for Legionella compliance sensors."""
+
+    @property
+    def cycle(self) -> LegionellaCycle | None:
+        """Return the heater's compliance state."""
+        return self.hass.data[DATA_LEGIONELLA].cycles.get(self.device.device_id)
+
+    @property
+    def available(self) -> bool:
+        """Return if the heater is being tracked."""
+        return super().available and self.cycle is not None
+
+
+class TSmartLegionellaTimeAboveSensorEntity(TSmartLegionellaSensorEntity):
+    """t_smart Legionella Time Above Threshold Sensor class."""
+
+    _attr_device_class = SensorDeviceClass.DURATION
+    _attr_native_unit_of_measurement = UnitOfTime.MINUTES
+    _attr_suggested_display_precision = 0
+    _attr_translation_key = "legionella_time_above"
+
+    @property
+    def unique_id(self) -> str:
+        """Return a unique ID."""
+        return f"{self.device.device_id}_legionella_time_above"
+
+    @property
+    def native_value(self) -> float | None:
+        """Return the minutes above the threshold in the current week."""
+        return round(self.cycle.time_above / 60, 1)
+
+    @property
+    def extra_state_attributes(self) -> dict[str, str | float] | None:
+        """Return the state attributes of the sensor."""
+        attrs = {
+            "threshold": self.coordinator.config_entry.data.get(
+                CONF_LEGIONELLA_TEMPERATURE, DEFAULT_LEGIONELLA_TEMPERATURE
+            ),
+            "window_start": self.cycle.window_start.isoformat(),
+        }
+
+        super_attrs = super().extra_state_attributes
+        if super_attrs:
+            attrs.update(super_attrs)
+        return attrs
+
+
+class TSmartLegionellaLastCycleSensorEntity(TSmartLegionellaSensorEntity):
+    """t_smart Legionella Last Compliant Cycle Sensor class."""
+
+    _attr_device_class = SensorDeviceClass.TIMESTAMP
+    _attr_translation_key = "legionella_last_cycle"
+
+    @property
+    def unique_id(self) -> str:
+        """Return a unique ID."""
+        return f"{self.device.device_id}_legionella_last_cycle"
+
+    @property
+    def native_value(self) -> datetime | None:
+        """Return when the last compliant cycle completed."""
+        return self.cycle.last_compliant
+
+
+class TSmartHotWaterSensorEntity(TSmartEntity, SensorEntity):
+    """t_smart base class for hot water usage sensors."""
+
+    _attr_state_class = SensorStateClass.TOTAL_INCREASING
+
+    @property
+    def usage(self) -> HotWaterUsage | None:
+        """Return the heater's usage today."""
+        return self.hass.data[DATA_DRAW].usage.get(self.device.device_id)
+
+    @property
+    def available(self) -> bool:
+        """Return if draws are being detected."""
+        return super().available and self.usage is not None
+
+
+class TSmartHotWaterVolumeSensorEntity(TSmartHotWaterSensorEntity):
+    """t_smart Hot Water Drawn Today Sensor class."""
+
+    _attr_device_class = SensorDeviceClass.WATER
+    _attr_native_unit_of_measurement = UnitOfVolume.LITERS
+    _attr_suggested_display_precision = 0
+    _attr_translation_key = "hot_water_volume"
+
+    @property
+    def unique_id(self) -> str:
+        """Return a unique ID."""
+        return f"{self.device.device_id}_hot_water_volume"
+
+    @property
+    def native_value(self) -> float | None:
+        """Return the estimated litres of hot water drawn today."""
+        return round(self.usage.volume, 1)
+
+    @property
+    def extra_state_attributes(self) -> dict[str, str | None] | None:
+        """Return the state attributes of the sensor."""
+        last_draw = self.usage.last_draw
+        attrs = {"last_draw": last_draw.isoformat() if last_draw else None}
+
+        super_attrs = super().extra_state_attributes
+        if super_attrs:
+            attrs.update(super_attrs)
+        return attrs
+
+
+class TSmartHotWaterEnergySensorEntity(TSmartHotWaterSensorEntity):
+    """t_smart Hot Water Energy Drawn Today Sensor class."""
+
+    _attr_device_class = SensorDeviceClass.ENERGY
+    _attr_native_unit_of_measurement = UnitOfEnergy.KILO_WATT_HOUR
+    _attr_suggested_display_precision = 2
+    _attr_translation_key = "hot_water_energy"
+
+    @property
+    def unique_id(self) -> str:
+        """Return a unique ID."""
+        return f"{self.device.device_id}_hot_water_energy"
+
+    @property
+    def native_value(self) -> float | None:
+        """Return the estimated energy drawn with the hot water today."""
+        return round(self.usage.energy, 3)
+
+
+class TSmartHotWaterDrawsSensorEntity(TSmartHotWaterSensorEntity):
+    """t_smart Hot Water Draws Today Sensor class."""
+
+    _attr_translation_key = "hot_water_draws"
+
+    @property
+    def unique_id(self) -> str:
+        """Return a unique ID."""
+        return f"{self.device.device_id}_hot_water_draws"
+
+    @property
+    def native_value(self) -> int | None:
+        """Return the number of draws today."""
+        return self.usage.draws
+
+
+class TSmartFleetSensorEntity(SensorEntity):
+    """t_smart Fleet Sensor class, totalling a group of heaters."""
+
+    entity_description: TSmartFleetSensorEntityDescription
+    _attr_has_entity_name = True
+    _attr_should_poll = False
+
+    def __init__(
+        self,
+        aggregates: TSmartFleetAggregates,
+        key: GroupKey,
+        description: TSmartFleetSensorEntityDescription,
+    ) -> None:
+        """Initialize the sensor."""
+        self.entity_description = description
+        self._totals = aggregates.totals[key]
+        self._key = key
+        self._attr_unique_id = f"fleet_{key[0]}_{key[1]}_{description.key}"
+        self._attr_translation_placeholders = {"group": self._totals.name}
+
+    async def async_added_to_hass(self) -> None:
+        """Write the state whenever the group's totals are flushed.
+
+        The sensor is removed once the group has no heaters left.
+        """
+        self.async_on_remove(
+            async_dispatcher_connect(
+                self.hass, signal_group_updated(self._key), self.async_write_ha_state
+            )
+        )
+        self.async_on_remove(
+            async_dispatcher_connect(
+                self.hass, signal_group_removed(self._key), self.async_remove
+            )
+        )
+
+    @property
+    def available(self) -> bool:
+        """Return if the group has any heaters."""
+        return self._totals.members > 0
+
+    @property
+    def native_value(self) -> float | int | None:
+        """Return the value totalled over the group."""
+        return self.entity_description.value_fn(self._totals)
+
+    @property
+    def extra_state_attributes(self) -> dict[str, int]:
+        """Return the state attributes of the sensor."""
+        return {"heaters": self._totals.members}
@@ -0,0 +1,235 @@
+"""Services for t_smart."""
+
+from __future__ import annotations
+
+import asyncio
+
+import voluptuous as vol
+
+from homeassistant.components.climate import ATTR_PRESET_MODE
+from homeassistant.const import ATTR_TEMPERATURE
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+    callback,
+)
+from homeassistant.exceptions import ServiceValidationError
+from homeassistant.helpers import config_validation as cv
+from homeassistant.util import dt as dt_util
+
+from .climate import PRESET_MAP
+from .common import async_get_transport
+from .const import (
+    ATTR_CYCLES,
+    ATTR_DURATION,
+    ATTR_ENABLED,
+    ATTR_FRAME_RATE,
+    ATTR_MAX_CONCURRENT,
+    ATTR_MAX_FAILURE_RATE,
+    ATTR_MAX_POWER,
+    ATTR_MAX_RELAYS,
+    ATTR_POWER,
+    ATTR_RECOVERY_TIMEOUT,
+    ATTR_SETBACK_TEMPERATURE,
+    ATTR_STAGGER,
+    DEFAULT_SETBACK_TEMPERATURE,
+    DOMAIN,
+    SERVICE_CAPTURE_TRAFFIC,
+    SERVICE_PROFILE,
+    SERVICE_ROLLING_RESTART,
+    SERVICE_SET_DEMAND_LIMIT,
+    SERVICE_SET_FLEET,
+    SERVICE_SET_TRACE,
+)
+from .demand import DATA_DEMAND
+from .fleet import async_get_target_entries, async_rolling_restart, async_set_fleet
+from .profiling import async_profile
+from .tracing import DATA_TRACER, set_trace
+from .tsmart import TSmartRecorder
+
+SET_FLEET_SCHEMA = vol.Schema(
+    {
+        **cv.TARGET_SERVICE_FIELDS,
+        vol.Optional(ATTR_POWER): cv.boolean,
+        vol.Optional(ATTR_PRESET_MODE): vol.In(list(PRESET_MAP)),
+        vol.Optional(ATTR_TEMPERATURE): vol.All(
+            vol.Coerce(float), vol.Range(min=10, max=75)
+        ),
+        vol.Optional(ATTR_MAX_CONCURRENT, default=10): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=100)
+        ),
+        vol.Optional(ATTR_STAGGER, default=0): vol.All(
+            vol.Coerce(float), vol.Range(min=0, max=60)
+        ),
+    }
+)
+
+ROLLING_RESTART_SCHEMA = vol.Schema(
+    {
+        **cv.TARGET_SERVICE_FIELDS,
+        vol.Optional(ATTR_MAX_CONCURRENT, default=1): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=100)
+        ),
+        vol.Optional(ATTR_MAX_FAILURE_RATE, default=0.2): vol.All(
+            vol.Coerce(float), vol.Range(min=0, max=1)
+        ),
+        vol.Optional(ATTR_RECOVERY_TIMEOUT, default=120): vol.All(
+            vol.Coerce(float), vol.Range(min=10, max=600)
+        ),
+    }
+)
+
+CAPTURE_TRAFFIC_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_DURATION, default=60): vol.All(
+            vol.Coerce(float), vol.Range(min=1, max=3600)
+        ),
+    }
+)
+
+PROFILE_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_CYCLES, default=5): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=100)
+        ),
+    }
+)
+
+SET_DEMAND_LIMIT_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_MAX_RELAYS): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=1000)
+        ),
+        vol.Optional(ATTR_MAX_POWER): vol.All(
+            vol.Coerce(float), vol.Range(min=0.5, max=10000)
+        ),
+        vol.Optional(
+            ATTR_SETBACK_TEMPERATURE, default=DEFAULT_SETBACK_TEMPERATURE
+        ): vol.All(vol.Coerce(float), vol.Range(min=10, max=75)),
+    }
+)
+
+SET_TRACE_SCHEMA = vol.Schema(
+    {
+        **cv.TARGET_SERVICE_FIELDS,
+        vol.Optional(ATTR_ENABLED, default=True): cv.boolean,
+        vol.Optional(ATTR_FRAME_RATE): vol.All(
+            vol.Coerce(float), vol.Range(min=0, max=1)
+        ),
+    }
+)
+
+
+@callback
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the integration services."""
+
+    async def async_handle_set_fleet(call: ServiceCall) -> ServiceResponse:
+        """Set power, preset and temperature on many thermostats at once."""
+        preset_mode = call.data.get(ATTR_PRESET_MODE)
+        return await async_set_fleet(
+            async_get_target_entries(hass, call),
+            power=call.data.get(ATTR_POWER),
+            mode=PRESET_MAP[preset_mode] if preset_mode else None,
+            setpoint=call.data.get(ATTR_TEMPERATURE),
+            max_concurrent=call.data[ATTR_MAX_CONCURRENT],
+            stagger=call.data[ATTR_STAGGER],
+        )
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_SET_FLEET,
+        async_handle_set_fleet,
+        schema=SET_FLEET_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+    async def async_handle_rolling_restart(call: ServiceCall) -> ServiceResponse:
+        """Restart many thermostats, a few at a time."""
+        return await async_rolling_restart(
+            async_get_target_entries(hass, call),
+            max_concurrent=call.data[ATTR_MAX_CONCURRENT],
+            max_failure_rate=call.data[ATTR_MAX_FAILURE_RATE],
+            recovery_timeout=call.data[ATTR_RECOVERY_TIMEOUT],
+        )
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_ROLLING_RESTART,
+        async_handle_rolling_restart,
+        schema=ROLLING_RESTART_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+    async def async_handle_capture_traffic(call: ServiceCall) -> ServiceResponse:
+        """Record all T-Smart traffic for a while to a pcap file."""
+        transport = async_get_transport(hass)
+        if transport.recorder is not None:
+            raise ServiceValidationError("A traffic capture is already running")
+
+        recorder = transport.recorder = TSmartRecorder()
+        try:
+            await asyncio.sleep(call.data[ATTR_DURATION])
+        finally:
+            transport.recorder = None
+
+        path = hass.config.path(
+            f"{DOMAIN}_{dt_util.now().strftime('%Y%m%d_%H%M%S')}.pcap"
+        )
+        await hass.async_add_executor_job(recorder.dump, path)
+        return {"path": path, "frames": len(recorder.frames)}
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_CAPTURE_TRAFFIC,
+        async_handle_capture_traffic,
+        schema=CAPTURE_TRAFFIC_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+    async def async_handle_profile(call: ServiceCall) -> ServiceResponse:
+        """Profile a number of poll cycles of every thermostat."""
+        return await async_profile(hass, call.data[ATTR_CYCLES])
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_PROFILE,
+        async_handle_profile,
+        schema=PROFILE_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+    async def async_handle_set_demand_limit(call: ServiceCall) -> ServiceResponse:
+        """Set the fleet load budget, leaving both limits out removes it."""
+        return await hass.data[DATA_DEMAND].async_configure(
+            max_relays=call.data.get(ATTR_MAX_RELAYS),
+            max_power=call.data.get(ATTR_MAX_POWER),
+            setback=call.data[ATTR_SETBACK_TEMPERATURE],
+        )
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_SET_DEMAND_LIMIT,
+        async_handle_set_demand_limit,
+        schema=SET_DEMAND_LIMIT_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+    async def async_handle_set_trace(call: ServiceCall) -> ServiceResponse:
+        """Start or stop tracing the traffic of thermostats."""
+        return set_trace(
+            hass.data[DATA_TRACER],
+            async_get_target_entries(hass, call),
+            enabled=call.data[ATTR_ENABLED],
+            frame_rate=call.data.get(ATTR_FRAME_RATE),
+        )
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_SET_TRACE,
+        async_handle_set_trace,
+        schema=SET_TRACE_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
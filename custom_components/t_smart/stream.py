@@ -0,0 +1,157 @@
+"""Compact status deltas of t_smart devices for subscribers."""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+from dataclasses import fields
+from datetime import datetime
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_track_time_interval
+from homeassistant.util.hass_dict import HassKey
+
+from .common import TSmartConfigEntry
+from .const import DOMAIN, UPDATE_INTERVAL
+from .tsmart import TSmartStatus
+
+DATA_STREAM: HassKey[TSmartStatusStream] = HassKey(f"{DOMAIN}_stream")
+
+STATUS_FIELDS = tuple(field.name for field in fields(TSmartStatus))
+
+# Device values by field, None for a device that was removed
+type Deltas = dict[str, dict[str, float | int] | None]
+
+
+def status_values(
+    status: TSmartStatus | None, *, available: bool
+) -> dict[str, float | int]:
+    """Return the raw values of a status, booleans and the mode as integers."""
+    values: dict[str, float | int] = {"available": int(available)}
+    if status is not None:
+        for name in STATUS_FIELDS:
+            value = getattr(status, name)
+            values[name] = value if type(value) is float else int(value)
+    return values
+
+
+class TSmartStatusStream:
+    """Sends subscribers the fields that changed, batched once per poll interval.
+
+    Statuses are only followed while there are subscribers. A status whose
+    frame is the same as the previous one is skipped without decoding it
+    further, otherwise its values are compared field by field with the last
+    ones seen. Changes are merged until the next flush, so a device polled
+    more than once in an interval is sent once, with its latest values.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        self.hass = hass
+        self._entries: dict[str, TSmartConfigEntry] = {}
+        self._subscribers: list[Callable[[Deltas], None]] = []
+        self._values: dict[str, dict[str, float | int]] = {}
+        self._frames: dict[str, bytes | None] = {}
+        self._pending: Deltas = {}
+        self._unsubs: dict[str, CALLBACK_TYPE] = {}
+        self._unsub_interval: CALLBACK_TYPE | None = None
+
+    @callback
+    def async_add_entry(self, entry: TSmartConfigEntry) -> CALLBACK_TYPE:
+        """Include a device in the stream."""
+        self._entries[entry.entry_id] = entry
+        if self._subscribers:
+            self._async_follow(entry)
+
+        @callback
+        def _remove() -> None:
+            del self._entries[entry.entry_id]
+            if (unsub := self._unsubs.pop(entry.entry_id, None)) is not None:
+                unsub()
+                device_id = entry.runtime_data.device.device_id
+                self._values.pop(device_id, None)
+                self._frames.pop(device_id, None)
+                self._pending[device_id] = None
+
+        return _remove
+
+    @callback
+    def async_subscribe(self, send: Callable[[Deltas], None]) -> CALLBACK_TYPE:
+        """Send the changes of every device until unsubscribed."""
+        if not self._subscribers:
+            for entry in self._entries.values():
+                self._async_follow(entry)
+            self._pending.clear()
+            self._unsub_interval = async_track_time_interval(
+                self.hass, self._async_flush, UPDATE_INTERVAL
+            )
+        self._subscribers.append(send)
+
+        @callback
+        def _unsubscribe() -> None:
+            self._subscribers.remove(send)
+            if self._subscribers:
+                return
+            for unsub in self._unsubs.values():
+                unsub()
+            self._unsubs.clear()
+            self._values.clear()
+            self._frames.clear()
+            self._pending.clear()
+            if self._unsub_interval is not None:
+                self._unsub_interval()
+                self._unsub_interval = None
+
+        return _unsubscribe
+
+    def snapshot(self) -> Deltas:
+        """Return every device's values, for a new subscriber to start from."""
+        return {device_id: dict(values) for device_id, values in self._values.items()}
+
+    @callback
+    def _async_follow(self, entry: TSmartConfigEntry) -> None:
+        """Start following a device's statuses."""
+
+        @callback
+        def _async_updated() -> None:
+            self._async_update(entry)
+
+        self._unsubs[entry.entry_id] = (
+            entry.runtime_data.coordinator.async_add_listener(_async_updated)
+        )
+        self._async_update(entry)
+
+    @callback
+    def _async_update(self, entry: TSmartConfigEntry) -> None:
+        """Note the fields of a device that changed."""
+        coordinator = entry.runtime_data.coordinator
+        device_id = entry.runtime_data.device.device_id
+        available = coordinator.last_update_success
+        frame = coordinator.device.status_frame if available else None
+        if (
+            device_id in self._frames
+            and frame is not None
+            and frame == self._frames[device_id]
+        ):
+            return
+        self._frames[device_id] = frame
+
+        values = status_values(coordinator.data, available=available)
+        old_values = self._values.get(device_id, {})
+        if changed := {
+            name: value
+            for name, value in values.items()
+            if old_values.get(name) != value
+        }:
+            self._values[device_id] = values
+            if (pending := self._pending.get(device_id)) is not None:
+                pending.update(changed)
+            else:
+                self._pending[device_id] = changed
+
+    @callback
+    def _async_flush(self, now: datetime | None = None) -> None:
+        """Send the changes since the last flush to every subscriber."""
+        if not self._pending:
+            return
+        deltas, self._pending = self._pending, {}
+        for send in list(self._subscribers):
+            send(deltas)
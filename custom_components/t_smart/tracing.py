@@ -0,0 +1,43 @@
+"""Tracing of t_smart traffic per device."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.util.hass_dict import HassKey
+
+from .common import TSmartConfigEntry
+from .const import DOMAIN
+from .tsmart import TSmartTracer
+
+DATA_TRACER: HassKey[TSmartTracer] = HassKey(f"{DOMAIN}_tracer")
+
+
+def set_trace(
+    tracer: TSmartTracer,
+    entries: list[TSmartConfigEntry],
+    *,
+    enabled: bool,
+    frame_rate: float | None = None,
+) -> dict[str, Any]:
+    """Start or stop tracing thermostats, returning the ones being traced.
+
+    The frame rate is shared by every device, and only changed when given.
+    Devices are traced by IP address, as that is all the transport knows of
+    them, so a thermostat that moves address has to be traced again.
+    """
+    if frame_rate is not None:
+        tracer.frame_rate = frame_rate
+    for entry in entries:
+        if enabled:
+            tracer.enable(entry.runtime_data.device.ip)
+        else:
+            tracer.disable(entry.runtime_data.device.ip)
+
+    return {
+        "traced": [
+            entry.title
+            for entry in entries
+            if entry.runtime_data.device.ip in tracer.ips
+        ]
+    }
@@ -0,0 +1,68 @@
+"""Client for T-Smart thermostats.
+
+Only depends on the standard library so it can be used outside Home Assistant,
+see __main__ for the command line interface.
+
+The protocol itself is implemented without I/O in protocol, driven by the
+asyncio transport used by TSmart, which threaded can run on a thread of its
+own, or by the blocking transport in sync.
+Which commands each firmware answers is learned by capabilities, and requests
+to each device are paced, by priority, by limiter.
+Traffic can be recorded with capture and replayed on a virtual clock with
+replay, and the traffic of chosen devices traced with trace.
+"""
+
+from .capabilities import TSmartCapabilities, TSmartUnsupportedError
+from .capture import TSmartRecorder
+from .client import TSmart
+from .limiter import (
+    PRIORITY_CONFIRM,
+    PRIORITY_CONTROL,
+    PRIORITY_MAINTENANCE,
+    PRIORITY_POLL,
+    TSmartLimiter,
+    TSmartShedError,
+)
+from .models import (
+    DiscoveredDevice,
+    TSmartConfiguration,
+    TSmartMode,
+    TSmartStats,
+    TSmartStatus,
+    settable_mode,
+)
+from .profiling import TSmartProfiler
+from .protocol import UDP_PORT, TSmartExchange, TSmartProtocol
+from .replay import TSmartReplayTransport
+from .sync import TSmartBlockingTransport
+from .threaded import TSmartThreadedTransport
+from .trace import TSmartTracer
+from .transport import TSmartTransport
+
+__all__ = [
+    "PRIORITY_CONFIRM",
+    "PRIORITY_CONTROL",
+    "PRIORITY_MAINTENANCE",
+    "PRIORITY_POLL",
+    "UDP_PORT",
+    "DiscoveredDevice",
+    "TSmart",
+    "TSmartBlockingTransport",
+    "TSmartCapabilities",
+    "TSmartConfiguration",
+    "TSmartExchange",
+    "TSmartLimiter",
+    "TSmartMode",
+    "TSmartProfiler",
+    "TSmartProtocol",
+    "TSmartRecorder",
+    "TSmartReplayTransport",
+    "TSmartShedError",
+    "TSmartStats",
+    "TSmartStatus",
+    "TSmartThreadedTransport",
+    "TSmartTracer",
+    "TSmartTransport",
+    "TSmartUnsupportedError",
+    "settable_mode",
+]
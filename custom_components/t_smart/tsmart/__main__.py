@@ -0,0 +1,250 @@
+"""Command line interface for auditing and controlling T-Smart thermostats.
+
+Run from the directory containing the tsmart package, for example:
+
+    python -m tsmart scan --format csv
+    python -m tsmart status 192.168.1.20 192.168.1.21
+    python -m tsmart set 192.168.1.20 --power on --mode manual --setpoint 60
+    python -m tsmart --capture poll.pcap status 192.168.1.20
+    python -m tsmart replay poll.pcap
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import csv
+import json
+import sys
+from dataclasses import asdict
+from typing import Any
+
+from . import (
+    TSmart,
+    TSmartMode,
+    TSmartRecorder,
+    TSmartStatus,
+    TSmartThreadedTransport,
+    TSmartTransport,
+    settable_mode,
+)
+from .capture import read_capture
+from .replay import async_replay
+
+FIELDS = [
+    "ip",
+    "device_id",
+    "name",
+    "firmware_name",
+    "firmware_version",
+    "online",
+    "power",
+    "mode",
+    "setpoint",
+    "temperature_high",
+    "temperature_low",
+    "temperature_average",
+    "relay",
+    "errors",
+    "warnings",
+]
+
+ERROR_CODES = ("e01", "e02", "e03", "e04", "e05")
+WARNING_CODES = ("w01", "w02", "w03")
+
+
+def _status_row(status: TSmartStatus | None) -> dict[str, Any]:
+    """Flatten a status into output columns."""
+    if status is None:
+        return {"online": False}
+
+    values = asdict(status)
+    return {
+        "online": True,
+        "power": status.power,
+        "mode": status.mode.name,
+        "setpoint": status.setpoint,
+        "temperature_high": status.temperature_high,
+        "temperature_low": status.temperature_low,
+        "temperature_average": status.temperature_average,
+        "relay": status.relay,
+        "errors": [code.upper() for code in ERROR_CODES if values[code]],
+        "warnings": [code.upper() for code in WARNING_CODES if values[code]],
+    }
+
+
+async def _async_poll(device: TSmart, semaphore: asyncio.Semaphore) -> dict[str, Any]:
+    """Fetch configuration and status from a device."""
+    async with semaphore:
+        await device.async_get_configuration()
+        status = await device.async_get_status()
+
+    return {
+        "ip": device.ip,
+        "device_id": device.device_id,
+        "name": device.name,
+        "firmware_name": device.firmware_name or None,
+        "firmware_version": device.firmware_version or None,
+        **_status_row(status),
+    }
+
+
+async def _async_poll_all(
+    devices: list[TSmart], max_in_flight: int
+) -> list[dict[str, Any]]:
+    """Poll devices concurrently, with at most max_in_flight outstanding."""
+    semaphore = asyncio.Semaphore(max_in_flight)
+    return await asyncio.gather(*(_async_poll(device, semaphore) for device in devices))
+
+
+def _transport(
+    args: argparse.Namespace,
+) -> TSmartTransport | TSmartThreadedTransport:
+    """Create the transport, recording traffic if asked to."""
+    transport = TSmartThreadedTransport() if args.thread else TSmartTransport()
+    if args.capture:
+        transport.recorder = TSmartRecorder()
+    return transport
+
+
+def _close(
+    transport: TSmartTransport | TSmartThreadedTransport, args: argparse.Namespace
+) -> None:
+    """Close the transport, writing out any recorded traffic."""
+    transport.close()
+    if transport.recorder is not None:
+        transport.recorder.dump(args.capture)
+
+
+async def _async_scan(args: argparse.Namespace) -> list[dict[str, Any]]:
+    """Discover every device on the network, then poll them all."""
+    transport = _transport(args)
+    try:
+        discovered = await TSmart.async_discover(
+            timeout=args.timeout, transport=transport
+        )
+        devices = [
+            TSmart(device.ip, device.device_id, device.name, transport)
+            for device in discovered
+        ]
+        return await _async_poll_all(devices, args.max_in_flight)
+    finally:
+        _close(transport, args)
+
+
+async def _async_status(args: argparse.Namespace) -> list[dict[str, Any]]:
+    """Poll the given devices."""
+    transport = _transport(args)
+    try:
+        devices = [TSmart(ip, transport=transport) for ip in args.ips]
+        return await _async_poll_all(devices, args.max_in_flight)
+    finally:
+        _close(transport, args)
+
+
+async def _async_set(args: argparse.Namespace) -> list[dict[str, Any]]:
+    """Control the given devices, keeping current values for unset options."""
+    transport = _transport(args)
+    semaphore = asyncio.Semaphore(args.max_in_flight)
+
+    async def _async_set_device(ip: str) -> dict[str, Any]:
+        device = TSmart(ip, transport=transport)
+        async with semaphore:
+            status = await device.async_get_status()
+            if status is None:
+                return {"ip": ip, "success": False}
+
+            mode = TSmartMode[args.mode.upper()] if args.mode else status.mode
+            success = await device.async_control_set(
+                status.power if args.power is None else args.power == "on",
+                settable_mode(mode),
+                status.setpoint if args.setpoint is None else args.setpoint,
+            )
+        return {"ip": ip, "success": success}
+
+    try:
+        return await asyncio.gather(*(_async_set_device(ip) for ip in args.ips))
+    finally:
+        _close(transport, args)
+
+
+async def _async_replay(args: argparse.Namespace) -> list[dict[str, Any]]:
+    """Replay a recording on a virtual clock, summarising the latencies."""
+    return [await async_replay(read_capture(args.file))]
+
+
+def _write(rows: list[dict[str, Any]], output_format: str) -> None:
+    """Write rows to stdout as JSON lines or CSV."""
+    if output_format == "csv":
+        fields = [field for field in FIELDS if any(field in row for row in rows)]
+        fields += sorted({key for row in rows for key in row} - set(fields))
+        writer = csv.DictWriter(sys.stdout, fieldnames=fields)
+        writer.writeheader()
+        for row in rows:
+            writer.writerow(
+                {
+                    key: " ".join(value) if isinstance(value, list) else value
+                    for key, value in row.items()
+                }
+            )
+        return
+
+    for row in rows:
+        sys.stdout.write(json.dumps(row) + "\n")
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Run the command line interface."""
+    parser = argparse.ArgumentParser(
+        prog="python -m tsmart",
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--format", choices=["jsonl", "csv"], default="jsonl")
+    parser.add_argument(
+        "--max-in-flight",
+        type=int,
+        default=64,
+        help="maximum number of devices with an outstanding request",
+    )
+    parser.add_argument("--capture", metavar="FILE", help="record traffic to a pcap")
+    parser.add_argument(
+        "--thread", action="store_true", help="run network I/O on a thread of its own"
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    scan = commands.add_parser("scan", help="discover and poll every device")
+    scan.add_argument(
+        "--timeout", type=float, default=2, help="seconds to wait for replies"
+    )
+
+    status = commands.add_parser("status", help="poll the given devices")
+    status.add_argument("ips", nargs="+", metavar="ip")
+
+    control = commands.add_parser("set", help="control the given devices")
+    control.add_argument("ips", nargs="+", metavar="ip")
+    control.add_argument("--power", choices=["on", "off"])
+    control.add_argument(
+        "--mode",
+        choices=[mode.name.lower() for mode in TSmartMode if mode <= TSmartMode.BOOST],
+    )
+    control.add_argument("--setpoint", type=float)
+
+    replay = commands.add_parser("replay", help="replay a recording of traffic")
+    replay.add_argument("file")
+
+    args = parser.parse_args(argv)
+    handler = {
+        "scan": _async_scan,
+        "status": _async_status,
+        "set": _async_set,
+        "replay": _async_replay,
+    }[args.command]
+    rows = asyncio.run(handler(args))
+    _write(rows, args.format)
+
+    return 0 if all(row.get("online", row.get("success")) for row in rows) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,161 @@
+"""Commands each T-Smart firmware answers.
+
+Some firmwares never acknowledge a restart or time sync, so every attempt
+waits out all its timeouts. TSmart records the outcome of those commands to
+its capabilities attribute when one is set, and skips them on firmwares known
+not to answer. The registry can be shared by devices and persisted, for
+example:
+
+    capabilities = TSmartCapabilities.from_dict(stored)
+    capabilities.on_change = save
+    device.capabilities = capabilities
+    ...
+    stored = capabilities.as_dict()
+"""
+
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+# Commands whose support is learned
+COMMAND_RESTART = "restart"
+COMMAND_TIMESYNC = "timesync"
+
+# Unanswered attempts, with the device answering otherwise, before a firmware
+# is taken not to support a command
+UNSUPPORTED_AFTER = 3
+
+# A command found unsupported is tried again after this long, in seconds
+REPROBE_INTERVAL = 7 * 24 * 60 * 60
+
+
+class TSmartUnsupportedError(Exception):
+    """Raised instead of sending a command the device's firmware doesn't answer."""
+
+    def __init__(self, firmware: str, command: str) -> None:
+        super().__init__(f"Firmware {firmware} doesn't answer {command} commands")
+        self.firmware = firmware
+        self.command = command
+
+
+@dataclass(slots=True)
+class CommandSupport:
+    """What is known of a firmware's support for a command.
+
+    supported is None until the firmware has answered, or failed to answer
+    often enough. checked is when that was last decided, as a Unix time.
+    """
+
+    supported: bool | None = None
+    misses: int = 0
+    checked: float = 0.0
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "supported": self.supported,
+            "misses": self.misses,
+            "checked": self.checked,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "CommandSupport":
+        return cls(
+            supported=data.get("supported"),
+            misses=int(data.get("misses", 0)),
+            checked=float(data.get("checked", 0.0)),
+        )
+
+
+def firmware_key(firmware_name: str, firmware_version: str) -> str | None:
+    """Return the key of a firmware, or None until the firmware is known."""
+    if not firmware_version:
+        return None
+    return f"{firmware_name} {firmware_version}".strip()
+
+
+class TSmartCapabilities:
+    """Learns which commands each firmware answers.
+
+    A firmware supports a command once it has answered it. It doesn't once
+    UNSUPPORTED_AFTER attempts in a row went unanswered while the device was
+    answering other requests, so a device that is just offline teaches
+    nothing. on_change is called whenever what is known changes.
+    """
+
+    def __init__(self) -> None:
+        self.firmwares: dict[str, dict[str, CommandSupport]] = {}
+        self.on_change: Callable[[], None] | None = None
+
+    def supports(self, firmware: str | None, command: str) -> bool | None:
+        """Return whether a firmware answers a command, or None if not known.
+
+        A command found unsupported over REPROBE_INTERVAL ago is unknown again,
+        so it is given another try.
+        """
+        if firmware is None:
+            return None
+        support = self.firmwares.get(firmware, {}).get(command)
+        if support is None or support.supported is None:
+            return None
+        if not support.supported and time.time() - support.checked > REPROBE_INTERVAL:
+            return None
+        return support.supported
+
+    def record(
+        self, firmware: str | None, command: str, *, answered: bool, reachable: bool
+    ) -> None:
+        """Record whether a command was answered.
+
+        reachable is whether the device answered the request before it, an
+        unanswered command only counts against the firmware when it did.
+        """
+        if firmware is None or (not answered and not reachable):
+            return
+
+        support = self.firmwares.setdefault(firmware, {}).setdefault(
+            command, CommandSupport()
+        )
+        if answered:
+            if support.supported and not support.misses:
+                return
+            support.supported = True
+            support.misses = 0
+            support.checked = time.time()
+        else:
+            support.misses += 1
+            if support.misses >= UNSUPPORTED_AFTER:
+                support.supported = False
+                support.misses = 0
+                support.checked = time.time()
+
+        if self.on_change is not None:
+            self.on_change()
+
+    def firmware_as_dict(self, firmware: str | None) -> dict[str, dict[str, Any]]:
+        """Return what is known of a firmware's commands."""
+        if firmware is None:
+            return {}
+        return {
+            command: support.as_dict()
+            for command, support in self.firmwares.get(firmware, {}).items()
+        }
+
+    def as_dict(self) -> dict[str, dict[str, dict[str, Any]]]:
+        """Return every firmware's commands, to be stored."""
+        return {
+            firmware: self.firmware_as_dict(firmware) for firmware in self.firmwares
+        }
+
+    @classmethod
+    def from_dict(
+        cls, data: dict[str, dict[str, dict[str, Any]]]
+    ) -> "TSmartCapabilities":
+        """Return a registry from what as_dict returned."""
+        capabilities = cls()
+        for firmware, commands in data.items():
+            capabilities.firmwares[firmware] = {
+                command: CommandSupport.from_dict(support)
+                for command, support in commands.items()
+            }
+        return capabilities
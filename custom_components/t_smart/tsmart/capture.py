@@ -0,0 +1,132 @@
+"""Recording of T-Smart traffic in pcap format.
+
+Frames are kept in memory while recording so nothing blocks the caller, and
+written out afterwards with dump. Each frame is wrapped in synthesised IPv4 and
+UDP headers (link type RAW) so the files open in Wireshark and tcpdump.
+"""
+
+import struct
+import time
+from collections import deque
+from dataclasses import dataclass
+from ipaddress import IPv4Address
+
+from .protocol import UDP_PORT, Address
+
+LOCAL_ADDRESS: Address = ("0.0.0.0", UDP_PORT)
+
+PCAP_MAGIC = 0xA1B2C3D4
+PCAP_LINKTYPE_RAW = 101
+PCAP_HEADER = struct.Struct("=IHHiIII")
+PCAP_RECORD = struct.Struct("=IIII")
+IPV4_HEADER = struct.Struct("!BBHHHBBH4s4s")
+UDP_HEADER = struct.Struct("!HHHH")
+
+MAX_FRAMES = 100000
+
+
+@dataclass(frozen=True, slots=True)
+class CapturedFrame:
+    """A datagram sent or received, timestamped by the monotonic clock."""
+
+    timestamp: float
+    source: Address
+    destination: Address
+    data: bytes
+
+
+class TSmartRecorder:
+    """Records frames passing through a transport.
+
+    Only the most recent max_frames are kept.
+    """
+
+    def __init__(self, max_frames: int = MAX_FRAMES) -> None:
+        self.frames: deque[CapturedFrame] = deque(maxlen=max_frames)
+        # Anchor monotonic timestamps to the wall clock for the pcap file
+        self._epoch = time.time() - time.monotonic()
+
+    def record(self, source: Address, destination: Address, data: bytes) -> None:
+        self.frames.append(CapturedFrame(time.monotonic(), source, destination, data))
+
+    def dump(self, path: str) -> None:
+        """Write the recorded frames to a pcap file."""
+        with open(path, "wb") as file:
+            file.write(
+                PCAP_HEADER.pack(PCAP_MAGIC, 2, 4, 0, 0, 65535, PCAP_LINKTYPE_RAW)
+            )
+            # A copy, as a threaded transport may still be recording
+            for frame in list(self.frames):
+                packet = _ip_packet(frame)
+                timestamp = self._epoch + frame.timestamp
+                seconds = int(timestamp)
+                file.write(
+                    PCAP_RECORD.pack(
+                        seconds,
+                        int((timestamp - seconds) * 1_000_000),
+                        len(packet),
+                        len(packet),
+                    )
+                )
+                file.write(packet)
+
+
+def _ip_packet(frame: CapturedFrame) -> bytes:
+    """Wrap a frame in IPv4 and UDP headers."""
+    udp_length = UDP_HEADER.size + len(frame.data)
+    header = bytearray(
+        IPV4_HEADER.pack(
+            0x45,
+            0,
+            IPV4_HEADER.size + udp_length,
+            0,
+            0,
+            64,
+            17,  # UDP
+            0,
+            IPv4Address(frame.source[0]).packed,
+            IPv4Address(frame.destination[0]).packed,
+        )
+    )
+    total = sum(struct.unpack("!10H", header))
+    total = (total & 0xFFFF) + (total >> 16)
+    total = (total & 0xFFFF) + (total >> 16)
+    header[10:12] = struct.pack("!H", ~total & 0xFFFF)
+
+    udp = UDP_HEADER.pack(frame.source[1], frame.destination[1], udp_length, 0)
+    return bytes(header) + udp + frame.data
+
+
+def read_capture(path: str) -> list[CapturedFrame]:
+    """Read frames from a pcap file written by TSmartRecorder."""
+    with open(path, "rb") as file:
+        content = file.read()
+
+    magic, _, _, _, _, _, linktype = PCAP_HEADER.unpack_from(content)
+    if magic != PCAP_MAGIC or linktype != PCAP_LINKTYPE_RAW:
+        raise ValueError(f"{path} is not a T-Smart capture")
+
+    frames = []
+    offset = PCAP_HEADER.size
+    while offset < len(content):
+        seconds, microseconds, length, _ = PCAP_RECORD.unpack_from(content, offset)
+        offset += PCAP_RECORD.size
+        packet = content[offset : offset + length]
+        offset += length
+
+        header_length = (packet[0] & 0x0F) * 4
+        source_ip = str(IPv4Address(packet[12:16]))
+        destination_ip = str(IPv4Address(packet[16:20]))
+        source_port, destination_port, _, _ = UDP_HEADER.unpack_from(
+            packet, header_length
+        )
+        frames.append(
+            CapturedFrame(
+                seconds + microseconds / 1_000_000,
+                (source_ip, source_port),
+                (destination_ip, destination_port),
+                packet[header_length + UDP_HEADER.size :],
+            )
+        )
+
+    return frames
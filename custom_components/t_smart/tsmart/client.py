@@ -0,0 +1,331 @@
+"""Asyncio client for T-Smart thermostats."""
+
+import asyncio
+import logging
+import time
+
+from .capabilities import (
+    COMMAND_RESTART,
+    COMMAND_TIMESYNC,
+    TSmartCapabilities,
+    TSmartUnsupportedError,
+    firmware_key,
+)
+from .limiter import (
+    PRIORITY_CONTROL,
+    PRIORITY_MAINTENANCE,
+    PRIORITY_POLL,
+    TSmartLimiter,
+    TSmartShedError,
+)
+from .models import DiscoveredDevice, TSmartConfiguration, TSmartStats, TSmartStatus
+from .profiling import (
+    PHASE_DECODE,
+    PHASE_ENCODE,
+    PHASE_SOCKET_SETUP,
+    PHASE_WAIT,
+    TSmartProfiler,
+)
+from .protocol import (
+    ACK_RESPONSE,
+    CONFIGURATION_RESPONSE,
+    STATUS_RESPONSE,
+    configuration_request,
+    control_request,
+    decode_configuration,
+    decode_discovery,
+    decode_status,
+    discovery_request,
+    restart_request,
+    status_request,
+    timesync_request,
+)
+from .trace import TRACE_REQUEST, TRACE_RESPONSE, TRACE_TIMEOUT, TSmartTracer
+from .transport import TSmartTransport
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class TSmart:
+    """Representation of a T-Smart device."""
+
+    ip: str
+    device_id: str | None = None
+    name: str | None = None
+    firmware_name: str = ""
+    firmware_version: str = ""
+    request_successful: bool | None = None
+
+    def __init__(
+        self,
+        ip: str,
+        device_id: str | None = None,
+        name: str | None = None,
+        transport: TSmartTransport | None = None,
+    ):
+        self.ip = ip
+        self.device_id = device_id
+        self.name = name
+        self.transport = transport
+        self.stats = TSmartStats()
+        self.profiler: TSmartProfiler | None = None
+        self.capabilities: TSmartCapabilities | None = None
+        self.tracer: TSmartTracer | None = None
+        self.limiter: TSmartLimiter | None = None
+        self.status_frame: bytes | None = None
+
+    async def async_discover(
+        stop_on_first=False,
+        tries=2,
+        timeout=2,
+        transport: TSmartTransport | None = None,
+    ) -> list[DiscoveredDevice]:
+        stream = transport or TSmartTransport()
+        listener = stream.listen()
+
+        devices: dict[str, DiscoveredDevice] = {}
+
+        for i in range(tries):
+            await stream.async_broadcast(discovery_request())
+
+            while True:
+                try:
+                    data, remote_addr = await asyncio.wait_for(listener.get(), timeout)
+                except asyncio.exceptions.TimeoutError:
+                    break
+
+                device = decode_discovery(data, remote_addr[0])
+                if device is None:
+                    continue
+
+                _LOGGER.debug("Got response from %s", remote_addr[0])
+
+                if remote_addr[0] not in devices:
+                    _LOGGER.info("Discovered %s %s", device.device_id, device.name)
+                    devices[remote_addr[0]] = device
+                    if stop_on_first:
+                        break
+
+            if stop_on_first and len(devices) > 0:
+                break
+
+        stream.unlisten(listener)
+        if stream is not transport:
+            stream.close()
+
+        return devices.values()
+
+    async def _async_request(
+        self, request, response_struct, tries=2, priority=PRIORITY_POLL
+    ):
+        if self.limiter is not None:
+            try:
+                await self.limiter.async_acquire(self.ip, priority)
+            except TSmartShedError:
+                self.stats.shed += 1
+                raise
+        self.request_successful = False
+
+        stream = self.transport or TSmartTransport()
+        try:
+            start = time.perf_counter()
+            await stream.async_start()
+            self._profile(PHASE_SOCKET_SETUP, start)
+
+            start = time.perf_counter()
+            data = await stream.async_request(self.ip, request, response_struct, tries)
+            self._profile(PHASE_WAIT, start)
+        finally:
+            if stream is not self.transport:
+                stream.close()
+
+        self.stats.requests += 1
+        if self.limiter is not None:
+            self.limiter.record(self.ip, answered=data is not None)
+        if data is None:
+            self.stats.timeouts += 1
+            self._trace(TRACE_TIMEOUT, "No response after %d tries", tries)
+            _LOGGER.warning("Timed-out fetching status from %s", self.ip)
+            return None
+
+        self.stats.round_trip = time.perf_counter() - start
+        self._trace(TRACE_RESPONSE, "Response in %.3fs", self.stats.round_trip)
+        self.request_successful = True
+        return data
+
+    def monotonic(self) -> float:
+        """Return the time on the clock of the transport, virtual when replaying."""
+        if self.transport is None:
+            return time.monotonic()
+        return self.transport.monotonic()
+
+    async def async_sleep(self, delay: float) -> None:
+        """Sleep for delay seconds on the clock of the transport."""
+        if self.transport is None:
+            await asyncio.sleep(delay)
+        else:
+            await self.transport.async_sleep(delay)
+
+    def _profile(self, phase: str, start: float) -> None:
+        """Report the time since start to the profiler, if there is one."""
+        if self.profiler is not None:
+            self.profiler.add(phase, time.perf_counter() - start)
+
+    def _trace(self, event: str, message: str, *args) -> None:
+        """Report an event to the tracer, if there is one."""
+        if self.tracer is not None:
+            self.tracer.trace(self.ip, event, message, *args)
+
+    def _supports(self, command: str) -> bool | None:
+        """Return whether the firmware answers a command, or None if not known."""
+        if self.capabilities is None:
+            return None
+        return self.capabilities.supports(
+            firmware_key(self.firmware_name, self.firmware_version), command
+        )
+
+    def _learn(self, command: str, *, answered: bool, reachable: bool) -> None:
+        """Record whether the firmware answered a command."""
+        if self.capabilities is not None:
+            self.capabilities.record(
+                firmware_key(self.firmware_name, self.firmware_version),
+                command,
+                answered=answered,
+                reachable=reachable,
+            )
+
+    async def async_get_configuration(
+        self, priority: int = PRIORITY_MAINTENANCE
+    ) -> TSmartConfiguration | None:
+        start = time.perf_counter()
+        request = configuration_request()
+        self._profile(PHASE_ENCODE, start)
+
+        response = await self._async_request(
+            request, CONFIGURATION_RESPONSE, priority=priority
+        )
+
+        if response is None:
+            return None
+
+        start = time.perf_counter()
+        configuration = decode_configuration(response)
+        self._profile(PHASE_DECODE, start)
+
+        self.device_id = configuration.device_id
+        self.name = configuration.name
+        self.firmware_name = configuration.firmware_name
+        self.firmware_version = configuration.firmware_version
+
+        self._trace(
+            TRACE_RESPONSE,
+            "Configuration %s %s %s",
+            configuration.name,
+            configuration.firmware_name,
+            configuration.firmware_version,
+        )
+
+        return configuration
+
+    async def async_get_status(
+        self, priority: int = PRIORITY_POLL
+    ) -> TSmartStatus | None:
+        start = time.perf_counter()
+        request = status_request()
+        self._profile(PHASE_ENCODE, start)
+
+        response = await self._async_request(
+            request, STATUS_RESPONSE, priority=priority
+        )
+
+        if response is None:
+            return None
+
+        start = time.perf_counter()
+        status = decode_status(response)
+        self._profile(PHASE_DECODE, start)
+        self.status_frame = response
+
+        self._trace(
+            TRACE_RESPONSE,
+            "Status power %d mode %s setpoint %.1f temperature %.1f relay %d",
+            status.power,
+            status.mode,
+            status.setpoint,
+            status.temperature_average,
+            status.relay,
+        )
+        return status
+
+    async def async_control_set(self, power, mode, setpoint) -> bool:
+        """Set power, mode and setpoint, returning whether the device acknowledged."""
+        self._trace(TRACE_REQUEST, "Control set %d %d %0.2f", power, mode, setpoint)
+
+        start = time.perf_counter()
+        request = control_request(power, mode, setpoint)
+        self._profile(PHASE_ENCODE, start)
+
+        response = await self._async_request(
+            request, ACK_RESPONSE, priority=PRIORITY_CONTROL
+        )
+        return response is not None
+
+    async def async_restart(
+        self, offset_ms: int = 1000, priority: int = PRIORITY_MAINTENANCE
+    ) -> None:
+        """Restart the device after specified offset time in milliseconds.
+
+        Firmwares known not to acknowledge it are only sent it once, as they
+        may well restart all the same.
+        """
+        request = restart_request(offset_ms)
+
+        _LOGGER.info("Restarting device %s after %dms", self.ip, offset_ms)
+
+        reachable = bool(self.request_successful)
+        tries = 1 if self._supports(COMMAND_RESTART) is False else 2
+
+        # Device may not respond if offset is very short
+        response = await self._async_request(
+            request, ACK_RESPONSE, tries=tries, priority=priority
+        )
+        self._learn(COMMAND_RESTART, answered=response is not None, reachable=reachable)
+        if response:
+            _LOGGER.info("Restart command acknowledged by %s", self.ip)
+
+    async def async_timesync(
+        self, tries: int = 2, priority: int = PRIORITY_MAINTENANCE
+    ) -> bool:
+        """Set the device time using UTC timestamp in seconds.
+
+        The timestamp is taken afresh for each attempt so a retry doesn't set
+        the clock late by the length of the previous timeout. Raises
+        TSmartUnsupportedError without sending anything if the firmware is
+        known not to answer.
+        """
+        if self._supports(COMMAND_TIMESYNC) is False:
+            raise TSmartUnsupportedError(
+                firmware_key(self.firmware_name, self.firmware_version),
+                COMMAND_TIMESYNC,
+            )
+
+        reachable = bool(self.request_successful)
+        response = None
+        for i in range(tries):
+            timestamp = int(time.time())
+
+            _LOGGER.info("Setting time on device %s to %d", self.ip, timestamp)
+
+            request = timesync_request(timestamp)
+
+            response = await self._async_request(
+                request, ACK_RESPONSE, tries=1, priority=priority
+            )
+            if response:
+                _LOGGER.info("Time set command acknowledged by %s", self.ip)
+                break
+
+        self._learn(
+            COMMAND_TIMESYNC, answered=response is not None, reachable=reachable
+        )
+        return response is not None
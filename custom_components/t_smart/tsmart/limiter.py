@@ -0,0 +1,196 @@
+"""Per-device request pacing for T-Smart devices.
+
+The firmware drops packets, and can reboot, when it is sent requests faster
+than it can answer them. TSmart takes a token from its limiter attribute,
+when one is set, before each request, for example:
+
+    limiter = TSmartLimiter()
+    device.limiter = limiter
+    await device.async_control_set(True, TSmartMode.MANUAL, 60)
+    await device.async_get_status(PRIORITY_CONFIRM)
+
+Requests waiting for a device are served by priority, so a control command
+overtakes any polls queued before it. Routine polls and maintenance are shed,
+raising TSmartShedError, rather than queue up behind each other.
+"""
+
+import asyncio
+import heapq
+import itertools
+from dataclasses import dataclass, field
+from typing import Any
+
+# Priorities, highest first
+PRIORITY_CONTROL = 0
+PRIORITY_CONFIRM = 1
+PRIORITY_POLL = 2
+PRIORITY_MAINTENANCE = 3
+
+PRIORITY_NAMES = {
+    PRIORITY_CONTROL: "control",
+    PRIORITY_CONFIRM: "confirm",
+    PRIORITY_POLL: "poll",
+    PRIORITY_MAINTENANCE: "maintenance",
+}
+
+# Longest a request waits for a token before it is shed, in seconds, None for
+# priorities that are never shed
+MAX_WAIT: dict[int, float | None] = {
+    PRIORITY_CONTROL: None,
+    PRIORITY_CONFIRM: None,
+    PRIORITY_POLL: 10,
+    PRIORITY_MAINTENANCE: 60,
+}
+
+DEVICE_RATE = 1.0  # Requests per second
+DEVICE_BURST = 3  # Requests
+MIN_DEVICE_RATE = 0.1  # Requests per second
+RATE_INCREASE = 0.05  # Requests per second, for each answered request
+
+
+class TSmartShedError(Exception):
+    """Raised instead of sending a request the device has no room for."""
+
+    def __init__(self, ip: str, priority: int) -> None:
+        super().__init__(
+            f"Shed {PRIORITY_NAMES.get(priority, priority)} request to {ip}"
+        )
+        self.ip = ip
+        self.priority = priority
+
+
+@dataclass(slots=True)
+class _Bucket:
+    """Token bucket of a device, and the requests waiting for a token."""
+
+    rate: float
+    tokens: float
+    updated: float
+    waiters: list[tuple[int, int, asyncio.Future[None]]] = field(
+        default_factory=list
+    )
+    timer: asyncio.TimerHandle | None = None
+    shed: int = 0
+
+
+class TSmartLimiter:
+    """Token bucket of every device, with requests queued by priority.
+
+    Each device may be sent a burst of requests, then rate a second. The rate
+    adapts to what the device sustains: it halves each time a request goes
+    unanswered, down to min_rate, and creeps back up by RATE_INCREASE with
+    each answered one.
+
+    A routine poll or maintenance request is shed at once if another of the
+    same priority is already waiting for the device, as it would only repeat
+    it, or after waiting MAX_WAIT for its priority. Control commands and
+    confirmation polls wait as long as it takes. The limiter is used from a
+    single event loop.
+    """
+
+    def __init__(
+        self,
+        rate: float = DEVICE_RATE,
+        burst: float = DEVICE_BURST,
+        min_rate: float = MIN_DEVICE_RATE,
+    ) -> None:
+        self.max_rate = rate
+        self.burst = burst
+        self.min_rate = min_rate
+        self._buckets: dict[str, _Bucket] = {}
+        self._sequence = itertools.count()
+
+    async def async_acquire(self, ip: str, priority: int = PRIORITY_POLL) -> None:
+        """Wait for a device to have room for a request, by priority.
+
+        Raises TSmartShedError if the request is shed instead.
+        """
+        loop = asyncio.get_running_loop()
+        bucket = self._bucket(ip, loop.time())
+        self._refill(bucket, loop.time())
+        if not bucket.waiters and bucket.tokens >= 1:
+            bucket.tokens -= 1
+            return
+
+        max_wait = MAX_WAIT.get(priority)
+        if max_wait is not None and any(
+            waiter[0] == priority for waiter in bucket.waiters
+        ):
+            bucket.shed += 1
+            raise TSmartShedError(ip, priority)
+
+        waiter = (priority, next(self._sequence), loop.create_future())
+        heapq.heappush(bucket.waiters, waiter)
+        self._schedule(bucket)
+        try:
+            async with asyncio.timeout(max_wait):
+                await waiter[2]
+        except TimeoutError:
+            bucket.shed += 1
+            raise TSmartShedError(ip, priority) from None
+        finally:
+            if not waiter[2].done():
+                waiter[2].cancel()
+            if waiter in bucket.waiters:
+                bucket.waiters.remove(waiter)
+                heapq.heapify(bucket.waiters)
+                self._schedule(bucket)
+
+    def record(self, ip: str, *, answered: bool) -> None:
+        """Adapt a device's rate to whether it answered a request."""
+        if (bucket := self._buckets.get(ip)) is None:
+            return
+        if answered:
+            bucket.rate = min(bucket.rate + RATE_INCREASE, self.max_rate)
+        else:
+            bucket.rate = max(bucket.rate / 2, self.min_rate)
+
+    def device_as_dict(self, ip: str) -> dict[str, Any]:
+        """Return the state of a device's bucket."""
+        if (bucket := self._buckets.get(ip)) is None:
+            return {"rate": self.max_rate, "tokens": self.burst, "shed": 0}
+
+        waiting = {name: 0 for name in PRIORITY_NAMES.values()}
+        for priority, _, future in bucket.waiters:
+            if not future.done():
+                waiting[PRIORITY_NAMES[priority]] += 1
+        return {
+            "rate": round(bucket.rate, 3),
+            "tokens": round(bucket.tokens, 2),
+            "shed": bucket.shed,
+            "waiting": waiting,
+        }
+
+    def _bucket(self, ip: str, now: float) -> _Bucket:
+        """Return the bucket of a device, creating it full."""
+        if (bucket := self._buckets.get(ip)) is None:
+            bucket = self._buckets[ip] = _Bucket(self.max_rate, self.burst, now)
+        return bucket
+
+    def _refill(self, bucket: _Bucket, now: float) -> None:
+        """Add the tokens earned since the bucket was last topped up."""
+        bucket.tokens = min(
+            self.burst, bucket.tokens + (now - bucket.updated) * bucket.rate
+        )
+        bucket.updated = now
+
+    def _schedule(self, bucket: _Bucket) -> None:
+        """Hand out the tokens available, and wake up when the next one is."""
+        loop = asyncio.get_running_loop()
+        if bucket.timer is not None:
+            bucket.timer.cancel()
+            bucket.timer = None
+
+        self._refill(bucket, loop.time())
+        while bucket.waiters and bucket.tokens >= 1:
+            _, _, future = heapq.heappop(bucket.waiters)
+            if not future.done():
+                bucket.tokens -= 1
+                future.set_result(None)
+
+        if bucket.waiters:
+            bucket.timer = loop.call_at(
+                bucket.updated + (1 - bucket.tokens) / bucket.rate,
+                self._schedule,
+                bucket,
+            )
@@ -0,0 +1,78 @@
+"""Data types for T-Smart thermostats."""
+
+from dataclasses import dataclass
+from enum import IntEnum
+
+
+class TSmartMode(IntEnum):
+    """Operating modes for TSmart devices."""
+
+    MANUAL = 0x00
+    ECO = 0x01
+    SMART = 0x02
+    TIMER = 0x03
+    TRAVEL = 0x04
+    BOOST = 0x05
+    LIMITED = 0x21
+    CRITICAL = 0x22
+
+
+def settable_mode(mode: TSmartMode) -> TSmartMode:
+    """Return a mode that can be sent back to the device.
+
+    LIMITED and CRITICAL are reported by the device but can't be set, so they
+    are replaced by MANUAL.
+    """
+    return mode if mode <= TSmartMode.BOOST else TSmartMode.MANUAL
+
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class TSmartConfiguration:
+    device_id: str
+    name: str
+    firmware_name: str
+    firmware_version: str
+
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class TSmartStatus:
+    power: bool
+    temperature_average: float
+    temperature_high: float
+    temperature_low: float
+    setpoint: float
+    mode: TSmartMode
+    relay: bool
+    e01: bool
+    e01_count: int
+    e02: bool
+    e02_count: int
+    e03: bool
+    e03_count: int
+    e04: bool
+    e04_count: int
+    e05: bool
+    e05_count: int
+    w01: bool
+    w01_count: int
+    w02: bool
+    w02_count: int
+    w03: bool
+    w03_count: int
+
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class DiscoveredDevice:
+    ip: str
+    device_id: str
+    name: str
+
+
+@dataclass(slots=True)
+class TSmartStats:
+    """Request counters of a device, kept by TSmart."""
+
+    requests: int = 0
+    timeouts: int = 0
+    shed: int = 0
+    round_trip: float | None = None
@@ -0,0 +1,65 @@
+"""Timing of the phases of T-Smart requests.
+
+TSmart and TSmartTransport report how long each phase took to their profiler
+attribute when one is set, for example:
+
+    profiler = TSmartProfiler()
+    device.profiler = transport.profiler = profiler
+    ...
+    profiler.percentiles()
+"""
+
+import threading
+from collections import deque
+
+MAX_SAMPLES = 500
+
+# Phases reported by the client and transport
+PHASE_ENCODE = "encode"
+PHASE_SOCKET_SETUP = "socket_setup"
+PHASE_SEND = "send"
+PHASE_WAIT = "wait"
+PHASE_DECODE = "decode"
+
+
+class TSmartProfiler:
+    """Keeps the most recent durations of each phase.
+
+    Phases may be reported from another thread, such as by a
+    TSmartThreadedTransport.
+    """
+
+    def __init__(self, max_samples: int = MAX_SAMPLES) -> None:
+        self.max_samples = max_samples
+        self.samples: dict[str, deque[float]] = {}
+        self.counts: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def add(self, phase: str, seconds: float) -> None:
+        """Record how long a phase took."""
+        with self._lock:
+            if (samples := self.samples.get(phase)) is None:
+                samples = self.samples[phase] = deque(maxlen=self.max_samples)
+                self.counts[phase] = 0
+            samples.append(seconds)
+            self.counts[phase] += 1
+
+    def percentiles(self) -> dict[str, dict[str, float | int]]:
+        """Return percentiles of each phase over the recent samples, in ms."""
+        with self._lock:
+            snapshot = {
+                phase: (sorted(samples), self.counts[phase])
+                for phase, samples in self.samples.items()
+            }
+
+        result = {}
+        for phase, (ordered, count) in snapshot.items():
+            last = len(ordered) - 1
+            result[phase] = {
+                "count": count,
+                "p50_ms": round(ordered[last // 2] * 1000, 3),
+                "p95_ms": round(ordered[round(last * 0.95)] * 1000, 3),
+                "p99_ms": round(ordered[round(last * 0.99)] * 1000, 3),
+                "max_ms": round(ordered[last] * 1000, 3),
+            }
+        return result
@@ -0,0 +1,363 @@
+"""Sans-IO implementation of the T-Smart UDP protocol.
+
+Nothing here touches a socket or reads a clock. Callers feed in received
+datagrams and the current time, then collect the datagrams to send and the
+exchanges that have finished. The asyncio driver is in transport and the
+blocking socket driver in sync.
+"""
+
+import heapq
+import itertools
+import logging
+import struct
+from collections import deque
+from dataclasses import dataclass
+from functools import reduce
+from operator import xor
+
+from .models import DiscoveredDevice, TSmartConfiguration, TSmartMode, TSmartStatus
+
+UDP_PORT = 1337
+BROADCAST_ADDRESS = "255.255.255.255"
+
+REQUEST_TRIES = 2
+REQUEST_TIMEOUT = 2  # Seconds
+
+DISCOVERY_RESPONSE = struct.Struct("=BBBHL32sBB")
+CONFIGURATION_RESPONSE = struct.Struct("=BBBHL32sBBBBB32s28s32s64s124s")
+STATUS_RESPONSE = struct.Struct("=BBBBHBHBBH16sB")
+ACK_RESPONSE = struct.Struct("=BBBB")
+
+_LOGGER = logging.getLogger(__name__)
+
+type Address = tuple[str, int]
+
+
+def checksum(data: bytes) -> int:
+    """Return the checksum of a frame, calculated over all but the last byte."""
+    return reduce(xor, data[:-1], 0x55)
+
+
+def encode(request: bytes) -> bytes:
+    """Return the request with its checksum byte filled in."""
+    return request[:-1] + bytes((checksum(request),))
+
+
+def discovery_request() -> bytes:
+    return encode(struct.pack("=BBBB", 0x01, 0, 0, 0))
+
+
+def configuration_request() -> bytes:
+    return encode(struct.pack("=BBBB", 0x21, 0, 0, 0))
+
+
+def status_request() -> bytes:
+    return encode(struct.pack("=BBBB", 0xF1, 0, 0, 0))
+
+
+def control_request(power, mode, setpoint) -> bytes:
+    if mode < 0 or mode > 5:
+        raise ValueError("Invalid mode")
+
+    return encode(
+        struct.pack("=BBBBHBB", 0xF2, 0, 0, int(power), int(setpoint * 10), mode, 0)
+    )
+
+
+def restart_request(offset_ms: int) -> bytes:
+    if not 100 <= offset_ms <= 10000:
+        raise ValueError("Offset must be between 100ms and 10000ms")
+
+    # Split offset into low and high bytes for sub-command
+    sub = offset_ms & 0xFF  # Low byte
+    sub2 = (offset_ms >> 8) & 0xFF  # High byte
+
+    return encode(struct.pack("=BBBB", 0x02, sub, sub2, 0))
+
+
+def timesync_request(timestamp: int) -> bytes:
+    # The field is 32 bits, which holds seconds since the epoch but not
+    # milliseconds
+    return encode(struct.pack("=BBBIB", 0x03, 0, 0, timestamp, 0))
+
+
+def validate_response(
+    request: bytes, data: bytes, response_struct: struct.Struct
+) -> bool:
+    """Return whether data is an acceptable response to request.
+
+    A bad checksum is logged but tolerated, as it always has been.
+    """
+    if len(data) != response_struct.size:
+        _LOGGER.warning(
+            "Unexpected packet length (got: %d, expected: %d)",
+            len(data),
+            response_struct.size,
+        )
+        return False
+
+    if data[0] == 0:
+        _LOGGER.warning("Got error response (code %d)", data[0])
+        return False
+
+    if data[0] != request[0] or data[1] != data[1] or data[2] != data[2]:
+        _LOGGER.warning(
+            "Unexpected response type (%02X %02X %02X)", data[0], data[1], data[2]
+        )
+        return False
+
+    if checksum(data) != data[-1]:
+        _LOGGER.warning("Received packet checksum failed")
+
+    return True
+
+
+def decode_discovery(data: bytes, ip: str) -> DiscoveredDevice | None:
+    """Decode a discovery reply, or return None if it isn't a valid one."""
+    if len(data) == 4:
+        # Got our own broadcast
+        return None
+
+    if not validate_response(discovery_request(), data, DISCOVERY_RESPONSE):
+        return None
+
+    if checksum(data) != data[-1]:
+        return None
+
+    (
+        cmd,
+        sub,
+        sub2,
+        device_type,
+        device_id,
+        name,
+        tz,
+        checksum_,
+    ) = DISCOVERY_RESPONSE.unpack(data)
+
+    return DiscoveredDevice(
+        ip=ip,
+        device_id="%4X" % device_id,
+        name=name.decode("utf-8").split("\x00")[0],
+    )
+
+
+def decode_configuration(data: bytes) -> TSmartConfiguration:
+    (
+        cmd,
+        sub,
+        sub2,
+        device_type,
+        device_id,
+        device_name,
+        tz,
+        userbin,
+        firmware_version_major,
+        firmware_version_minor,
+        firmware_version_deployment,
+        firmware_name,
+        legacy,
+        wifi_ssid,
+        wifi_password,
+        unused,
+    ) = CONFIGURATION_RESPONSE.unpack(data)
+
+    return TSmartConfiguration(
+        device_id="%4X" % device_id,
+        name=device_name.decode("utf-8").split("\x00")[0],
+        firmware_name=firmware_name.decode("utf-8").split("\x00")[0],
+        firmware_version=f"{firmware_version_major}.{firmware_version_minor}.{firmware_version_deployment}",
+    )
+
+
+def decode_status(data: bytes) -> TSmartStatus:
+    (
+        cmd,
+        sub,
+        sub2,
+        power,
+        setpoint,
+        mode,
+        t_high,
+        relay,
+        smart_state,
+        t_low,
+        error_buffer,
+        checksum_,
+    ) = STATUS_RESPONSE.unpack(data)
+
+    # Extract 16-bit values (flag in bit 15, counter in bits 0-14)
+    e01_value = error_buffer[0] | (error_buffer[1] << 8)
+    e02_value = error_buffer[2] | (error_buffer[3] << 8)
+    e03_value = error_buffer[4] | (error_buffer[5] << 8)
+    e04_value = error_buffer[6] | (error_buffer[7] << 8)
+    w01_value = error_buffer[8] | (error_buffer[9] << 8)
+    w02_value = error_buffer[10] | (error_buffer[11] << 8)
+    w03_value = error_buffer[12] | (error_buffer[13] << 8)
+    e05_value = error_buffer[14] | (error_buffer[15] << 8)
+
+    return TSmartStatus(
+        power=bool(power),
+        temperature_average=(t_high + t_low) / 20,
+        temperature_high=t_high / 10,
+        temperature_low=t_low / 10,
+        setpoint=setpoint / 10,
+        mode=TSmartMode(mode),
+        relay=bool(relay),
+        e01=(e01_value >> 15) & 1 == 1,
+        e01_count=e01_value & 0x7FFF,
+        e02=(e02_value >> 15) & 1 == 1,
+        e02_count=e02_value & 0x7FFF,
+        e03=(e03_value >> 15) & 1 == 1,
+        e03_count=e03_value & 0x7FFF,
+        e04=(e04_value >> 15) & 1 == 1,
+        e04_count=e04_value & 0x7FFF,
+        e05=(e05_value >> 15) & 1 == 1,
+        e05_count=e05_value & 0x7FFF,
+        w01=(w01_value >> 15) & 1 == 1,
+        w01_count=w01_value & 0x7FFF,
+        w02=(w02_value >> 15) & 1 == 1,
+        w02_count=w02_value & 0x7FFF,
+        w03=(w03_value >> 15) & 1 == 1,
+        w03_count=w03_value & 0x7FFF,
+    )
+
+
+@dataclass(slots=True, eq=False)
+class TSmartExchange:
+    """A request and its eventual response."""
+
+    ip: str
+    request: bytes
+    response_struct: struct.Struct
+    tries: int
+    timeout: float
+    sent: int = 0
+    deadline: float = 0
+    response: bytes | None = None
+    done: bool = False
+
+
+class TSmartProtocol:
+    """State machine matching requests to responses, with retries and timeouts.
+
+    A response completes the oldest pending exchange with the same source
+    address and command. Invalid responses and timeouts resend the request
+    until its tries are used up, after which the exchange completes with no
+    response.
+    """
+
+    def __init__(self) -> None:
+        self._pending: dict[tuple[str, int], deque[TSmartExchange]] = {}
+        self._timers: list[tuple[float, int, int, TSmartExchange]] = []
+        self._sequence = itertools.count()
+        self._outgoing: list[tuple[bytes, Address]] = []
+        self._completed: list[TSmartExchange] = []
+
+    def request(
+        self,
+        ip: str,
+        request: bytes,
+        response_struct: struct.Struct,
+        now: float,
+        tries: int = REQUEST_TRIES,
+        timeout: float = REQUEST_TIMEOUT,
+    ) -> TSmartExchange:
+        """Start an exchange, queueing the request to be sent."""
+        exchange = TSmartExchange(ip, request, response_struct, tries, timeout)
+        self._pending.setdefault((ip, request[0]), deque()).append(exchange)
+        self._send(exchange, now)
+        return exchange
+
+    def broadcast(self, message: bytes) -> None:
+        """Queue a message to every device, replies arrive unsolicited."""
+        self._outgoing.append((message, (BROADCAST_ADDRESS, UDP_PORT)))
+
+    def cancel(self, exchange: TSmartExchange) -> None:
+        """Abandon an exchange without completing it."""
+        if not exchange.done:
+            exchange.done = True
+            self._remove(exchange)
+
+    def datagram_received(self, data: bytes, addr: Address, now: float) -> bool:
+        """Handle a received datagram.
+
+        Returns False if no exchange was waiting for it, in which case the
+        caller may pass it on (discovery replies arrive this way).
+        """
+        if not data:
+            return False
+
+        key = (addr[0], data[0])
+        if data[0] == 0:
+            # Error responses don't echo the command
+            key = next((key for key in self._pending if key[0] == addr[0]), key)
+
+        waiting = self._pending.get(key)
+        if not waiting:
+            return False
+
+        exchange = waiting[0]
+        if validate_response(exchange.request, data, exchange.response_struct):
+            self._complete(exchange, data)
+        elif exchange.sent < exchange.tries:
+            self._send(exchange, now)
+        else:
+            self._complete(exchange, None)
+        return True
+
+    def handle_timeout(self, now: float) -> None:
+        """Resend or fail exchanges whose deadline has passed."""
+        timers = self._timers
+        while timers and timers[0][0] <= now:
+            _, _, sent, exchange = heapq.heappop(timers)
+            if exchange.done or sent != exchange.sent:
+                continue
+            if exchange.sent < exchange.tries:
+                self._send(exchange, now)
+            else:
+                self._complete(exchange, None)
+
+    def next_deadline(self) -> float | None:
+        """Return when handle_timeout next needs calling, if at all."""
+        timers = self._timers
+        while timers and (timers[0][3].done or timers[0][2] != timers[0][3].sent):
+            heapq.heappop(timers)
+        return timers[0][0] if timers else None
+
+    def datagrams_to_send(self) -> list[tuple[bytes, Address]]:
+        """Return and clear the datagrams waiting to be sent."""
+        outgoing, self._outgoing = self._outgoing, []
+        return outgoing
+
+    def completed_exchanges(self) -> list[TSmartExchange]:
+        """Return and clear the exchanges completed since the last call."""
+        completed, self._completed = self._completed, []
+        return completed
+
+    def _send(self, exchange: TSmartExchange, now: float) -> None:
+        exchange.sent += 1
+        exchange.deadline = now + exchange.timeout
+        heapq.heappush(
+            self._timers,
+            (exchange.deadline, next(self._sequence), exchange.sent, exchange),
+        )
+        self._outgoing.append((exchange.request, (exchange.ip, UDP_PORT)))
+
+    def _complete(self, exchange: TSmartExchange, response: bytes | None) -> None:
+        exchange.done = True
+        exchange.response = response
+        self._remove(exchange)
+        self._completed.append(exchange)
+
+    def _remove(self, exchange: TSmartExchange) -> None:
+        key = (exchange.ip, exchange.request[0])
+        waiting = self._pending.get(key)
+        if waiting is None:
+            return
+        if waiting and waiting[0] is exchange:
+            waiting.popleft()
+        elif exchange in waiting:
+            waiting.remove(exchange)
+        if not waiting:
+            del self._pending[key]
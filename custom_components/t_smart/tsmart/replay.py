@@ -0,0 +1,292 @@
+"""Deterministic replay of recorded T-Smart traffic.
+
+TSmartReplayTransport can be passed to TSmart in place of TSmartTransport.
+Each request is answered the way the device answered the matching request in
+the recording, after the recorded latency, or not at all if it timed out. Time
+is virtual, so a recording of hours replays instantly and the same recording
+always gives the same result. Code waiting between requests must sleep with
+async_sleep, and take the time from monotonic, for its waits to run on the
+virtual clock too, as TSmart.async_sleep and TSmart.monotonic do.
+"""
+
+import asyncio
+import heapq
+import itertools
+import statistics
+import struct
+import time
+from collections import defaultdict, deque
+from dataclasses import dataclass
+
+from .capture import LOCAL_ADDRESS, CapturedFrame, TSmartRecorder
+from .client import TSmart
+from .profiling import TSmartProfiler
+from .protocol import (
+    ACK_RESPONSE,
+    BROADCAST_ADDRESS,
+    CONFIGURATION_RESPONSE,
+    REQUEST_TIMEOUT,
+    REQUEST_TRIES,
+    STATUS_RESPONSE,
+    UDP_PORT,
+    Address,
+    TSmartExchange,
+    TSmartProtocol,
+)
+from .trace import TRACE_RECEIVE, TRACE_SEND, TSmartTracer
+
+RESPONSE_STRUCTS = {
+    0x02: ACK_RESPONSE,
+    0x03: ACK_RESPONSE,
+    0x21: CONFIGURATION_RESPONSE,
+    0xF1: STATUS_RESPONSE,
+    0xF2: ACK_RESPONSE,
+}
+
+
+@dataclass(frozen=True, slots=True)
+class RecordedReply:
+    """How the device answered a request in the recording."""
+
+    latency: float
+    data: bytes
+
+
+@dataclass(frozen=True, slots=True)
+class ReplayResult:
+    """Outcome of a replayed request."""
+
+    ip: str
+    command: int
+    start: float
+    latency: float | None
+
+
+def is_request(frame: CapturedFrame) -> bool:
+    """Whether a frame was a request sent to a single device."""
+    return (
+        frame.source == LOCAL_ADDRESS
+        and frame.destination[0] != BROADCAST_ADDRESS
+        and bool(frame.data)
+    )
+
+
+def recorded_replies(
+    frames: list[CapturedFrame],
+) -> dict[tuple[str, int], deque[RecordedReply | None]]:
+    """Pair each request in a recording with the reply it got, if any.
+
+    A reply is matched to the latest request to the same device and command,
+    so retries are timed from the resend. Earlier requests still waiting had no
+    reply.
+    """
+    requests: dict[tuple[str, int], list[list]] = defaultdict(list)
+    waiting: dict[tuple[str, int], deque[list]] = defaultdict(deque)
+
+    for frame in frames:
+        if is_request(frame):
+            key = (frame.destination[0], frame.data[0])
+            request = [frame.timestamp, None]
+            requests[key].append(request)
+            waiting[key].append(request)
+        elif frame.destination == LOCAL_ADDRESS and frame.data:
+            ip = frame.source[0]
+            if frame.data[0] == 0:
+                # Errors carry no command, they answer whatever is pending
+                key = next((k for k, w in waiting.items() if k[0] == ip and w), None)
+            else:
+                key = (ip, frame.data[0])
+            if key is not None and waiting[key]:
+                request = waiting[key].pop()
+                request[1] = RecordedReply(frame.timestamp - request[0], frame.data)
+                waiting[key].clear()
+
+    return {
+        key: deque(reply for _, reply in sent) for key, sent in requests.items()
+    }
+
+
+class TSmartReplayTransport:
+    """Answers requests from a recording, on a virtual clock.
+
+    Setting recorder captures every frame sent and received, and setting
+    tracer traces every frame, as with TSmartTransport. profiler,
+    max_in_flight and rate are accepted so the replay transport can stand in
+    for any other, but have no effect: sends take no time, and the recording
+    already holds the pacing it was made with.
+    """
+
+    def __init__(self, frames: list[CapturedFrame]) -> None:
+        self.recorder: TSmartRecorder | None = None
+        self.profiler: TSmartProfiler | None = None
+        self.tracer: TSmartTracer | None = None
+        self.max_in_flight: int | None = None
+        self.rate: float | None = None
+        self.now = frames[0].timestamp if frames else 0.0
+        self.results: list[ReplayResult] = []
+        self._replies = recorded_replies(frames)
+        self._protocol = TSmartProtocol()
+        self._futures: dict[TSmartExchange, asyncio.Future[bytes | None]] = {}
+        self._starts: dict[TSmartExchange, float] = {}
+        self._events: list[tuple[float, int, object]] = []
+        self._sequence = itertools.count()
+        self._activity = 0
+        self._runner: asyncio.Task | None = None
+
+    async def async_start(self) -> None:
+        """Nothing to bind."""
+
+    def close(self) -> None:
+        """Nothing to close."""
+
+    def listen(self) -> asyncio.Queue[tuple[bytes, Address]]:
+        """Discovery isn't replayed, the queue never receives anything."""
+        return asyncio.Queue()
+
+    def unlisten(self, listener: asyncio.Queue[tuple[bytes, Address]]) -> None:
+        """Nothing to stop."""
+
+    async def async_broadcast(self, message: bytes) -> None:
+        """Discovery isn't replayed."""
+
+    async def async_request(
+        self,
+        ip: str,
+        request: bytes,
+        response_struct: struct.Struct,
+        tries: int = REQUEST_TRIES,
+        timeout: float = REQUEST_TIMEOUT,
+    ) -> bytes | None:
+        """Send a request, returning the recorded response or None."""
+        future: asyncio.Future[bytes | None] = (
+            asyncio.get_running_loop().create_future()
+        )
+        exchange = self._protocol.request(
+            ip, request, response_struct, self.now, tries, timeout
+        )
+        self._futures[exchange] = future
+        self._starts[exchange] = self.now
+        self._process()
+        return await future
+
+    def monotonic(self) -> float:
+        """Return the virtual time."""
+        return self.now
+
+    async def async_sleep(self, delay: float) -> None:
+        """Sleep on the virtual clock."""
+        future: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._events, (self.now + delay, next(self._sequence), future))
+        self._process()
+        await future
+
+    def _process(self) -> None:
+        """Schedule replies to sent requests and complete finished exchanges."""
+        self._activity += 1
+
+        for data, addr in self._protocol.datagrams_to_send():
+            ip = addr[0]
+            if self.recorder is not None:
+                self.recorder.record(LOCAL_ADDRESS, addr, data)
+            if self.tracer is not None:
+                self.tracer.trace(
+                    ip, TRACE_SEND, "Sent %d bytes", len(data), frame=data
+                )
+            outcomes = self._replies.get((ip, data[0]))
+            reply = outcomes.popleft() if outcomes else None
+            if reply is not None:
+                heapq.heappush(
+                    self._events,
+                    (self.now + reply.latency, next(self._sequence), (reply.data, ip)),
+                )
+
+        for exchange in self._protocol.completed_exchanges():
+            start = self._starts.pop(exchange)
+            self.results.append(
+                ReplayResult(
+                    exchange.ip,
+                    exchange.request[0],
+                    start,
+                    None if exchange.response is None else self.now - start,
+                )
+            )
+            self._futures.pop(exchange).set_result(exchange.response)
+
+        if self._runner is None or self._runner.done():
+            self._runner = asyncio.get_running_loop().create_task(self._run())
+
+    async def _run(self) -> None:
+        """Advance the virtual clock whenever every task is waiting on it."""
+        while True:
+            # Let tasks woken at the current time run before moving on
+            activity = -1
+            while activity != self._activity:
+                activity = self._activity
+                for _ in range(3):
+                    await asyncio.sleep(0)
+
+            deadline = self._protocol.next_deadline()
+            if self._events and (deadline is None or self._events[0][0] < deadline):
+                deadline = self._events[0][0]
+            if deadline is None:
+                return
+
+            self.now = max(self.now, deadline)
+            while self._events and self._events[0][0] <= self.now:
+                _, _, event = heapq.heappop(self._events)
+                if isinstance(event, asyncio.Future):
+                    event.set_result(None)
+                else:
+                    data, ip = event
+                    if self.recorder is not None:
+                        self.recorder.record((ip, UDP_PORT), LOCAL_ADDRESS, data)
+                    if self.tracer is not None:
+                        self.tracer.trace(
+                            ip,
+                            TRACE_RECEIVE,
+                            "Received %d bytes",
+                            len(data),
+                            frame=data,
+                        )
+                    self._protocol.datagram_received(data, (ip, UDP_PORT), self.now)
+            self._protocol.handle_timeout(self.now)
+            self._process()
+
+
+async def async_replay(frames: list[CapturedFrame]) -> dict:
+    """Re-issue every request in a recording, at its recorded time, via TSmart.
+
+    Returns a summary of the replayed latencies.
+    """
+    transport = TSmartReplayTransport(frames)
+    origin = transport.now
+    devices: dict[str, TSmart] = {}
+    started = time.perf_counter()
+
+    async def _async_send(frame: CapturedFrame) -> None:
+        ip = frame.destination[0]
+        if ip not in devices:
+            devices[ip] = TSmart(ip, transport=transport)
+        await transport.async_sleep(frame.timestamp - origin)
+        await devices[ip]._async_request(
+            frame.data, RESPONSE_STRUCTS.get(frame.data[0], ACK_RESPONSE), tries=1
+        )
+
+    await asyncio.gather(*(_async_send(frame) for frame in frames if is_request(frame)))
+
+    latencies = sorted(
+        result.latency for result in transport.results if result.latency is not None
+    )
+    return {
+        "requests": len(transport.results),
+        "answered": len(latencies),
+        "timeouts": len(transport.results) - len(latencies),
+        "latency_p50_ms": round(statistics.median(latencies) * 1000, 1)
+        if latencies
+        else None,
+        "latency_p95_ms": round(latencies[int(len(latencies) * 0.95)] * 1000, 1)
+        if latencies
+        else None,
+        "virtual_duration_s": round(transport.now - origin, 3),
+        "wall_duration_s": round(time.perf_counter() - started, 3),
+    }
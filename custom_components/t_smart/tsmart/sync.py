@@ -0,0 +1,117 @@
+"""Blocking socket driver for the T-Smart protocol.
+
+For tools and thread pools that don't run an event loop, for example:
+
+    with TSmartBlockingTransport() as transport:
+        responses = transport.request_many(
+            [(ip, status_request(), STATUS_RESPONSE) for ip in ips]
+        )
+        statuses = [decode_status(r) if r else None for r in responses]
+"""
+
+import select
+import socket
+import struct
+import threading
+import time
+
+from .capture import LOCAL_ADDRESS, TSmartRecorder
+from .protocol import REQUEST_TIMEOUT, REQUEST_TRIES, UDP_PORT, TSmartProtocol
+from .trace import TRACE_RECEIVE, TRACE_SEND, TSmartTracer
+
+
+class TSmartBlockingTransport:
+    """Drives TSmartProtocol with a blocking socket.
+
+    Requests made together with request_many run concurrently. Calls from
+    different threads are safe, and are served one at a time. Setting
+    recorder captures every frame sent and received, and setting tracer
+    traces the frames of the devices it is enabled for.
+    """
+
+    def __init__(self) -> None:
+        self.recorder: TSmartRecorder | None = None
+        self.tracer: TSmartTracer | None = None
+        self._protocol = TSmartProtocol()
+        self._lock = threading.Lock()
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)  # Internet, UDP
+        self._sock.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
+        self._sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._sock.bind(("", UDP_PORT))
+        self._sock.setblocking(False)
+
+    def __enter__(self) -> "TSmartBlockingTransport":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Close the socket."""
+        self._sock.close()
+
+    def request(
+        self,
+        ip: str,
+        request: bytes,
+        response_struct: struct.Struct,
+        tries: int = REQUEST_TRIES,
+        timeout: float = REQUEST_TIMEOUT,
+    ) -> bytes | None:
+        """Send a request, returning the response or None if there was none."""
+        return self.request_many([(ip, request, response_struct)], tries, timeout)[0]
+
+    def request_many(
+        self,
+        requests: list[tuple[str, bytes, struct.Struct]],
+        tries: int = REQUEST_TRIES,
+        timeout: float = REQUEST_TIMEOUT,
+    ) -> list[bytes | None]:
+        """Send requests concurrently, returning their responses in order."""
+        with self._lock:
+            protocol = self._protocol
+            now = time.monotonic()
+            exchanges = [
+                protocol.request(ip, request, response_struct, now, tries, timeout)
+                for ip, request, response_struct in requests
+            ]
+            remaining = len(exchanges)
+
+            while True:
+                for data, addr in protocol.datagrams_to_send():
+                    self._sock.sendto(data, addr)
+                    if self.recorder is not None:
+                        self.recorder.record(LOCAL_ADDRESS, addr, data)
+                    if self.tracer is not None:
+                        self.tracer.trace(
+                            addr[0], TRACE_SEND, "Sent %d bytes", len(data), frame=data
+                        )
+                remaining -= len(protocol.completed_exchanges())
+                if remaining <= 0:
+                    break
+
+                deadline = protocol.next_deadline()
+                wait = None if deadline is None else max(0, deadline - now)
+                readable, _, _ = select.select([self._sock], [], [], wait)
+
+                now = time.monotonic()
+                if readable:
+                    self._receive(now)
+                protocol.handle_timeout(now)
+
+            return [exchange.response for exchange in exchanges]
+
+    def _receive(self, now: float) -> None:
+        """Feed every waiting datagram to the protocol."""
+        while True:
+            try:
+                data, addr = self._sock.recvfrom(2048)
+            except BlockingIOError:
+                return
+            if self.recorder is not None:
+                self.recorder.record(addr, LOCAL_ADDRESS, data)
+            if self.tracer is not None:
+                self.tracer.trace(
+                    addr[0], TRACE_RECEIVE, "Received %d bytes", len(data), frame=data
+                )
+            self._protocol.datagram_received(data, addr, now)
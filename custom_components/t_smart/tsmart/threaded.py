@@ -0,0 +1,182 @@
+"""T-Smart transport running on a dedicated thread.
+
+TSmartThreadedTransport can be passed to TSmart in place of TSmartTransport.
+The socket, retries and timeouts run on an event loop of their own, so a busy
+caller loop doesn't delay reading replies or firing timeouts. Only the
+outcome of each request is handed back to the caller's loop.
+"""
+
+import asyncio
+import struct
+import threading
+import time
+from collections.abc import Coroutine
+from typing import Any
+
+from .capture import TSmartRecorder
+from .profiling import TSmartProfiler
+from .protocol import REQUEST_TIMEOUT, REQUEST_TRIES, Address
+from .trace import TSmartTracer
+from .transport import TSmartTransport
+
+SHUTDOWN_TIMEOUT = 5  # Seconds
+
+
+class _ThreadsafeQueue:
+    """Hands datagrams from the I/O loop to a queue on the caller's loop."""
+
+    def __init__(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        queue: asyncio.Queue[tuple[bytes, Address]],
+    ) -> None:
+        self._loop = loop
+        self._queue = queue
+
+    def put_nowait(self, item: tuple[bytes, Address]) -> None:
+        self._loop.call_soon_threadsafe(self._queue.put_nowait, item)
+
+
+class TSmartThreadedTransport:
+    """TSmartTransport driven by its own event loop on a daemon thread.
+
+    The thread is started by the first request. recorder, profiler, tracer,
+    max_in_flight and rate are passed through to the transport, so they are
+    used from the I/O thread.
+    """
+
+    def __init__(self) -> None:
+        self._transport = TSmartTransport()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._lock = threading.Lock()
+        self._listeners: dict[asyncio.Queue, _ThreadsafeQueue] = {}
+
+    @property
+    def recorder(self) -> TSmartRecorder | None:
+        return self._transport.recorder
+
+    @recorder.setter
+    def recorder(self, recorder: TSmartRecorder | None) -> None:
+        self._transport.recorder = recorder
+
+    @property
+    def profiler(self) -> TSmartProfiler | None:
+        return self._transport.profiler
+
+    @profiler.setter
+    def profiler(self, profiler: TSmartProfiler | None) -> None:
+        self._transport.profiler = profiler
+
+    @property
+    def tracer(self) -> TSmartTracer | None:
+        return self._transport.tracer
+
+    @tracer.setter
+    def tracer(self, tracer: TSmartTracer | None) -> None:
+        self._transport.tracer = tracer
+
+    @property
+    def max_in_flight(self) -> int | None:
+        return self._transport.max_in_flight
+
+    @max_in_flight.setter
+    def max_in_flight(self, max_in_flight: int | None) -> None:
+        self._transport.max_in_flight = max_in_flight
+
+    @property
+    def rate(self) -> float | None:
+        return self._transport.rate
+
+    @rate.setter
+    def rate(self, rate: float | None) -> None:
+        self._transport.rate = rate
+
+    def _io_loop(self) -> asyncio.AbstractEventLoop:
+        """Return the I/O loop, starting its thread if it isn't running."""
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(
+                    target=self._run,
+                    args=(self._loop,),
+                    name="tsmart-io",
+                    daemon=True,
+                ).start()
+            return self._loop
+
+    @staticmethod
+    def _run(loop: asyncio.AbstractEventLoop) -> None:
+        """Run the I/O loop until the transport is closed."""
+        asyncio.set_event_loop(loop)
+        try:
+            loop.run_forever()
+        finally:
+            loop.close()
+
+    async def _async_run[T](self, coro: Coroutine[Any, Any, T]) -> T:
+        """Run a coroutine on the I/O loop, returning its result here."""
+        return await asyncio.wrap_future(
+            asyncio.run_coroutine_threadsafe(coro, self._io_loop())
+        )
+
+    async def async_start(self) -> None:
+        """Bind the socket if it isn't already."""
+        await self._async_run(self._transport.async_start())
+
+    def close(self) -> None:
+        """Close the socket and stop the thread once outstanding requests end.
+
+        The transport can't be used again afterwards.
+        """
+        with self._lock:
+            loop, self._loop = self._loop, None
+        if loop is not None:
+            asyncio.run_coroutine_threadsafe(self._async_shutdown(), loop)
+
+    async def _async_shutdown(self) -> None:
+        """Close the transport, then stop the I/O loop."""
+        self._transport.close()
+        if tasks := asyncio.all_tasks() - {asyncio.current_task()}:
+            await asyncio.wait(tasks, timeout=SHUTDOWN_TIMEOUT)
+        loop = asyncio.get_running_loop()
+        loop.call_soon(loop.stop)
+
+    async def async_request(
+        self,
+        ip: str,
+        request: bytes,
+        response_struct: struct.Struct,
+        tries: int = REQUEST_TRIES,
+        timeout: float = REQUEST_TIMEOUT,
+    ) -> bytes | None:
+        """Send a request, returning the response or None if there was none."""
+        return await self._async_run(
+            self._transport.async_request(ip, request, response_struct, tries, timeout)
+        )
+
+    def monotonic(self) -> float:
+        """Return the time, in seconds from an arbitrary origin."""
+        return time.monotonic()
+
+    async def async_sleep(self, delay: float) -> None:
+        """Sleep for delay seconds, on the caller's loop."""
+        await asyncio.sleep(delay)
+
+    async def async_broadcast(self, message: bytes) -> None:
+        """Broadcast a message to every device on the network."""
+        await self._async_run(self._transport.async_broadcast(message))
+
+    def listen(self) -> asyncio.Queue[tuple[bytes, Address]]:
+        """Return a queue receiving datagrams that no request is waiting for."""
+        queue: asyncio.Queue[tuple[bytes, Address]] = asyncio.Queue()
+        listener = self._listeners[queue] = _ThreadsafeQueue(
+            asyncio.get_running_loop(), queue
+        )
+        self._io_loop().call_soon_threadsafe(self._transport.listen, listener)
+        return queue
+
+    def unlisten(self, queue: asyncio.Queue[tuple[bytes, Address]]) -> None:
+        """Stop a queue returned by listen receiving datagrams."""
+        listener = self._listeners.pop(queue)
+        if (loop := self._loop) is not None:
+            loop.call_soon_threadsafe(self._transport.unlisten, listener)
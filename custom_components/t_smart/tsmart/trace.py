@@ -0,0 +1,118 @@
+"""Structured tracing of T-Smart traffic.
+
+TSmart and the transports report what they do to their tracer attribute when
+one is set, for example:
+
+    tracer = TSmartTracer()
+    device.tracer = transport.tracer = tracer
+    tracer.enable("192.168.1.20")
+    ...
+    tracer.records_as_dict()
+
+Only devices enabled by IP address are traced, for any other a trace is a
+single set lookup. Records keep the message and its arguments as they are,
+and are only formatted when read or logged at debug level.
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any
+
+MAX_RECORDS = 500
+
+# Events reported by the client and transports
+TRACE_SEND = "send"
+TRACE_RECEIVE = "receive"
+TRACE_REQUEST = "request"
+TRACE_RESPONSE = "response"
+TRACE_TIMEOUT = "timeout"
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True, slots=True)
+class TraceRecord:
+    """Something that happened to a device, timestamped by the wall clock."""
+
+    timestamp: float
+    ip: str
+    event: str
+    message: str
+    args: tuple[Any, ...]
+    frame: bytes | None = None
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the record formatted."""
+        return {
+            "timestamp": round(self.timestamp, 3),
+            "ip": self.ip,
+            "event": self.event,
+            "message": self.message % self.args,
+            "frame": self.frame.hex(" ") if self.frame is not None else None,
+        }
+
+
+class TSmartTracer:
+    """Keeps the most recent records of the devices being traced.
+
+    frame_rate is the share of frames kept with their records, spread evenly,
+    so 0.1 keeps every tenth. Records may be made from another thread, such
+    as by a TSmartThreadedTransport.
+    """
+
+    def __init__(self, max_records: int = MAX_RECORDS, frame_rate: float = 1) -> None:
+        self.records: deque[TraceRecord] = deque(maxlen=max_records)
+        self.frame_rate = frame_rate
+        self._ips: frozenset[str] = frozenset()
+        self._frame_credit = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def ips(self) -> frozenset[str]:
+        """Return the IP addresses of the devices being traced."""
+        return self._ips
+
+    def enable(self, ip: str) -> None:
+        """Start tracing a device."""
+        with self._lock:
+            self._ips = self._ips | {ip}
+
+    def disable(self, ip: str) -> None:
+        """Stop tracing a device, keeping its records."""
+        with self._lock:
+            self._ips = self._ips - {ip}
+
+    def trace(
+        self,
+        ip: str,
+        event: str,
+        message: str,
+        *args: Any,
+        frame: bytes | None = None,
+    ) -> None:
+        """Record an event of a device, if it is being traced."""
+        if ip not in self._ips:
+            return
+
+        with self._lock:
+            if frame is not None:
+                self._frame_credit += self.frame_rate
+                if self._frame_credit >= 1:
+                    self._frame_credit -= 1
+                else:
+                    frame = None
+            self.records.append(
+                TraceRecord(time.time(), ip, event, message, args, frame)
+            )
+
+        if _LOGGER.isEnabledFor(logging.DEBUG):
+            _LOGGER.debug("%s %s: %s", ip, event, message % args)
+
+    def records_as_dict(self, ip: str | None = None) -> list[dict[str, Any]]:
+        """Return the records, of one device or all, oldest first."""
+        with self._lock:
+            records = list(self.records)
+        return [record.as_dict() for record in records if ip is None or record.ip == ip]
@@ -0,0 +1,239 @@
+"""Asyncio driver for the T-Smart protocol."""
+
+import asyncio
+import socket
+import struct
+import time
+
+from .capture import LOCAL_ADDRESS, TSmartRecorder
+from .profiling import PHASE_SEND, TSmartProfiler
+from .protocol import (
+    REQUEST_TIMEOUT,
+    REQUEST_TRIES,
+    UDP_PORT,
+    Address,
+    TSmartExchange,
+    TSmartProtocol,
+)
+from .trace import TRACE_RECEIVE, TRACE_SEND, TSmartTracer
+
+
+class TSmartTransport(asyncio.DatagramProtocol):
+    """Shared UDP socket for talking to any number of T-Smart devices.
+
+    Devices always reply to port 1337, so only one socket can own it. Matching,
+    retries and timeouts are left to TSmartProtocol, which lets requests to many
+    devices run concurrently. Datagrams nobody is waiting for, such as discovery
+    replies, go to the listeners.
+
+    Setting recorder captures every frame sent and received, setting profiler
+    times every send, and setting tracer traces every frame of the devices it
+    is enabled for.
+
+    Setting max_in_flight limits how many requests are outstanding at once,
+    and rate how many datagrams a second are sent, retries included, with
+    bursts of up to a second's worth. Requests over either limit wait their
+    turn in order before being sent.
+
+    monotonic and async_sleep are the clock of the devices behind the
+    transport, the real one here.
+    """
+
+    def __init__(self) -> None:
+        self.recorder: TSmartRecorder | None = None
+        self.profiler: TSmartProfiler | None = None
+        self.tracer: TSmartTracer | None = None
+        self.max_in_flight: int | None = None
+        self.rate: float | None = None
+        self._in_flight = 0
+        self._slot_freed = asyncio.Event()
+        self._tokens = 0.0
+        self._tokens_updated = 0.0
+        self._pace_lock = asyncio.Lock()
+        self._transport: asyncio.DatagramTransport | None = None
+        self._protocol = TSmartProtocol()
+        self._futures: dict[TSmartExchange, asyncio.Future[bytes | None]] = {}
+        self._listeners: list[asyncio.Queue[tuple[bytes, Address]]] = []
+        self._timer: asyncio.TimerHandle | None = None
+        self._lock = asyncio.Lock()
+
+    async def async_start(self) -> None:
+        """Bind the socket if it isn't already."""
+        if self._transport is not None:
+            return
+
+        async with self._lock:
+            if self._transport is not None:
+                return
+
+            sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)  # Internet, UDP
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            sock.bind(("", UDP_PORT))
+            sock.setblocking(False)
+
+            loop = asyncio.get_running_loop()
+            await loop.create_datagram_endpoint(lambda: self, sock=sock)
+
+    def close(self) -> None:
+        """Close the socket, failing any outstanding requests."""
+        if self._transport is not None:
+            self._transport.close()
+            self._transport = None
+
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        for exchange, future in self._futures.items():
+            self._protocol.cancel(exchange)
+            if not future.done():
+                future.set_result(None)
+        self._futures.clear()
+
+    def monotonic(self) -> float:
+        """Return the time, in seconds from an arbitrary origin."""
+        return time.monotonic()
+
+    async def async_sleep(self, delay: float) -> None:
+        """Sleep for delay seconds."""
+        await asyncio.sleep(delay)
+
+    def connection_made(self, transport) -> None:
+        self._transport = transport
+
+    def connection_lost(self, exc) -> None:
+        self._transport = None
+
+    def datagram_received(self, data: bytes, addr: Address) -> None:
+        if self.recorder is not None:
+            self.recorder.record(addr, LOCAL_ADDRESS, data)
+        if self.tracer is not None:
+            self.tracer.trace(
+                addr[0], TRACE_RECEIVE, "Received %d bytes", len(data), frame=data
+            )
+
+        now = asyncio.get_running_loop().time()
+        if not self._protocol.datagram_received(data, addr, now):
+            for listener in self._listeners:
+                listener.put_nowait((data, addr))
+        self._process()
+
+    async def async_request(
+        self,
+        ip: str,
+        request: bytes,
+        response_struct: struct.Struct,
+        tries: int = REQUEST_TRIES,
+        timeout: float = REQUEST_TIMEOUT,
+    ) -> bytes | None:
+        """Send a request, returning the response or None if there was none."""
+        await self.async_start()
+        if self.max_in_flight is not None or self.rate is not None:
+            await self._async_wait_turn()
+        self._in_flight += 1
+
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future[bytes | None] = loop.create_future()
+        try:
+            exchange = self._protocol.request(
+                ip, request, response_struct, loop.time(), tries, timeout
+            )
+            self._futures[exchange] = future
+            self._process()
+
+            try:
+                return await future
+            finally:
+                if not exchange.done:
+                    self._protocol.cancel(exchange)
+                self._futures.pop(exchange, None)
+        finally:
+            self._in_flight -= 1
+            self._slot_freed.set()
+
+    async def _async_wait_turn(self) -> None:
+        """Wait until a request can be sent within the limits."""
+        async with self._pace_lock:
+            while (
+                self.max_in_flight is not None
+                and self._in_flight >= self.max_in_flight
+            ):
+                self._slot_freed.clear()
+                await self._slot_freed.wait()
+
+            while self.rate is not None and (wait := self._refill()) > 0:
+                await asyncio.sleep(wait)
+
+    def _refill(self) -> float:
+        """Top up the rate budget, returning how long until a datagram fits."""
+        now = asyncio.get_running_loop().time()
+        self._tokens = min(
+            max(self.rate, 1), self._tokens + (now - self._tokens_updated) * self.rate
+        )
+        self._tokens_updated = now
+        return 0 if self._tokens >= 1 else (1 - self._tokens) / self.rate
+
+    async def async_broadcast(self, message: bytes) -> None:
+        """Broadcast a message to every device on the network."""
+        await self.async_start()
+        self._protocol.broadcast(message)
+        self._process()
+
+    def listen(
+        self, listener: asyncio.Queue[tuple[bytes, Address]] | None = None
+    ) -> asyncio.Queue[tuple[bytes, Address]]:
+        """Return a queue receiving datagrams that no request is waiting for.
+
+        A queue, or anything with a put_nowait method, can be passed in to be
+        used instead of a new one.
+        """
+        if listener is None:
+            listener = asyncio.Queue()
+        self._listeners.append(listener)
+        return listener
+
+    def unlisten(self, listener: asyncio.Queue[tuple[bytes, Address]]) -> None:
+        """Stop a queue returned by listen receiving datagrams."""
+        self._listeners.remove(listener)
+
+    def _process(self) -> None:
+        """Act on the protocol's output: send, complete futures and arm the timer."""
+        protocol = self._protocol
+
+        for data, addr in protocol.datagrams_to_send():
+            if self.rate is not None:
+                self._refill()
+                self._tokens -= 1
+            if self._transport is not None:
+                start = time.perf_counter()
+                self._transport.sendto(data, addr)
+                if self.profiler is not None:
+                    self.profiler.add(PHASE_SEND, time.perf_counter() - start)
+            if self.recorder is not None:
+                self.recorder.record(LOCAL_ADDRESS, addr, data)
+            if self.tracer is not None:
+                self.tracer.trace(
+                    addr[0], TRACE_SEND, "Sent %d bytes", len(data), frame=data
+                )
+
+        for exchange in protocol.completed_exchanges():
+            future = self._futures.pop(exchange, None)
+            if future is not None and not future.done():
+                future.set_result(exchange.response)
+
+        deadline = protocol.next_deadline()
+        if self._timer is not None:
+            if deadline is not None and self._timer.when() == deadline:
+                return
+            self._timer.cancel()
+            self._timer = None
+        if deadline is not None:
+            self._timer = asyncio.get_running_loop().call_at(
+                deadline, self._handle_timer
+            )
+
+    def _handle_timer(self) -> None:
+        self._timer = None
+        self._protocol.handle_timeout(asyncio.get_running_loop().time())
+        self._process()
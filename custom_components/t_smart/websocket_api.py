@@ -0,0 +1,44 @@
+"""Websocket API for t_smart."""
+
+from __future__ import annotations
+
+from typing import Any
+
+import voluptuous as vol
+
+from homeassistant.components import websocket_api
+from homeassistant.core import HomeAssistant, callback
+
+from .const import DOMAIN
+from .stream import DATA_STREAM, Deltas
+
+
+@callback
+def async_setup_websocket_api(hass: HomeAssistant) -> None:
+    """Register the websocket commands."""
+    websocket_api.async_register_command(hass, websocket_subscribe)
+
+
+@websocket_api.websocket_command({vol.Required("type"): f"{DOMAIN}/subscribe"})
+@callback
+def websocket_subscribe(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: dict[str, Any],
+) -> None:
+    """Stream the status fields of every device that changed.
+
+    The first event has every field of every device, later ones only the
+    fields that changed since the previous event, once per poll interval.
+    """
+    stream = hass.data[DATA_STREAM]
+
+    @callback
+    def _async_send(deltas: Deltas) -> None:
+        connection.send_message(
+            websocket_api.event_message(msg["id"], {"devices": deltas})
+        )
+
+    connection.subscriptions[msg["id"]] = stream.async_subscribe(_async_send)
+    connection.send_result(msg["id"])
+    _async_send(stream.snapshot())
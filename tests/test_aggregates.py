@@ -0,0 +1,151 @@
+"""Tests for the fleet aggregates by area and label."""
+
+from dataclasses import replace
+from unittest.mock import MagicMock, Mock
+
+import pytest
+
+from custom_components.t_smart import aggregates as aggregates_module
+from custom_components.t_smart.aggregates import (
+    FLEET_GROUP,
+    GROUP_AREA,
+    GROUP_LABEL,
+    SIGNAL_GROUP_ADDED,
+    TSmartFleetAggregates,
+    signal_group_removed,
+    signal_group_updated,
+)
+from custom_components.t_smart.tsmart import TSmartMode
+from custom_components.t_smart.tsmart.protocol import (
+    STATUS_RESPONSE,
+    decode_status,
+    encode,
+)
+
+STATUS = decode_status(
+    encode(STATUS_RESPONSE.pack(0xF1, 0, 0, 1, 600, 0, 552, 1, 0, 401, bytes(16), 0))
+)
+
+KITCHEN = (GROUP_AREA, "kitchen")
+RENTAL = (GROUP_LABEL, "rental")
+
+
+@pytest.fixture
+def devices():
+    """Return the device registry entries of the heaters by device id."""
+    return {}
+
+
+@pytest.fixture
+def aggregates(monkeypatch, devices):
+    registry = Mock()
+    registry.async_get_device = lambda identifiers: devices.get(
+        next(iter(identifiers))[1]
+    )
+    monkeypatch.setattr(aggregates_module.dr, "async_get", lambda hass: registry)
+    monkeypatch.setattr(aggregates_module.ar, "async_get", Mock())
+    monkeypatch.setattr(aggregates_module.lr, "async_get", Mock())
+    monkeypatch.setattr(aggregates_module, "async_track_time_interval", Mock())
+    monkeypatch.setattr(aggregates_module, "async_dispatcher_send", Mock())
+    return TSmartFleetAggregates(MagicMock())
+
+
+def _entry(devices, device_id, area_id=None, labels=(), status=STATUS) -> MagicMock:
+    devices[device_id] = Mock(id=f"reg-{device_id}", area_id=area_id, labels=labels)
+    entry = MagicMock()
+    entry.entry_id = f"entry-{device_id}"
+    entry.runtime_data.device.device_id = device_id
+    coordinator = entry.runtime_data.coordinator
+    coordinator.last_update_success = True
+    coordinator.restored = False
+    coordinator.data = status
+    coordinator.temperature_for_mode = lambda data: data.temperature_average
+    return entry
+
+
+def _updated(entry: MagicMock) -> None:
+    """Call the listener the aggregates added to the entry's coordinator."""
+    entry.runtime_data.coordinator.async_add_listener.call_args.args[0]()
+
+
+def _signals() -> list:
+    """Return the arguments of the signals sent, after hass."""
+    send = aggregates_module.async_dispatcher_send
+    return [call.args[1:] for call in send.mock_calls]
+
+
+def test_totals_by_group(aggregates, devices):
+    aggregates.async_add_entry(_entry(devices, "A1", "kitchen", ("rental",)))
+    aggregates.async_add_entry(
+        _entry(
+            devices,
+            "B2",
+            "kitchen",
+            status=replace(STATUS, relay=False, mode=TSmartMode.CRITICAL),
+        )
+    )
+
+    fleet = aggregates.totals[FLEET_GROUP]
+    assert (fleet.members, fleet.online, fleet.heating, fleet.critical) == (2, 2, 1, 1)
+    assert fleet.average_temperature == pytest.approx(47.65, abs=0.05)
+    assert aggregates.totals[KITCHEN].members == 2
+    assert aggregates.totals[RENTAL].members == 1
+    assert (SIGNAL_GROUP_ADDED, RENTAL) in _signals()
+
+
+def test_updates_replace_the_sample(aggregates, devices):
+    entry = _entry(devices, "A1", "kitchen")
+    aggregates.async_add_entry(entry)
+    aggregates.async_add_entry(_entry(devices, "B2"))
+    aggregates._async_flush()
+    aggregates_module.async_dispatcher_send.reset_mock()
+
+    entry.runtime_data.coordinator.data = replace(
+        STATUS, temperature_average=60.0, relay=False
+    )
+    _updated(entry)
+    entry.runtime_data.coordinator.last_update_success = False
+    _updated(entry)
+    entry.runtime_data.coordinator.last_update_success = True
+    _updated(entry)
+
+    fleet = aggregates.totals[FLEET_GROUP]
+    assert (fleet.online, fleet.heating) == (2, 1)
+    assert fleet.average_temperature == pytest.approx((60.0 + 47.65) / 2, abs=0.05)
+    assert aggregates.totals[KITCHEN].average_temperature == 60.0
+
+    # Written once, however many updates there were
+    aggregates._async_flush()
+    assert sorted(_signals()) == sorted(
+        [(signal_group_updated(FLEET_GROUP),), (signal_group_updated(KITCHEN),)]
+    )
+
+
+def test_groups_left_empty_are_removed(aggregates, devices):
+    remove = aggregates.async_add_entry(_entry(devices, "A1", "kitchen"))
+    aggregates.async_add_entry(_entry(devices, "B2"))
+
+    # The area is deleted, which leaves the heater without one
+    devices["A1"].area_id = None
+    aggregates._async_device_updated(
+        Mock(data={"action": "update", "device_id": "reg-A1"})
+    )
+
+    assert KITCHEN not in aggregates.totals
+    assert (signal_group_removed(KITCHEN),) in _signals()
+    assert aggregates.totals[FLEET_GROUP].members == 2
+
+    remove()
+    assert aggregates.totals[FLEET_GROUP].members == 1
+    assert (signal_group_removed(FLEET_GROUP),) not in _signals()
+
+
+def test_only_device_updates_regroup(aggregates, devices):
+    aggregates.async_add_entry(_entry(devices, "A1", "kitchen"))
+    devices["A1"].area_id = None
+
+    aggregates._async_device_updated(
+        Mock(data={"action": "create", "device_id": "reg-A1"})
+    )
+
+    assert KITCHEN in aggregates.totals
@@ -0,0 +1,88 @@
+"""Tests for learning which commands each firmware answers."""
+
+from unittest.mock import Mock
+
+from custom_components.t_smart.tsmart import capabilities as capabilities_module
+from custom_components.t_smart.tsmart.capabilities import (
+    COMMAND_RESTART,
+    COMMAND_TIMESYNC,
+    REPROBE_INTERVAL,
+    UNSUPPORTED_AFTER,
+    TSmartCapabilities,
+    firmware_key,
+)
+
+FIRMWARE = "T-Smart 1.2.3"
+
+
+def _miss(capabilities, times, reachable=True):
+    for _ in range(times):
+        capabilities.record(
+            FIRMWARE, COMMAND_TIMESYNC, answered=False, reachable=reachable
+        )
+
+
+def test_firmware_key():
+    assert firmware_key("T-Smart", "1.2.3") == FIRMWARE
+    assert firmware_key("T-Smart", "") is None
+
+
+def test_unknown_until_learned():
+    capabilities = TSmartCapabilities()
+
+    assert capabilities.supports(FIRMWARE, COMMAND_TIMESYNC) is None
+    assert capabilities.supports(None, COMMAND_TIMESYNC) is None
+
+
+def test_answered_is_supported():
+    capabilities = TSmartCapabilities()
+    capabilities.record(FIRMWARE, COMMAND_RESTART, answered=True, reachable=True)
+
+    assert capabilities.supports(FIRMWARE, COMMAND_RESTART) is True
+    assert capabilities.supports(FIRMWARE, COMMAND_TIMESYNC) is None
+
+
+def test_unsupported_after_misses_in_a_row():
+    capabilities = TSmartCapabilities()
+    _miss(capabilities, UNSUPPORTED_AFTER - 1)
+    assert capabilities.supports(FIRMWARE, COMMAND_TIMESYNC) is None
+
+    capabilities.record(FIRMWARE, COMMAND_TIMESYNC, answered=True, reachable=True)
+    _miss(capabilities, UNSUPPORTED_AFTER - 1)
+    assert capabilities.supports(FIRMWARE, COMMAND_TIMESYNC) is True
+
+    _miss(capabilities, 1)
+    assert capabilities.supports(FIRMWARE, COMMAND_TIMESYNC) is False
+
+
+def test_offline_devices_teach_nothing():
+    capabilities = TSmartCapabilities()
+    _miss(capabilities, UNSUPPORTED_AFTER * 2, reachable=False)
+
+    assert capabilities.supports(FIRMWARE, COMMAND_TIMESYNC) is None
+    assert capabilities.as_dict() == {}
+
+
+def test_unsupported_is_reprobed(monkeypatch):
+    capabilities = TSmartCapabilities()
+    monkeypatch.setattr(capabilities_module.time, "time", lambda: 1000.0)
+    _miss(capabilities, UNSUPPORTED_AFTER)
+    assert capabilities.supports(FIRMWARE, COMMAND_TIMESYNC) is False
+
+    monkeypatch.setattr(
+        capabilities_module.time, "time", lambda: 1001.0 + REPROBE_INTERVAL
+    )
+    assert capabilities.supports(FIRMWARE, COMMAND_TIMESYNC) is None
+
+
+def test_changes_are_reported_and_stored():
+    capabilities = TSmartCapabilities()
+    capabilities.on_change = on_change = Mock()
+
+    capabilities.record(FIRMWARE, COMMAND_RESTART, answered=True, reachable=True)
+    capabilities.record(FIRMWARE, COMMAND_RESTART, answered=True, reachable=True)
+    assert on_change.call_count == 1
+
+    restored = TSmartCapabilities.from_dict(capabilities.as_dict())
+    assert restored.supports(FIRMWARE, COMMAND_RESTART) is True
+    assert restored.as_dict() == capabilities.as_dict()
@@ -0,0 +1,199 @@
+"""Tests for fleet demand limiting."""
+
+import asyncio
+from dataclasses import replace
+from unittest.mock import AsyncMock, MagicMock, Mock
+
+import pytest
+
+from custom_components.t_smart import demand as demand_module
+from custom_components.t_smart.const import (
+    CONF_HEATER_POWER,
+    DEFAULT_SETBACK_TEMPERATURE,
+    DEMAND_COMMAND_RETRY,
+    DEMAND_ROTATION_INTERVAL,
+)
+from custom_components.t_smart.demand import TSmartDemandLimiter
+from custom_components.t_smart.holds import DATA_HOLDS, OWNER_DEMAND, TSmartHolds
+from custom_components.t_smart.tsmart import TSmartMode
+from custom_components.t_smart.tsmart.protocol import (
+    STATUS_RESPONSE,
+    decode_status,
+    encode,
+)
+
+STATUS = decode_status(
+    encode(STATUS_RESPONSE.pack(0xF1, 0, 0, 1, 550, 0, 552, 1, 0, 401, bytes(16), 0))
+)
+
+SETBACK = (True, TSmartMode.MANUAL, DEFAULT_SETBACK_TEMPERATURE)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Return the monotonic clock, as a list holding the time to set."""
+    clock = [1000.0]
+    monkeypatch.setattr(demand_module.time, "monotonic", lambda: clock[0])
+    return clock
+
+
+@pytest.fixture
+def hass():
+    hass = MagicMock()
+    hass.data = {}
+    hass.tasks = []
+    hass.async_create_background_task = lambda coro, name: hass.tasks.append(coro)
+    holds = hass.data[DATA_HOLDS] = TSmartHolds(hass)
+    holds._async_save = Mock()
+    holds._async_refresh = AsyncMock()
+    return hass
+
+
+@pytest.fixture
+def limiter(hass):
+    limiter = TSmartDemandLimiter(hass)
+    limiter._async_save = Mock()
+    return limiter
+
+
+def _entry(device_id: str) -> MagicMock:
+    entry = MagicMock()
+    entry.entry_id = f"entry-{device_id}"
+    entry.data = {}
+    entry.runtime_data.device.device_id = device_id
+    entry.runtime_data.device.async_control_set = AsyncMock(return_value=True)
+    coordinator = entry.runtime_data.coordinator
+    coordinator.last_update_success = True
+    coordinator.restored = False
+    coordinator.data = STATUS
+    return entry
+
+
+def _evaluate(hass, limiter) -> None:
+    """Evaluate the budget and run the commands it sends."""
+    limiter._async_evaluate()
+    while hass.tasks:
+        asyncio.run(hass.tasks.pop(0))
+
+
+def _set_relay(entry: MagicMock, *, relay: bool) -> None:
+    entry.runtime_data.coordinator.data = replace(STATUS, relay=relay)
+
+
+def _held(hass, *entries) -> list[bool]:
+    holds = hass.data[DATA_HOLDS]
+    return [
+        holds.owner(entry.runtime_data.device.device_id) == OWNER_DEMAND
+        for entry in entries
+    ]
+
+
+def test_longest_heating_is_held_over_budget(hass, limiter, clock):
+    first, second = _entry("A1"), _entry("B2")
+    limiter.async_add_entry(first)
+    clock[0] += 10
+    limiter.async_add_entry(second)
+
+    asyncio.run(limiter.async_configure(1, None, DEFAULT_SETBACK_TEMPERATURE))
+    _evaluate(hass, limiter)
+
+    assert _held(hass, first, second) == [True, False]
+    first.runtime_data.device.async_control_set.assert_awaited_once_with(*SETBACK)
+    second.runtime_data.device.async_control_set.assert_not_awaited()
+
+
+def test_power_budget(hass, limiter, clock):
+    first, second = _entry("A1"), _entry("B2")
+    first.data = {CONF_HEATER_POWER: 2.0}
+    limiter.async_add_entry(first)
+    clock[0] += 10
+    limiter.async_add_entry(second)
+
+    asyncio.run(limiter.async_configure(None, 3.0, DEFAULT_SETBACK_TEMPERATURE))
+    _evaluate(hass, limiter)
+
+    assert _held(hass, first, second) == [True, False]
+
+
+def test_held_heater_released_once_it_fits(hass, limiter, clock):
+    first, second = _entry("A1"), _entry("B2")
+    limiter.async_add_entry(first)
+    clock[0] += 10
+    limiter.async_add_entry(second)
+    asyncio.run(limiter.async_configure(1, None, DEFAULT_SETBACK_TEMPERATURE))
+    _evaluate(hass, limiter)
+
+    _set_relay(second, relay=False)
+    clock[0] += 1
+    _evaluate(hass, limiter)
+
+    assert _held(hass, first, second) == [False, False]
+    first.runtime_data.device.async_control_set.assert_awaited_with(
+        True, TSmartMode.MANUAL, 55
+    )
+
+    # Counted as on until its relay is reported, so the other isn't let in
+    _set_relay(first, relay=False)
+    _set_relay(second, relay=True)
+    _evaluate(hass, limiter)
+    assert _held(hass, first, second) == [False, True]
+
+
+def test_heaters_take_turns(hass, limiter, clock):
+    first, second = _entry("A1"), _entry("B2")
+    limiter.async_add_entry(first)
+    clock[0] += 10
+    limiter.async_add_entry(second)
+    asyncio.run(limiter.async_configure(1, None, DEFAULT_SETBACK_TEMPERATURE))
+    _evaluate(hass, limiter)
+
+    clock[0] += DEMAND_ROTATION_INTERVAL - 20
+    _evaluate(hass, limiter)
+    assert _held(hass, first, second) == [True, False]
+
+    clock[0] += 20
+    _evaluate(hass, limiter)
+    assert _held(hass, first, second) == [False, True]
+
+
+def test_failed_command_is_retried_later(hass, limiter, clock):
+    first, second = _entry("A1"), _entry("B2")
+    control_set = first.runtime_data.device.async_control_set
+    control_set.return_value = False
+    limiter.async_add_entry(first)
+    clock[0] += 10
+    limiter.async_add_entry(second)
+    asyncio.run(limiter.async_configure(1, None, DEFAULT_SETBACK_TEMPERATURE))
+
+    _evaluate(hass, limiter)
+    assert control_set.await_count == 1
+    assert _held(hass, first, second) == [False, False]
+
+    # Left alone meanwhile, so the next longest heating is held instead
+    _evaluate(hass, limiter)
+    assert control_set.await_count == 1
+    assert _held(hass, first, second) == [False, True]
+
+    asyncio.run(limiter.async_configure(0, None, DEFAULT_SETBACK_TEMPERATURE))
+    control_set.return_value = True
+    clock[0] += DEMAND_COMMAND_RETRY - 1
+    _evaluate(hass, limiter)
+    assert control_set.await_count == 1
+
+    clock[0] += 1
+    _evaluate(hass, limiter)
+    assert _held(hass, first, second) == [True, True]
+
+
+def test_removing_the_limits_releases_every_heater(hass, limiter, clock):
+    first, second = _entry("A1"), _entry("B2")
+    limiter.async_add_entry(first)
+    limiter.async_add_entry(second)
+    asyncio.run(limiter.async_configure(0, None, DEFAULT_SETBACK_TEMPERATURE))
+    _evaluate(hass, limiter)
+    assert _held(hass, first, second) == [True, True]
+
+    asyncio.run(limiter.async_configure(None, None, DEFAULT_SETBACK_TEMPERATURE))
+    _evaluate(hass, limiter)
+
+    assert _held(hass, first, second) == [False, False]
@@ -0,0 +1,124 @@
+"""Tests for hot water draw detection."""
+
+from datetime import UTC, date, datetime, timedelta
+from unittest.mock import MagicMock, Mock
+
+import pytest
+
+from custom_components.t_smart import draw as draw_module
+from custom_components.t_smart.const import (
+    DEFAULT_INLET_TEMPERATURE,
+    DEFAULT_TANK_VOLUME,
+    WATER_HEAT_CAPACITY,
+)
+from custom_components.t_smart.draw import (
+    EVENT_DRAW,
+    HotWaterUsage,
+    TSmartDrawDetector,
+)
+
+START = datetime(2025, 1, 1, 7, tzinfo=UTC)
+
+
+def test_usage_rolls_over_on_a_new_day():
+    usage = HotWaterUsage(day=date(2025, 1, 1), draws=2, volume=30, energy=1.5)
+
+    usage.rollover(date(2025, 1, 1))
+    assert usage.draws == 2
+
+    usage.rollover(date(2025, 1, 2))
+    assert (usage.day, usage.draws, usage.volume, usage.energy) == (
+        date(2025, 1, 2),
+        0,
+        0,
+        0,
+    )
+
+
+def test_usage_round_trip():
+    usage = HotWaterUsage(
+        day=date(2025, 1, 1), draws=2, volume=30.04, energy=1.5, last_draw=START
+    )
+
+    restored = HotWaterUsage.from_dict(usage.as_dict())
+
+    assert restored.as_dict() == usage.as_dict()
+    assert restored.last_draw == START
+    assert restored.volume == 30.0
+
+
+@pytest.fixture
+def detector():
+    detector = TSmartDrawDetector(MagicMock())
+    detector._async_save = Mock()
+    return detector
+
+
+@pytest.fixture
+def entry():
+    entry = MagicMock()
+    entry.data = {}
+    entry.runtime_data.device.device_id = "A1B2"
+    entry.runtime_data.coordinator.last_update_success = True
+    entry.runtime_data.coordinator.restored = False
+    return entry
+
+
+def _feed(monkeypatch, detector, entry, statuses):
+    """Pass statuses of (seconds from START, low, high) to the detector."""
+    for seconds, low, high in statuses:
+        now = START + timedelta(seconds=seconds)
+        monkeypatch.setattr(draw_module.dt_util, "utcnow", lambda now=now: now)
+        entry.runtime_data.coordinator.data.temperature_low = low
+        entry.runtime_data.coordinator.data.temperature_high = high
+        detector._async_update(entry)
+
+
+def test_detects_a_draw(monkeypatch, detector, entry):
+    detector.usage["A1B2"] = HotWaterUsage(day=START.date())
+
+    _feed(
+        monkeypatch,
+        detector,
+        entry,
+        [(0, 50, 60), (10, 48.5, 60), (20, 47, 59.9), (30, 47.1, 60), (40, 47, 60)],
+    )
+    assert detector.usage["A1B2"].draw is not None
+    assert detector.usage["A1B2"].draws == 0
+
+    # Ends once the bottom sensor hasn't fallen for a while
+    _feed(monkeypatch, detector, entry, [(50, 47, 60)])
+
+    usage = detector.usage["A1B2"]
+    drop = (50 - 47) / 2
+    assert usage.draw is None
+    assert usage.draws == 1
+    assert usage.last_draw == START
+    assert usage.volume == pytest.approx(
+        DEFAULT_TANK_VOLUME * drop / (60 - DEFAULT_INLET_TEMPERATURE)
+    )
+    assert usage.energy == pytest.approx(
+        DEFAULT_TANK_VOLUME * drop * WATER_HEAT_CAPACITY / 3600
+    )
+    detector.hass.bus.async_fire.assert_called_once()
+    assert detector.hass.bus.async_fire.call_args.args[0] == EVENT_DRAW
+
+
+def test_ignores_drops_across_gaps_and_heating(monkeypatch, detector, entry):
+    detector.usage["A1B2"] = HotWaterUsage(day=START.date())
+
+    _feed(
+        monkeypatch,
+        detector,
+        entry,
+        [
+            (0, 50, 60),
+            # Too long since the previous status
+            (120, 48, 60),
+            # The top sensor moving too, not a draw
+            (130, 46, 58),
+        ],
+    )
+
+    assert detector.usage["A1B2"].draw is None
+    assert detector.usage["A1B2"].draws == 0
@@ -0,0 +1,77 @@
+"""Tests for the temperature estimate between polls."""
+
+import pytest
+
+from custom_components.t_smart.estimator import (
+    ESTIMATOR_INITIAL_DRIFT,
+    ESTIMATOR_READING_VARIANCE,
+    TSmartEstimator,
+)
+from custom_components.t_smart.predictor import TSmartPredictor
+
+
+def _predictor(heating_rate=None, cooling_rate=None) -> TSmartPredictor:
+    predictor = TSmartPredictor()
+    predictor.heating_rate = heating_rate
+    predictor.cooling_rate = cooling_rate
+    return predictor
+
+
+def test_no_estimate_without_a_sample():
+    estimator = TSmartEstimator(_predictor())
+
+    assert estimator.estimate(0) is None
+
+
+def test_carries_the_temperature_forward():
+    estimator = TSmartEstimator(_predictor(heating_rate=0.01, cooling_rate=-0.001))
+
+    estimator.add_sample(0, 50, relay=True, setpoint=60)
+    assert estimator.estimate(100)[0] == pytest.approx(51)
+    # Heating stops at the setpoint
+    assert estimator.estimate(5000)[0] == pytest.approx(60)
+
+    estimator.add_sample(100, 51, relay=False, setpoint=60)
+    assert estimator.estimate(1100)[0] == pytest.approx(50)
+
+
+def test_bound_grows_with_time():
+    estimator = TSmartEstimator(_predictor())
+    estimator.add_sample(0, 50, relay=False, setpoint=60)
+
+    temperature, bound = estimator.estimate(0)
+    assert temperature == 50
+    assert bound == pytest.approx(2 * ESTIMATOR_READING_VARIANCE**0.5)
+
+    _, later = estimator.estimate(100)
+    assert later == pytest.approx(
+        2 * (ESTIMATOR_READING_VARIANCE + ESTIMATOR_INITIAL_DRIFT * 100) ** 0.5
+    )
+
+
+def test_drift_fits_the_errors():
+    estimator = TSmartEstimator(_predictor(cooling_rate=-0.001))
+
+    # Samples exactly on the fit shrink the drift
+    for step in range(50):
+        estimator.add_sample(step * 10, 50 - step * 0.01, relay=False, setpoint=60)
+    accurate = estimator.drift
+    assert accurate < ESTIMATOR_INITIAL_DRIFT / 10
+
+    # A heater behaving unlike its fit grows it
+    for step in range(50, 60):
+        estimator.add_sample(step * 10, 50 + step * 0.1, relay=False, setpoint=60)
+    assert estimator.drift > accurate * 10
+
+
+def test_restart_keeps_the_drift():
+    estimator = TSmartEstimator(_predictor())
+    estimator.add_sample(0, 50, relay=False, setpoint=60)
+    estimator.add_sample(10, 51, relay=False, setpoint=60)
+    drift = estimator.drift
+
+    estimator.restart()
+
+    assert estimator.estimate(20) is None
+    estimator.add_sample(20, 40, relay=False, setpoint=60)
+    assert estimator.drift == drift
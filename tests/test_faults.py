@@ -0,0 +1,49 @@
+"""Tests for error and warning transitions."""
+
+from dataclasses import replace
+
+from custom_components.t_smart.faults import (
+    FAULT_CLEARED,
+    FAULT_COUNTED,
+    FAULT_RAISED,
+    FaultTransition,
+    fault_transitions,
+)
+from custom_components.t_smart.tsmart.protocol import (
+    STATUS_RESPONSE,
+    decode_status,
+    encode,
+)
+
+STATUS = decode_status(
+    encode(STATUS_RESPONSE.pack(0xF1, 0, 0, 1, 600, 0, 552, 1, 0, 401, bytes(16), 0))
+)
+
+
+def test_no_transitions_for_the_same_status():
+    assert fault_transitions(STATUS, STATUS) == []
+
+
+def test_raised_and_cleared():
+    raised = replace(STATUS, e01=True, e01_count=1, w02=True, w02_count=4)
+
+    assert fault_transitions(STATUS, raised) == [
+        FaultTransition("e01", FAULT_RAISED, 1, 1, "MANUAL"),
+        FaultTransition("w02", FAULT_RAISED, 4, 4, "MANUAL"),
+    ]
+    assert fault_transitions(raised, replace(raised, e01=False)) == [
+        FaultTransition("e01", FAULT_CLEARED, 1, 0, "MANUAL"),
+    ]
+
+
+def test_counted_when_raised_again_between_polls():
+    before = replace(STATUS, e03_count=2)
+    after = replace(STATUS, e03_count=4)
+
+    assert fault_transitions(before, after) == [
+        FaultTransition("e03", FAULT_COUNTED, 4, 2, "MANUAL"),
+    ]
+
+
+def test_counter_reset_is_not_a_transition():
+    assert fault_transitions(replace(STATUS, w01_count=5), STATUS) == []
@@ -0,0 +1,110 @@
+"""Tests for heaters held by the fleet features."""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, Mock
+
+import pytest
+
+from custom_components.t_smart import holds as holds_module
+from custom_components.t_smart.const import HOLD_CONFIRM_DELAY
+from custom_components.t_smart.holds import (
+    OWNER_DEMAND,
+    OWNER_DIVERSION,
+    Hold,
+    TSmartHolds,
+)
+from custom_components.t_smart.tsmart import TSmartMode
+
+DEVICE_ID = "A1B2"
+
+
+def _hold(setpoint: float) -> dict:
+    """Return the settings of a manual hold at a setpoint."""
+    return {"power": True, "mode": TSmartMode.MANUAL, "setpoint": setpoint}
+
+
+@pytest.fixture
+def holds():
+    holds = TSmartHolds(MagicMock())
+    holds._async_save = Mock()
+    holds._async_refresh = AsyncMock()
+    return holds
+
+
+@pytest.fixture
+def entry():
+    entry = MagicMock()
+    entry.runtime_data.device.device_id = DEVICE_ID
+    entry.runtime_data.device.async_control_set = AsyncMock(return_value=True)
+    data = entry.runtime_data.coordinator.data
+    data.power = True
+    data.mode = TSmartMode.LIMITED
+    data.setpoint = 55
+    entry.runtime_data.coordinator.last_update_success = True
+    entry.runtime_data.coordinator.restored = False
+    return entry
+
+
+def test_hold_and_release(holds, entry):
+    control_set = entry.runtime_data.device.async_control_set
+
+    assert asyncio.run(holds.async_hold(entry, OWNER_DIVERSION, **_hold(70)))
+    control_set.assert_awaited_with(True, TSmartMode.MANUAL, 70)
+    assert holds.owner(DEVICE_ID) == OWNER_DIVERSION
+
+    # Only the owner releases it, back to a mode that can be set
+    assert not asyncio.run(holds.async_release(entry, OWNER_DEMAND))
+    assert asyncio.run(holds.async_release(entry, OWNER_DIVERSION))
+    control_set.assert_awaited_with(True, TSmartMode.MANUAL, 55)
+    assert holds.owner(DEVICE_ID) is None
+
+
+def test_earlier_owner_takes_over(holds, entry):
+    asyncio.run(holds.async_hold(entry, OWNER_DIVERSION, **_hold(70)))
+    entry.runtime_data.coordinator.data.setpoint = 70
+
+    assert asyncio.run(holds.async_hold(entry, OWNER_DEMAND, **_hold(10)))
+    assert holds.owner(DEVICE_ID) == OWNER_DEMAND
+    # Still goes back to how it was before diversion
+    assert holds.holds[DEVICE_ID].restore == (True, TSmartMode.LIMITED, 55)
+
+    assert not holds.can_hold(DEVICE_ID, OWNER_DIVERSION)
+    assert not asyncio.run(holds.async_hold(entry, OWNER_DIVERSION, **_hold(70)))
+    assert holds.owner(DEVICE_ID) == OWNER_DEMAND
+
+
+def test_unacknowledged_hold_is_not_kept(holds, entry):
+    entry.runtime_data.device.async_control_set.return_value = False
+
+    assert not asyncio.run(holds.async_hold(entry, OWNER_DEMAND, **_hold(10)))
+    assert holds.owner(DEVICE_ID) is None
+
+
+def test_setpoint_changed_by_someone_else(monkeypatch, holds, entry):
+    monkeypatch.setattr(holds_module.time, "monotonic", lambda: 1000.0)
+    asyncio.run(holds.async_hold(entry, OWNER_DEMAND, **_hold(10)))
+    holds.holds[DEVICE_ID].since = 1000.0
+
+    # Still the old setpoint, as the command hasn't shown in the status yet
+    holds._async_updated(entry)
+    assert holds.owner(DEVICE_ID) == OWNER_DEMAND
+
+    monkeypatch.setattr(
+        holds_module.time, "monotonic", lambda: 1001.0 + HOLD_CONFIRM_DELAY
+    )
+    entry.runtime_data.coordinator.data.setpoint = 10
+    holds._async_updated(entry)
+    assert holds.owner(DEVICE_ID) == OWNER_DEMAND
+
+    entry.runtime_data.coordinator.data.setpoint = 45
+    holds._async_updated(entry)
+    assert holds.owner(DEVICE_ID) is None
+
+
+def test_hold_round_trip():
+    hold = Hold(OWNER_DEMAND, True, TSmartMode.MANUAL, 10, (False, TSmartMode.ECO, 50))
+
+    restored = Hold.from_dict(hold.as_dict())
+
+    assert restored.as_dict() == hold.as_dict()
+    assert restored.restore == (False, TSmartMode.ECO, 50)
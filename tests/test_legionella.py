@@ -0,0 +1,195 @@
+"""Tests for Legionella compliance tracking."""
+
+import asyncio
+from dataclasses import replace
+from datetime import UTC, datetime, timedelta
+from unittest.mock import AsyncMock, MagicMock, Mock
+
+import pytest
+
+from custom_components.t_smart.const import (
+    CONF_LEGIONELLA_BOOST,
+    CONF_LEGIONELLA_DURATION,
+    CONF_LEGIONELLA_TEMPERATURE,
+    LEGIONELLA_BOOST_RETRY,
+    LEGIONELLA_PERIOD,
+)
+from custom_components.t_smart.holds import DATA_HOLDS, OWNER_LEGIONELLA, TSmartHolds
+from custom_components.t_smart.legionella import LegionellaCycle, TSmartLegionella
+from custom_components.t_smart.tsmart import TSmartMode
+from custom_components.t_smart.tsmart.protocol import (
+    STATUS_RESPONSE,
+    decode_status,
+    encode,
+)
+
+STATUS = decode_status(
+    encode(STATUS_RESPONSE.pack(0xF1, 0, 0, 1, 550, 0, 552, 1, 0, 401, bytes(16), 0))
+)
+
+DEVICE_ID = "A1B2"
+START = datetime(2025, 1, 6, 7, tzinfo=UTC)
+
+
+@pytest.fixture
+def hass():
+    hass = MagicMock()
+    hass.data = {}
+    hass.tasks = []
+    hass.async_create_background_task = lambda coro, name: hass.tasks.append(coro)
+    holds = hass.data[DATA_HOLDS] = TSmartHolds(hass)
+    holds._async_save = Mock()
+    holds._async_refresh = AsyncMock()
+    return hass
+
+
+@pytest.fixture
+def legionella(hass):
+    legionella = TSmartLegionella(hass)
+    legionella._async_save = Mock()
+    return legionella
+
+
+@pytest.fixture
+def entry():
+    entry = MagicMock()
+    entry.data = {
+        CONF_LEGIONELLA_TEMPERATURE: 60,
+        CONF_LEGIONELLA_DURATION: 30,
+        CONF_LEGIONELLA_BOOST: True,
+    }
+    entry.runtime_data.device.device_id = DEVICE_ID
+    entry.runtime_data.device.async_control_set = AsyncMock(return_value=True)
+    coordinator = entry.runtime_data.coordinator
+    coordinator.last_update_success = True
+    coordinator.restored = False
+    coordinator.data = STATUS
+    return entry
+
+
+def _overdue() -> LegionellaCycle:
+    """Return the cycle of a heater never compliant since it was added."""
+    added = START - LEGIONELLA_PERIOD - timedelta(days=1)
+    return LegionellaCycle(added, added)
+
+
+def _track(legionella, entry, cycle: LegionellaCycle) -> None:
+    legionella.cycles[DEVICE_ID] = cycle
+    legionella.async_add_entry(entry)
+
+
+def _feed(hass, entry, statuses) -> None:
+    """Pass statuses of (minutes from START, high temperature) to the tracker."""
+    coordinator = entry.runtime_data.coordinator
+    listener = coordinator.async_add_listener.call_args.args[0]
+    for minutes, temperature in statuses:
+        coordinator.polled_at = START + timedelta(minutes=minutes)
+        coordinator.data = replace(STATUS, temperature_high=temperature)
+        listener()
+        while hass.tasks:
+            asyncio.run(hass.tasks.pop(0))
+
+
+def test_counts_time_above_the_threshold(hass, legionella, entry):
+    _track(legionella, entry, LegionellaCycle(START, START))
+
+    _feed(hass, entry, [(minute, 61) for minute in range(11)])
+
+    cycle = legionella.cycles[DEVICE_ID]
+    assert cycle.time_above == 600
+    assert cycle.run == 600
+    assert cycle.last_compliant is None
+
+
+def test_skipped_polls_are_not_counted_again(hass, legionella, entry):
+    _track(legionella, entry, LegionellaCycle(START, START))
+
+    _feed(hass, entry, [(0, 61), (1, 61), (1, 61), (2, 61)])
+
+    assert legionella.cycles[DEVICE_ID].time_above == 120
+
+
+def test_gaps_and_drops_break_the_spell(hass, legionella, entry):
+    _track(legionella, entry, LegionellaCycle(START, START))
+
+    _feed(hass, entry, [(0, 61), (2, 61), (10, 61)])
+    cycle = legionella.cycles[DEVICE_ID]
+    assert cycle.time_above == 120
+    assert cycle.run == 0
+
+    _feed(hass, entry, [(11, 61), (12, 59), (13, 61)])
+    assert cycle.time_above == 180
+    assert cycle.run == 0
+
+
+def test_compliant_once_a_spell_lasts_the_duration(hass, legionella, entry):
+    _track(legionella, entry, LegionellaCycle(START, START))
+
+    _feed(hass, entry, [(minute, 61) for minute in range(30)])
+    assert legionella.cycles[DEVICE_ID].last_compliant is None
+
+    _feed(hass, entry, [(30, 61), (31, 61)])
+    assert legionella.cycles[DEVICE_ID].last_compliant == START + timedelta(
+        minutes=30
+    )
+
+
+def test_window_rolls_over(hass, legionella, entry):
+    window_start = START - LEGIONELLA_PERIOD * 2 - timedelta(hours=1)
+    cycle = LegionellaCycle(window_start, window_start, time_above=1200)
+    _track(legionella, entry, cycle)
+
+    _feed(hass, entry, [(0, 59)])
+
+    cycle = legionella.cycles[DEVICE_ID]
+    assert cycle.window_start == START - timedelta(hours=1)
+    assert cycle.time_above == 0
+
+
+def test_overdue_heater_is_boosted_until_compliant(hass, legionella, entry):
+    control_set = entry.runtime_data.device.async_control_set
+    holds = hass.data[DATA_HOLDS]
+    _track(legionella, entry, _overdue())
+
+    _feed(hass, entry, [(0, 55)])
+    control_set.assert_awaited_once_with(True, TSmartMode.BOOST, 60)
+    assert holds.owner(DEVICE_ID) == OWNER_LEGIONELLA
+
+    # Held while heating up and through the cycle
+    _feed(hass, entry, [(minute, 61) for minute in range(20, 50)])
+    assert control_set.await_count == 1
+    assert holds.owner(DEVICE_ID) == OWNER_LEGIONELLA
+
+    _feed(hass, entry, [(50, 61)])
+    assert holds.owner(DEVICE_ID) is None
+    control_set.assert_awaited_with(True, TSmartMode.MANUAL, 55)
+
+
+def test_failed_boost_is_retried_later(hass, legionella, entry):
+    control_set = entry.runtime_data.device.async_control_set
+    control_set.return_value = False
+    _track(legionella, entry, _overdue())
+
+    _feed(hass, entry, [(0, 55), (60, 55)])
+    assert control_set.await_count == 1
+    assert hass.data[DATA_HOLDS].owner(DEVICE_ID) is None
+
+    retry = LEGIONELLA_BOOST_RETRY.total_seconds() / 60
+    _feed(hass, entry, [(retry, 55)])
+    assert control_set.await_count == 2
+
+
+def test_boost_left_to_a_feature_that_comes_first(hass, legionella, entry):
+    control_set = entry.runtime_data.device.async_control_set
+    holds = hass.data[DATA_HOLDS]
+    asyncio.run(
+        holds.async_hold(
+            entry, "demand", power=True, mode=TSmartMode.MANUAL, setpoint=10
+        )
+    )
+    _track(legionella, entry, _overdue())
+
+    _feed(hass, entry, [(0, 55)])
+
+    assert control_set.await_count == 1
+    assert holds.owner(DEVICE_ID) == "demand"
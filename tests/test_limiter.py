@@ -0,0 +1,114 @@
+"""Tests for per-device request pacing."""
+
+import asyncio
+
+import pytest
+
+from custom_components.t_smart.tsmart import limiter as limiter_module
+from custom_components.t_smart.tsmart.limiter import (
+    PRIORITY_CONFIRM,
+    PRIORITY_CONTROL,
+    PRIORITY_MAINTENANCE,
+    PRIORITY_POLL,
+    RATE_INCREASE,
+    TSmartLimiter,
+    TSmartShedError,
+)
+
+IP = "192.168.1.20"
+
+
+def test_burst_is_served_at_once():
+    async def _async_test():
+        limiter = TSmartLimiter(rate=1, burst=3)
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        for _ in range(3):
+            await limiter.async_acquire(IP)
+        return loop.time() - start
+
+    assert asyncio.run(_async_test()) < 0.1
+
+
+def test_waiters_are_served_by_priority():
+    async def _async_test():
+        limiter = TSmartLimiter(rate=50, burst=1)
+        await limiter.async_acquire(IP)
+        served = []
+
+        async def _async_request(priority):
+            await limiter.async_acquire(IP, priority)
+            served.append(priority)
+
+        tasks = []
+        for priority in (PRIORITY_MAINTENANCE, PRIORITY_POLL, PRIORITY_CONTROL):
+            tasks.append(asyncio.create_task(_async_request(priority)))
+            await asyncio.sleep(0)
+        await asyncio.gather(*tasks)
+        return served
+
+    assert asyncio.run(_async_test()) == [
+        PRIORITY_CONTROL,
+        PRIORITY_POLL,
+        PRIORITY_MAINTENANCE,
+    ]
+
+
+def test_duplicate_routine_requests_are_shed():
+    async def _async_test():
+        limiter = TSmartLimiter(rate=50, burst=1)
+        await limiter.async_acquire(IP)
+        waiting = asyncio.create_task(limiter.async_acquire(IP, PRIORITY_POLL))
+        await asyncio.sleep(0)
+
+        with pytest.raises(TSmartShedError) as err:
+            await limiter.async_acquire(IP, PRIORITY_POLL)
+        assert err.value.priority == PRIORITY_POLL
+
+        # Confirmations are never shed, and other devices have their own bucket
+        await asyncio.gather(
+            waiting,
+            limiter.async_acquire(IP, PRIORITY_CONFIRM),
+            limiter.async_acquire("192.168.1.21", PRIORITY_POLL),
+        )
+        return limiter.device_as_dict(IP)
+
+    assert asyncio.run(_async_test())["shed"] == 1
+
+
+def test_requests_are_shed_after_waiting_too_long(monkeypatch):
+    monkeypatch.setitem(limiter_module.MAX_WAIT, PRIORITY_MAINTENANCE, 0.01)
+
+    async def _async_test():
+        limiter = TSmartLimiter(rate=1, burst=1)
+        await limiter.async_acquire(IP)
+        with pytest.raises(TSmartShedError):
+            await limiter.async_acquire(IP, PRIORITY_MAINTENANCE)
+        return limiter.device_as_dict(IP)
+
+    state = asyncio.run(_async_test())
+    assert state["shed"] == 1
+    assert state["waiting"]["maintenance"] == 0
+
+
+def test_rate_adapts_to_answers():
+    async def _async_test():
+        limiter = TSmartLimiter(rate=1, burst=3, min_rate=0.2)
+        await limiter.async_acquire(IP)
+
+        limiter.record(IP, answered=False)
+        halved = limiter.device_as_dict(IP)["rate"]
+        for _ in range(5):
+            limiter.record(IP, answered=False)
+        floor = limiter.device_as_dict(IP)["rate"]
+        limiter.record(IP, answered=True)
+        recovering = limiter.device_as_dict(IP)["rate"]
+        for _ in range(100):
+            limiter.record(IP, answered=True)
+        return halved, floor, recovering, limiter.device_as_dict(IP)["rate"]
+
+    halved, floor, recovering, recovered = asyncio.run(_async_test())
+    assert halved == 0.5
+    assert floor == 0.2
+    assert recovering == pytest.approx(0.2 + RATE_INCREASE)
+    assert recovered == 1
@@ -0,0 +1,119 @@
+"""Tests for the Prometheus metrics endpoint."""
+
+import asyncio
+from dataclasses import replace
+from datetime import UTC, datetime
+from http import HTTPStatus
+from unittest.mock import MagicMock, Mock
+
+import pytest
+
+from homeassistant.components.http import KEY_HASS
+
+from custom_components.t_smart import metrics as metrics_module
+from custom_components.t_smart.maintenance import DATA_MAINTENANCE
+from custom_components.t_smart.metrics import (
+    DATA_METRICS,
+    TSmartMetrics,
+    TSmartMetricsView,
+)
+from custom_components.t_smart.tsmart import TSmartStats
+from custom_components.t_smart.tsmart.protocol import (
+    STATUS_RESPONSE,
+    decode_status,
+    encode,
+)
+
+# E02 active having occurred 3 times
+STATUS = decode_status(
+    encode(
+        STATUS_RESPONSE.pack(
+            0xF1, 0, 0, 1, 600, 0, 552, 1, 0, 401, bytes((0, 0, 3, 0x80)) + bytes(12), 0
+        )
+    )
+)
+
+NOW = datetime(2025, 1, 1, tzinfo=UTC)
+
+
+@pytest.fixture
+def metrics(monkeypatch):
+    monkeypatch.setattr(metrics_module, "async_track_time_interval", Mock())
+    hass = MagicMock()
+    hass.data = {DATA_MAINTENANCE: Mock(timesync={})}
+    metrics = hass.data[DATA_METRICS] = TSmartMetrics(hass)
+    return metrics
+
+
+def _entry(entry_id: str, name: str) -> MagicMock:
+    entry = MagicMock()
+    entry.entry_id = entry_id
+    entry.runtime_data.device.device_id = entry_id.upper()
+    entry.runtime_data.device.name = name
+    entry.runtime_data.device.stats = TSmartStats(requests=12, timeouts=1)
+    entry.runtime_data.coordinator.last_update_success = True
+    entry.runtime_data.coordinator.data = STATUS
+    return entry
+
+
+def _updated(entry: MagicMock) -> None:
+    """Call the listener the metrics added to the entry's coordinator."""
+    entry.runtime_data.coordinator.async_add_listener.call_args.args[0]()
+
+
+def test_renders_each_family_once(metrics):
+    metrics.async_add_entry(_entry("a1", "Loft"))
+    metrics.async_add_entry(_entry("b2", 'Garage "2"'))
+
+    page = metrics.page.decode()
+
+    assert page.count("# TYPE tsmart_up gauge") == 1
+    assert 'tsmart_up{device_id="A1",name="Loft"} 1' in page
+    assert 'tsmart_up{device_id="B2",name="Garage \\"2\\""} 1' in page
+    assert (
+        'tsmart_temperature_celsius{device_id="A1",name="Loft",sensor="high"} 55.2'
+        in page
+    )
+    assert 'tsmart_error_active{device_id="A1",name="Loft",code="e02"} 1' in page
+    assert 'tsmart_errors_total{device_id="A1",name="Loft",code="e02"} 3' in page
+    assert 'tsmart_requests_total{device_id="A1",name="Loft"} 12' in page
+    # Nothing recorded yet, so the family is left out
+    assert "tsmart_round_trip_seconds" not in page
+    metrics.hass.http.register_view.assert_called_once()
+
+
+def test_updates_are_rendered_once_per_interval(metrics):
+    entry = _entry("a1", "Loft")
+    metrics.async_add_entry(entry)
+    page = metrics.page
+
+    entry.runtime_data.coordinator.data = replace(STATUS, setpoint=65)
+    _updated(entry)
+    _updated(entry)
+    assert metrics.page is page
+
+    metrics._async_flush(NOW)
+    assert 'tsmart_setpoint_celsius{device_id="A1",name="Loft"} 65' in (
+        metrics.page.decode()
+    )
+
+    # Nothing changed since, so the page is kept
+    page = metrics.page
+    metrics._async_flush(NOW)
+    assert metrics.page is page
+
+
+def test_not_found_without_devices(metrics):
+    view = TSmartMetricsView()
+    request = Mock(app={KEY_HASS: metrics.hass})
+
+    assert asyncio.run(view.get(request)).status == HTTPStatus.NOT_FOUND
+
+    remove = metrics.async_add_entry(_entry("a1", "Loft"))
+    response = asyncio.run(view.get(request))
+    assert response.status == HTTPStatus.OK
+    assert response.body == metrics.page
+
+    remove()
+    assert metrics.page == b""
+    assert asyncio.run(view.get(request)).status == HTTPStatus.NOT_FOUND
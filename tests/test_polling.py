@@ -0,0 +1,29 @@
+"""Tests for phase-spread polling."""
+
+import statistics
+
+import pytest
+
+from custom_components.t_smart.polling import phase_offset
+
+
+def test_offset_is_stable_and_within_the_interval():
+    offset = phase_offset("A1B2", 10)
+
+    assert 0 <= offset < 10
+    assert phase_offset("A1B2", 10) == offset
+
+
+def test_offset_scales_with_the_interval():
+    assert phase_offset("A1B2", 120) == pytest.approx(phase_offset("A1B2", 10) * 12)
+
+
+def test_offsets_spread_over_the_interval():
+    offsets = [phase_offset(f"{device:04X}", 10) for device in range(1000)]
+
+    # Every tenth of the interval gets a share of the fleet
+    buckets = [0] * 10
+    for offset in offsets:
+        buckets[int(offset)] += 1
+    assert min(buckets) > 50
+    assert 4 < statistics.mean(offsets) < 6
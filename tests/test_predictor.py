@@ -0,0 +1,69 @@
+"""Tests for the temperature trend predictor."""
+
+import pytest
+
+from custom_components.t_smart.predictor import PREDICTOR_MIN_SAMPLES, TSmartPredictor
+
+
+def _feed(predictor, relay, start, rate, count, origin=0.0, interval=10.0):
+    """Add samples on a straight line."""
+    for index in range(count):
+        elapsed = index * interval
+        predictor.add_sample(origin + elapsed, start + rate * elapsed, relay=relay)
+
+
+def test_no_rates_until_enough_samples():
+    predictor = TSmartPredictor()
+    _feed(predictor, True, 40, 0.01, PREDICTOR_MIN_SAMPLES - 1)
+
+    assert predictor.heating_rate is None
+    assert predictor.time_to_setpoint(40, 60) is None
+
+
+def test_fits_heating_rate():
+    predictor = TSmartPredictor()
+    _feed(predictor, True, 40, 0.01, 10)
+
+    assert predictor.heating_rate == pytest.approx(0.01)
+    assert predictor.time_to_setpoint(50, 60) == pytest.approx(1000)
+    assert predictor.time_to_setpoint(60, 60) == 0
+    assert predictor.time_to_cool(50, 40) is None
+
+
+def test_fits_cooling_rate():
+    predictor = TSmartPredictor()
+    _feed(predictor, False, 60, -0.002, 10)
+
+    assert predictor.cooling_rate == pytest.approx(-0.002)
+    assert predictor.time_to_cool(50, 40) == pytest.approx(5000)
+    assert predictor.time_to_cool(40, 40) == 0
+    assert predictor.time_to_setpoint(50, 60) is None
+
+
+def test_keeps_rates_across_phases():
+    predictor = TSmartPredictor()
+    _feed(predictor, True, 40, 0.01, 10)
+    _feed(predictor, False, 50, -0.002, 10, origin=100)
+
+    assert predictor.heating_rate == pytest.approx(0.01)
+    assert predictor.cooling_rate == pytest.approx(-0.002)
+
+    # Just switched on, predicted from the previous heating cycle
+    predictor.add_sample(300, 45, relay=True)
+    assert predictor.time_to_setpoint(45, 55) == pytest.approx(1000)
+
+
+def test_window_follows_the_latest_samples():
+    predictor = TSmartPredictor(window=5)
+    _feed(predictor, True, 40, 0.01, 10)
+    _feed(predictor, True, 41, 0.02, 5, origin=100)
+
+    assert predictor.heating_rate == pytest.approx(0.02)
+
+
+def test_ignores_slopes_against_the_relay():
+    predictor = TSmartPredictor()
+    _feed(predictor, True, 40, -0.01, 10)
+
+    assert predictor.heating_rate is None
+    assert predictor.cooling_rate is None
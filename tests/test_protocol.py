@@ -0,0 +1,146 @@
+"""Tests for the sans-IO T-Smart protocol."""
+
+import pytest
+
+from custom_components.t_smart.tsmart.models import TSmartMode
+from custom_components.t_smart.tsmart.protocol import (
+    ACK_RESPONSE,
+    STATUS_RESPONSE,
+    UDP_PORT,
+    TSmartProtocol,
+    checksum,
+    control_request,
+    decode_status,
+    encode,
+    restart_request,
+    status_request,
+    timesync_request,
+)
+
+IP = "192.168.1.20"
+
+
+def _status(setpoint: float = 60, error_buffer: bytes = bytes(16)) -> bytes:
+    """Return a status response."""
+    return encode(
+        STATUS_RESPONSE.pack(
+            0xF1, 0, 0, 1, int(setpoint * 10), 0, 552, 1, 0, 401, error_buffer, 0
+        )
+    )
+
+
+def test_encode_fills_in_the_checksum():
+    frame = encode(b"\xf1\x00\x00\x00")
+
+    assert frame[:-1] == b"\xf1\x00\x00"
+    assert frame[-1] == checksum(frame) == 0xF1 ^ 0x55
+
+
+def test_requests_are_validated():
+    with pytest.raises(ValueError):
+        control_request(True, 6, 60)
+    with pytest.raises(ValueError):
+        restart_request(50)
+
+    frame = restart_request(1000)
+    assert frame[1] | frame[2] << 8 == 1000
+
+
+def test_timesync_keeps_the_32_bit_field():
+    frame = timesync_request(1_760_000_000)
+
+    assert len(frame) == 8
+    assert int.from_bytes(frame[3:7], "little") == 1_760_000_000
+
+
+def test_decodes_status():
+    # E02 active having occurred 3 times, W01 inactive having occurred once
+    error_buffer = bytes((0, 0, 3, 0x80, 0, 0, 0, 0, 1, 0)) + bytes(6)
+    status = decode_status(_status(setpoint=65.5, error_buffer=error_buffer))
+
+    assert status.power
+    assert status.relay
+    assert status.mode == TSmartMode.MANUAL
+    assert status.setpoint == 65.5
+    assert status.temperature_high == 55.2
+    assert status.temperature_low == 40.1
+    assert status.temperature_average == pytest.approx(47.65)
+    assert status.e02
+    assert status.e02_count == 3
+    assert not status.w01
+    assert status.w01_count == 1
+    assert not status.e01
+
+
+def test_response_completes_the_exchange():
+    protocol = TSmartProtocol()
+    exchange = protocol.request(IP, status_request(), STATUS_RESPONSE, now=0)
+
+    assert protocol.datagrams_to_send() == [(status_request(), (IP, UDP_PORT))]
+    assert protocol.next_deadline() == 2
+
+    assert protocol.datagram_received(_status(), (IP, UDP_PORT), now=0.1)
+    assert protocol.completed_exchanges() == [exchange]
+    assert exchange.response == _status()
+    assert protocol.next_deadline() is None
+
+
+def test_timeouts_resend_until_tries_run_out():
+    protocol = TSmartProtocol()
+    exchange = protocol.request(
+        IP, status_request(), STATUS_RESPONSE, now=0, tries=2, timeout=1
+    )
+    protocol.datagrams_to_send()
+
+    protocol.handle_timeout(now=0.5)
+    assert protocol.datagrams_to_send() == []
+
+    protocol.handle_timeout(now=1)
+    assert protocol.datagrams_to_send() == [(status_request(), (IP, UDP_PORT))]
+    assert protocol.completed_exchanges() == []
+    assert protocol.next_deadline() == 2
+
+    protocol.handle_timeout(now=2)
+    assert protocol.datagrams_to_send() == []
+    assert protocol.completed_exchanges() == [exchange]
+    assert exchange.response is None
+
+
+def test_invalid_response_is_retried():
+    protocol = TSmartProtocol()
+    exchange = protocol.request(IP, status_request(), STATUS_RESPONSE, now=0)
+    protocol.datagrams_to_send()
+
+    # An error response doesn't echo the command
+    assert protocol.datagram_received(bytes(4), (IP, UDP_PORT), now=0.1)
+    assert len(protocol.datagrams_to_send()) == 1
+    assert protocol.completed_exchanges() == []
+
+    assert protocol.datagram_received(_status()[:-1], (IP, UDP_PORT), now=0.2)
+    assert protocol.completed_exchanges() == [exchange]
+    assert exchange.response is None
+
+
+def test_responses_match_by_address_and_command():
+    protocol = TSmartProtocol()
+    first = protocol.request(IP, status_request(), STATUS_RESPONSE, now=0)
+    second = protocol.request(IP, status_request(), STATUS_RESPONSE, now=0)
+    control = protocol.request(IP, control_request(True, 1, 60), ACK_RESPONSE, now=0)
+
+    assert not protocol.datagram_received(_status(), ("192.168.1.21", UDP_PORT), 0)
+
+    protocol.datagram_received(encode(b"\xf2\x00\x00\x00"), (IP, UDP_PORT), now=0)
+    protocol.datagram_received(_status(), (IP, UDP_PORT), now=0)
+    assert protocol.completed_exchanges() == [control, first]
+    assert not second.done
+
+
+def test_cancelled_exchange_never_completes():
+    protocol = TSmartProtocol()
+    exchange = protocol.request(IP, status_request(), STATUS_RESPONSE, now=0)
+    protocol.cancel(exchange)
+
+    assert not protocol.datagram_received(_status(), (IP, UDP_PORT), now=0.1)
+    protocol.handle_timeout(now=10)
+    assert protocol.completed_exchanges() == []
+    assert protocol.next_deadline() is None
@@ -0,0 +1,182 @@
+"""Tests for recording traffic and replaying it."""
+
+import asyncio
+from unittest.mock import MagicMock
+
+import pytest
+
+from custom_components.t_smart.const import TEMPERATURE_MODE_HIGH
+from custom_components.t_smart.coordinator import AFTER_SET_SLEEP, TSmartCoordinator
+from custom_components.t_smart.replay import async_replay_polls
+from custom_components.t_smart.tsmart.capture import (
+    LOCAL_ADDRESS,
+    CapturedFrame,
+    TSmartRecorder,
+    read_capture,
+)
+from custom_components.t_smart.tsmart.client import TSmart
+from custom_components.t_smart.tsmart.protocol import (
+    ACK_RESPONSE,
+    STATUS_RESPONSE,
+    UDP_PORT,
+    control_request,
+    encode,
+    status_request,
+)
+from custom_components.t_smart.tsmart.replay import (
+    TSmartReplayTransport,
+    async_replay,
+)
+
+DEVICE = ("192.168.1.20", UDP_PORT)
+
+STATUS = encode(
+    STATUS_RESPONSE.pack(0xF1, 0, 0, 1, 600, 0, 552, 1, 0, 401, bytes(16), 0)
+)
+
+
+def _status(setpoint: int, temperature: int) -> bytes:
+    """Return a status of a heater heating, temperatures in tenths of °C."""
+    return encode(
+        STATUS_RESPONSE.pack(
+            0xF1, 0, 0, 1, setpoint, 0, temperature, 1, 0, temperature, bytes(16), 0
+        )
+    )
+
+
+def _recording() -> list[CapturedFrame]:
+    """Return a poll answered in 50ms, then a command left unanswered."""
+    return [
+        CapturedFrame(100.0, LOCAL_ADDRESS, DEVICE, status_request()),
+        CapturedFrame(100.05, DEVICE, LOCAL_ADDRESS, STATUS),
+        CapturedFrame(110.0, LOCAL_ADDRESS, DEVICE, control_request(True, 1, 60)),
+    ]
+
+
+def test_capture_round_trip(tmp_path):
+    recorder = TSmartRecorder()
+    recorder.frames.extend(_recording())
+    path = str(tmp_path / "capture.pcap")
+    recorder.dump(path)
+
+    frames = read_capture(path)
+
+    assert [(f.source, f.destination, f.data) for f in frames] == [
+        (f.source, f.destination, f.data) for f in _recording()
+    ]
+    assert frames[1].timestamp - frames[0].timestamp == pytest.approx(0.05, abs=1e-5)
+    assert frames[2].timestamp - frames[0].timestamp == pytest.approx(10, abs=1e-5)
+
+
+def test_replay_reproduces_latencies():
+    summary = asyncio.run(async_replay(_recording()))
+
+    assert summary["requests"] == 2
+    assert summary["answered"] == 1
+    assert summary["timeouts"] == 1
+    assert summary["latency_p50_ms"] == pytest.approx(50, abs=0.1)
+    # The unanswered command times out 2 seconds after it was sent
+    assert summary["virtual_duration_s"] == pytest.approx(12)
+
+
+def test_replay_transport_answers_the_client():
+    async def _async_poll():
+        transport = TSmartReplayTransport(_recording())
+        transport.recorder = TSmartRecorder()
+        device = TSmart(DEVICE[0], transport=transport)
+        status = await device.async_get_status()
+        return status, transport
+
+    status, transport = asyncio.run(_async_poll())
+
+    assert status is not None
+    assert status.setpoint == 60
+    assert status.temperature_high == 55.2
+    assert [frame.data for frame in transport.recorder.frames] == [
+        status_request(),
+        STATUS,
+    ]
+    assert transport.results[0].latency == pytest.approx(0.05)
+
+
+def _heating_recording() -> list[CapturedFrame]:
+    """Return polls a minute apart of a heater warming 0.5°C a minute.
+
+    The third poll is only answered to its retry.
+    """
+    frames = []
+    for minute, temperature in enumerate(range(500, 530, 5)):
+        sent = 100.0 + minute * 60
+        frames.append(CapturedFrame(sent, LOCAL_ADDRESS, DEVICE, status_request()))
+        if minute == 2:
+            sent += 2
+            frames.append(CapturedFrame(sent, LOCAL_ADDRESS, DEVICE, status_request()))
+        frames.append(
+            CapturedFrame(sent + 0.05, DEVICE, LOCAL_ADDRESS, _status(600, temperature))
+        )
+    return frames
+
+
+def _coordinator(transport: TSmartReplayTransport) -> TSmartCoordinator:
+    hass = MagicMock()
+    hass.loop = asyncio.get_running_loop()
+    hass.async_run_hass_job = lambda job, background=False: job.target()
+    return TSmartCoordinator(
+        hass,
+        None,
+        TSmart(DEVICE[0], transport=transport),
+        TEMPERATURE_MODE_HIGH,
+        40,
+    )
+
+
+def test_replay_drives_the_coordinator():
+    async def _async_test():
+        frames = _heating_recording()
+        coordinator = _coordinator(TSmartReplayTransport(frames))
+        statuses = await async_replay_polls(coordinator, frames)
+        return statuses, coordinator
+
+    statuses, coordinator = asyncio.run(_async_test())
+
+    # The retry is part of the third poll, not a poll of its own
+    assert [status.temperature_high for status in statuses] == [
+        50.0,
+        50.5,
+        51.0,
+        51.5,
+        52.0,
+        52.5,
+    ]
+    assert coordinator.polled_at is not None
+    # The trend is fitted on the recording's clock, not the time taken to replay
+    assert coordinator.predictor.heating_rate == pytest.approx(0.5 / 60, rel=0.05)
+
+
+def test_replay_confirms_commands_on_the_virtual_clock():
+    # A command changing the setpoint, and the status confirming it
+    frames = [
+        *_heating_recording(),
+        CapturedFrame(500.0, LOCAL_ADDRESS, DEVICE, control_request(True, 0, 65)),
+        CapturedFrame(
+            500.05, DEVICE, LOCAL_ADDRESS, encode(ACK_RESPONSE.pack(0xF2, 0, 0, 0))
+        ),
+        CapturedFrame(502.05, LOCAL_ADDRESS, DEVICE, status_request()),
+        CapturedFrame(502.1, DEVICE, LOCAL_ADDRESS, _status(650, 530)),
+    ]
+
+    async def _async_test():
+        transport = TSmartReplayTransport(frames)
+        coordinator = _coordinator(transport)
+        await async_replay_polls(coordinator, frames[:-4])
+        await transport.async_sleep(500.0 - transport.now)
+
+        assert await coordinator.device.async_control_set(True, 0, 65)
+        sent = transport.now
+        await coordinator.async_confirm()
+        return coordinator, transport.now - sent
+
+    coordinator, waited = asyncio.run(_async_test())
+
+    assert coordinator.data.setpoint == 65
+    assert waited == pytest.approx(AFTER_SET_SLEEP + 0.05)
@@ -0,0 +1,109 @@
+"""Tests for tariff aware preheat planning."""
+
+from datetime import UTC, datetime, timedelta
+
+import pytest
+
+from homeassistant.core import State
+
+from custom_components.t_smart.scheduler import TariffSlot, parse_tariff, plan_preheat
+
+MIDNIGHT = datetime(2025, 1, 1, tzinfo=UTC)
+
+
+def _hours(hours: float) -> datetime:
+    return MIDNIGHT + timedelta(hours=hours)
+
+
+def _slots(*prices: float) -> list[TariffSlot]:
+    """Return hourly slots from midnight."""
+    return [
+        TariffSlot(_hours(hour), _hours(hour + 1), price)
+        for hour, price in enumerate(prices)
+    ]
+
+
+def _item(start: datetime, end: datetime, value: float) -> dict:
+    """Return a rate as published by Nord Pool."""
+    return {"start": start.isoformat(), "end": end.isoformat(), "value": value}
+
+
+def test_starts_in_the_cheapest_window():
+    slots = _slots(30, 10, 10, 30, 30, 30, 30)
+
+    start, cost = plan_preheat(slots, _hours(0), _hours(7), timedelta(hours=2))
+
+    assert start == _hours(1)
+    assert cost == pytest.approx(2 * 3600 * 10)
+
+
+def test_window_can_end_on_a_boundary():
+    slots = _slots(30, 30, 10, 30, 30, 30, 30)
+
+    start, cost = plan_preheat(slots, _hours(0), _hours(7), timedelta(minutes=30))
+
+    assert start == _hours(2.5)
+    assert cost == pytest.approx(1800 * 10)
+
+
+def test_ties_prefer_the_later_start():
+    slots = _slots(10, 10, 10, 10)
+
+    start, _ = plan_preheat(slots, _hours(0), _hours(4), timedelta(hours=1))
+
+    assert start == _hours(3)
+
+
+def test_starts_now_when_out_of_time():
+    slots = _slots(10, 10)
+
+    start, _ = plan_preheat(slots, _hours(1.5), _hours(2), timedelta(hours=1))
+
+    assert start == _hours(1.5)
+
+
+def test_uncovered_time_costs_the_highest_price():
+    slots = [TariffSlot(_hours(0), _hours(1), 20), TariffSlot(_hours(3), _hours(4), 5)]
+
+    start, cost = plan_preheat(slots, _hours(0), _hours(4), timedelta(hours=2))
+
+    # The gap between the slots is charged at 20, so the cheapest window
+    # straddles the end of it and the cheap slot
+    assert start == _hours(2)
+    assert cost == pytest.approx(3600 * 20 + 3600 * 5)
+
+
+def test_without_prices_starts_as_late_as_possible():
+    start, cost = plan_preheat([], _hours(0), _hours(7), timedelta(hours=2))
+
+    assert start == _hours(5)
+    assert cost == 0
+
+
+def test_parses_tariff_attributes():
+    state = State(
+        "sensor.tariff",
+        "0.2",
+        {
+            "raw_today": [
+                _item(_hours(1), _hours(2), 2),
+                _item(_hours(0), _hours(1), 1),
+                # Empty and unparseable slots are skipped
+                _item(_hours(2), _hours(2), 3),
+                {"start": "soon", "end": _hours(3).isoformat(), "value": 3},
+            ],
+            "rates": [
+                {
+                    "valid_from": _hours(3).isoformat(),
+                    "valid_to": _hours(4).isoformat(),
+                    "value_inc_vat": "4",
+                },
+            ],
+        },
+    )
+
+    assert parse_tariff(state) == [
+        TariffSlot(_hours(0), _hours(1), 1),
+        TariffSlot(_hours(1), _hours(2), 2),
+        TariffSlot(_hours(3), _hours(4), 4),
+    ]
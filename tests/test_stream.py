@@ -0,0 +1,118 @@
+"""Tests for the status delta stream."""
+
+from dataclasses import replace
+from unittest.mock import MagicMock, Mock
+
+import pytest
+
+from custom_components.t_smart import stream as stream_module
+from custom_components.t_smart.stream import TSmartStatusStream
+from custom_components.t_smart.tsmart.protocol import (
+    STATUS_RESPONSE,
+    decode_status,
+    encode,
+)
+
+STATUS = decode_status(
+    encode(STATUS_RESPONSE.pack(0xF1, 0, 0, 1, 550, 0, 552, 1, 0, 401, bytes(16), 0))
+)
+
+
+@pytest.fixture
+def stream(monkeypatch):
+    monkeypatch.setattr(stream_module, "async_track_time_interval", Mock())
+    return TSmartStatusStream(MagicMock())
+
+
+@pytest.fixture
+def sent():
+    """Return the deltas sent to a subscriber."""
+    return []
+
+
+def _entry(device_id: str) -> MagicMock:
+    entry = MagicMock()
+    entry.entry_id = f"entry-{device_id}"
+    entry.runtime_data.device.device_id = device_id
+    coordinator = entry.runtime_data.coordinator
+    coordinator.last_update_success = True
+    coordinator.data = STATUS
+    coordinator.device.status_frame = b"status 0"
+    return entry
+
+
+def _update(entry: MagicMock, frame: bytes, **changes) -> None:
+    """Give the entry a new status and call the stream's listener."""
+    coordinator = entry.runtime_data.coordinator
+    coordinator.data = replace(coordinator.data, **changes)
+    coordinator.device.status_frame = frame
+    coordinator.async_add_listener.call_args.args[0]()
+
+
+def test_only_changed_fields_are_sent(stream, sent):
+    entry = _entry("A1")
+    stream.async_add_entry(entry)
+    stream.async_subscribe(sent.append)
+
+    assert stream.snapshot()["A1"]["setpoint"] == 55
+    assert stream.snapshot()["A1"]["relay"] == 1
+    stream._async_flush()
+    assert sent == []
+
+    _update(entry, b"status 1", setpoint=65, relay=False)
+    stream._async_flush()
+    assert sent == [{"A1": {"setpoint": 65, "relay": 0}}]
+
+
+def test_changes_are_merged_until_the_flush(stream, sent):
+    entry = _entry("A1")
+    stream.async_add_entry(entry)
+    stream.async_subscribe(sent.append)
+
+    _update(entry, b"status 1", setpoint=65)
+    _update(entry, b"status 2", setpoint=70, relay=False)
+    stream._async_flush()
+
+    assert sent == [{"A1": {"setpoint": 70, "relay": 0}}]
+
+
+def test_same_frame_is_skipped(stream, sent):
+    entry = _entry("A1")
+    stream.async_add_entry(entry)
+    stream.async_subscribe(sent.append)
+
+    _update(entry, b"status 0", setpoint=65)
+    stream._async_flush()
+
+    assert sent == []
+
+
+def test_availability_and_removal(stream, sent):
+    entry = _entry("A1")
+    remove = stream.async_add_entry(entry)
+    stream.async_subscribe(sent.append)
+
+    entry.runtime_data.coordinator.last_update_success = False
+    _update(entry, b"status 0")
+    stream._async_flush()
+    assert sent == [{"A1": {"available": 0}}]
+
+    remove()
+    stream._async_flush()
+    assert sent[-1] == {"A1": None}
+    assert "A1" not in stream.snapshot()
+
+
+def test_statuses_only_followed_while_subscribed(stream, sent):
+    entry = _entry("A1")
+    stream.async_add_entry(entry)
+    coordinator = entry.runtime_data.coordinator
+    coordinator.async_add_listener.assert_not_called()
+
+    unsubscribe = stream.async_subscribe(sent.append)
+    coordinator.async_add_listener.assert_called_once()
+    stream_module.async_track_time_interval.assert_called_once()
+
+    unsubscribe()
+    coordinator.async_add_listener.return_value.assert_called_once()
+    assert stream.snapshot() == {}